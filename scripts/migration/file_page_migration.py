@@ -171,7 +171,6 @@ def move_file_pages_and_redirect_references(
         # Don't continue if there is no usage!
         if len(usage) != 0:
             page_title = file_info_["info"]["title"]
-            file_page = WtPage(wtSite=wtsite_obj_, title=page_title)
             match_res = match_first_regex_pattern(
                 patterns=REGEX_PATTERN_LIST,
                 strings=page_title,
@@ -217,6 +216,8 @@ def move_file_pages_and_redirect_references(
                     covered = True
             # Only move the page if the use case was covered
             if covered:
+                # Load the file page only if it is going to be moved and edited
+                file_page = WtPage(wtSite=wtsite_obj_, title=page_title)
                 # Rename the page
                 # file_page.move(new_title=new_fpt, redirect=False)
                 try:
@@ -6,7 +6,6 @@ from osw.controller.file.base import FileController
 from osw.controller.file.remote import RemoteFileController
 from osw.core import OSW, model
 from osw.utils.wiki import get_namespace, get_title
-from osw.wtsite import WtSite
 
 
 class WikiFileController(model.WikiFile, RemoteFileController):
@@ -159,11 +158,9 @@ class WikiFileController(model.WikiFile, RemoteFileController):
 
     def delete(self):
         file_page_name = f"{self.namespace}:{self.title}"
-        file_page = self.osw.site.get_page(
-            WtSite.GetPageParam(titles=[file_page_name])
-        ).pages[0]
-        if file_page.exists:
-            file_page.delete()
+        probe = self.osw.site.probe([file_page_name]).get(file_page_name)
+        if probe is not None and probe.exists:
+            self.osw.site.delete_page(probe)
 
     @property
     def url(self):
@@ -1,21 +1,25 @@
 from __future__ import annotations
 
+import hashlib
 import importlib
 import json
 import logging
 import os
 import pathlib
 import re
+import sys
+import tempfile
+import threading
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from enum import Enum
-from typing import Any, Dict, List, Optional, Type, Union, overload
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union, overload
 from uuid import UUID, uuid4
 from warnings import warn
 
-import black
 import datamodel_code_generator
-import isort
 import rdflib
 from jsonpath_ng.ext import parse
 from mwclient.client import Site
@@ -39,10 +43,23 @@ from pyld import jsonld
 
 import osw.model.entity as model
 from osw.defaults import params as default_params
+from osw.defaults import paths as default_paths
+from osw.model import (
+    GENERATED_INDEX_FILE,
+    GENERATED_PACKAGE,
+    get_generated_package_path,
+)
 from osw.utils.code_postprocessing import (
+    consolidate_imports_and_forward_refs,
+    get_class_names,
+    merge_generated_code,
+    remove_classes,
     remove_constraints_from_forward_refs,
+    remove_empty_subclasses,
     resolve_osw_id_type_hints,
 )
+from osw.utils.construct import construct_trusted
+from osw.utils.journal import JournalEntry, JournalState, StoreJournal
 from osw.utils.oold import (
     AggregateGeneratedSchemasParam,
     AggregateGeneratedSchemasParamMode,
@@ -51,10 +68,10 @@ from osw.utils.oold import (
     merge_generated_definitions,
 )
 from osw.utils.templates import (
-    compile_handlebars_template,
     eval_compiled_handlebars_template,
+    get_compiled_handlebars_template,
 )
-from osw.utils.util import parallelize
+from osw.utils.util import file_lock, get_dependency_levels, parallelize
 from osw.utils.wiki import (
     get_full_title,
     get_namespace,
@@ -105,6 +122,191 @@ class AddOverwriteClassOptions(Enum):
 OVERWRITE_CLASS_OPTIONS = Union[OverwriteOptions, AddOverwriteClassOptions]
 
 
+_composed_model_classes: Dict[Tuple[Type[OswBaseModel], ...], Type[OswBaseModel]] = {}
+_composed_model_classes_lock = threading.Lock()
+
+
+def get_composed_model_class(
+    bases: Tuple[Type[OswBaseModel], ...]
+) -> Type[OswBaseModel]:
+    """Returns a model class inheriting from all given classes, e.g. for entities
+    with multiple types. Classes are memoized by their bases, so that the same class
+    is returned for repeated calls (also from different threads).
+
+    Parameters
+    ----------
+    bases
+        The model classes to inherit from, in the order of the entity's types
+
+    Returns
+    -------
+        The composed model class, named after its bases, e.g. 'Item_Person'
+    """
+    # drop bases already covered by a more specific base (would break the MRO)
+    bases = tuple(
+        base
+        for base in bases
+        if not any(other is not base and issubclass(other, base) for other in bases)
+    )
+    if len(bases) == 1:
+        return bases[0]
+    with _composed_model_classes_lock:
+        cls = _composed_model_classes.get(bases)
+        if cls is None:
+            cls = create_model(
+                "_".join(base.__name__ for base in bases), __base__=bases
+            )
+            _composed_model_classes[bases] = cls
+    return cls
+
+
+def _get_model_class_spec(
+    cls: Type[OswBaseModel],
+) -> Optional[List[Tuple[str, str]]]:
+    """Returns the (module, name) of the class or of its bases (for composed
+    classes) to import it in another process. None if not importable"""
+    bases = next(
+        (bases for bases, c in _composed_model_classes.items() if c is cls), (cls,)
+    )
+    spec = []
+    for base in bases:
+        module = sys.modules.get(base.__module__)
+        if getattr(module, base.__qualname__, None) is not base:
+            return None
+        spec.append((base.__module__, base.__qualname__))
+    return spec
+
+
+def _import_model_class(spec: List[Tuple[str, str]]) -> Type[OswBaseModel]:
+    """Imports the class described by _get_model_class_spec()"""
+    bases = tuple(
+        getattr(importlib.import_module(module), name) for module, name in spec
+    )
+    return get_composed_model_class(bases)
+
+
+def _validate_jsondata_chunk(
+    chunk: List[Tuple[int, List[Tuple[str, str]], dict]], remove_empty_: bool
+) -> List[Tuple[int, bool, str]]:
+    """Validates the jsondata of a chunk of entities in a worker process.
+
+    Parameters
+    ----------
+    chunk
+        List of (index, class spec, jsondata)
+    remove_empty_
+        Whether to remove empty values from the jsondata first
+
+    Returns
+    -------
+        List of (index, True, validated data as JSON string) or (index, False, error
+        message). The validated data is used to construct the entity without
+        validation in the main process.
+    """
+    results = []
+    for index, spec, jsondata in chunk:
+        try:
+            if remove_empty_:
+                remove_empty(jsondata)
+            entity = _import_model_class(spec)(**jsondata)
+            results.append(
+                (index, True, entity.json(by_alias=True, exclude_unset=True))
+            )
+        except Exception as e:
+            results.append((index, False, str(e)))
+    return results
+
+
+def _get_referenced_iris(data: Any) -> Set[str]:
+    """Returns all strings contained in the (nested) data of an entity, which
+    includes the IRIs of referenced entities. Models are traversed without
+    serializing them, link fields contribute their IRIs."""
+    if isinstance(data, str):
+        return {data}
+    if isinstance(data, BaseModel):
+        link_fields = getattr(type(data), "__link_fields__", {})
+        values = [
+            value for name, value in data.__dict__.items() if name not in link_fields
+        ]
+        if link_fields:
+            values.extend(data.__iris__.values())
+        data = values
+    elif isinstance(data, dict):
+        data = list(data.values())
+    iris = set()
+    if isinstance(data, (list, tuple, set, frozenset)):
+        for value in data:
+            iris.update(_get_referenced_iris(value))
+    return iris
+
+
+_meta_category_cache: Dict[Tuple[str, str], Tuple[int, Optional[str], List[str]]] = {}
+"""Process-wide cache of meta categories: (site host, title) -> (revision id, schema
+template, subclass_of)"""
+_meta_category_cache_lock = threading.Lock()
+
+
+def _get_file_hash(path: str) -> Optional[str]:
+    """Returns the sha256 hash of the content of a file, None if it does not exist"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+_model_file_hash = _get_file_hash(model.__file__)
+"""Hash of the osw.model.entity module file as imported by this process"""
+
+
+def _without_meta(jsondata: dict) -> dict:
+    """Returns the jsondata of an entity without the 'meta' property"""
+    return {key: value for key, value in jsondata.items() if key != "meta"}
+
+
+ENTITY_CACHE_SIZE = 10000
+"""Maximum number of entities kept in the entity cache of an OSW instance"""
+
+
+class _EntityCache:
+    """Thread-safe LRU cache of loaded entities, keyed by page title and revision
+    id. The cache holds private copies, get() returns a (deep) copy."""
+
+    def __init__(self, max_size: int = ENTITY_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, Tuple[Any, OswBaseModel]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, title: str, key: Any) -> Optional[OswBaseModel]:
+        """Returns a copy of the cached entity of the page title if it was stored
+        with the same key, e.g. (revision id, model class, ...)"""
+        with self._lock:
+            entry = self._entries.get(title)
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end(title)
+            entity = entry[1]
+        return entity.copy(deep=True)
+
+    def set(self, title: str, key: Any, entity: OswBaseModel) -> None:
+        """Stores a copy of the entity for the page title"""
+        entity = entity.copy(deep=True)
+        with self._lock:
+            self._entries[title] = (key, entity)
+            self._entries.move_to_end(title)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, titles: List[str]) -> None:
+        with self._lock:
+            for title in titles:
+                self._entries.pop(title, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 class OSW(BaseModel):
     """Bundles core functionalities of OpenSemanticWorld (OSW)"""
 
@@ -118,6 +320,14 @@ class OSW(BaseModel):
         arbitrary_types_allowed = True  # necessary to allow e.g. np.array as type
 
     site: WtSite
+    _model_class_cache: Dict[tuple, Type[OswBaseModel]] = PrivateAttr(
+        default_factory=dict
+    )
+    """Maps the categories ('type') of an entity to the resolved model class.
+    Invalidated by fetch_schema()"""
+    _entity_cache: _EntityCache = PrivateAttr(default_factory=_EntityCache)
+    """Loaded entities by page title and revision id.
+    Invalidated by store_entity(), delete_entity() and fetch_schema()"""
 
     def __init__(self, **data: Any):
         super().__init__(**data)
@@ -302,11 +512,13 @@ class OSW(BaseModel):
         if issubclass(entity, BaseModel):
             entity_title = "Category:" + OSW.get_osw_id(schema_registration.schema_uuid)
 
-            page = WtPage(wtSite=self.site, title=entity_title)
-            if page.exists:
+            probe = self.site.probe([entity_title]).get(entity_title)
+            if probe is not None and probe.exists:
                 page = self.site.get_page(
                     WtSite.GetPageParam(titles=[entity_title])
                 ).pages[0]
+            else:
+                page = WtPage(wtSite=self.site, title=entity_title, do_init=False)
 
             page.set_slot_content("jsondata", jsondata)
 
@@ -427,6 +639,23 @@ class OSW(BaseModel):
         result_model_path: Optional[Union[str, pathlib.Path]] = None
         """path to the generated model file, if None,
         the default path ./model/entity.py is used"""
+        skip_unchanged: Optional[bool] = True
+        """skip the code generation if the schemas are unchanged since the last
+        generation of the model file, see the generation manifest next to it"""
+        overwrite: Optional[bool] = False
+        """in append mode, replace existing classes of the model by the newly
+        generated ones instead of keeping them, e.g. to update outdated schemas"""
+        layout: Optional[str] = "single"
+        """'single' generates all classes into one module (result_model_path).
+        'modules' generates one module per schema into the package
+        osw.model.generated, named after the schema title, for the requested schemas
+        and all schemas they reference. A module defines the classes of its schema
+        and imports the classes of the referenced schemas from their modules. The
+        classes are imported lazily via osw.model, e.g. osw.model.Device, loading
+        only the modules of the schemas Device depends on."""
+        format_code: Optional[bool] = False
+        """format the generated code with black and isort. The code is valid without
+        formatting, which dominates the generation time of large models."""
 
         class Config:
             arbitrary_types_allowed = True
@@ -439,12 +668,15 @@ class OSW(BaseModel):
         """List of critical errors that did interrupt the fetch process"""
         warning_messages: Optional[List[str]] = None
         """List of warnings that did not interrupt the fetch process"""
+        unchanged: Optional[bool] = None
+        """True if the code generation was skipped, since the schemas are unchanged"""
 
     def fetch_schema(
         self, fetchSchemaParam: FetchSchemaParam = None
     ) -> FetchSchemaResult:
         """Loads the given schemas from the OSW instance and auto-generates python
-        datasclasses within osw.model.entity from it
+        datasclasses within osw.model.entity (or osw.model.generated, see
+        FetchSchemaParam.layout) from it
 
         Parameters
         ----------
@@ -453,14 +685,106 @@ class OSW(BaseModel):
         """
         if not isinstance(fetchSchemaParam.schema_title, list):
             fetchSchemaParam.schema_title = [fetchSchemaParam.schema_title]
+        if fetchSchemaParam.layout not in ("single", "modules"):
+            raise ValueError(f"Unknown layout '{fetchSchemaParam.layout}'")
+        if fetchSchemaParam.layout == "modules" and fetchSchemaParam.result_model_path:
+            raise ValueError(
+                "result_model_path is not supported with layout 'modules', the "
+                f"modules are generated into the package {GENERATED_PACKAGE}"
+            )
+        model_path = OSW._get_model_path(
+            fetchSchemaParam.result_model_path, fetchSchemaParam.layout
+        )
+        manifest_path = OSW._get_manifest_path(model_path)
+        manifest = None
+        if fetchSchemaParam.skip_unchanged:
+            manifest = OSW._read_generation_manifest(manifest_path)
+        if manifest is not None and self._is_generation_unchanged(
+            manifest, fetchSchemaParam, model_path
+        ):
+            print("Schemas unchanged since the last generation, skip generation")
+            if OSW._reload_model_if_modified(model_path):
+                self._model_class_cache.clear()
+                self._entity_cache.clear()
+            return OSW.FetchSchemaResult(
+                fetched_schema_titles=list(manifest["schemas"]), unchanged=True
+            )
+
+        # fetch the schemas of all titles first. Schemas shared by the titles are
+        #  fetched only once.
+        fetched_schema_titles = []
+        fetched_schemas = {}
+        schema_documents = {}
+        warning_messages = []
+        error_messages = {}
+        for schema_title in fetchSchemaParam.schema_title:
+            param = OSW._FetchSchemaParam(
+                schema_title=schema_title,
+                offline_pages=fetchSchemaParam.offline_pages,
+                fetched_schema_titles=fetched_schema_titles,
+                fetched_schemas=fetched_schemas,
+                schema_documents=schema_documents,
+            )
+            error = self._fetch_schema_closure(param)
+            if error is not None:
+                error_messages[schema_title] = error
+            fetched_schema_titles = param.fetched_schema_titles
+            fetched_schemas = param.fetched_schemas
+            schema_documents = param.schema_documents
+            warning_messages.extend(param.warning_messages or [])
+        if (
+            manifest is not None
+            and not error_messages
+            and self._is_generation_unchanged(
+                manifest, fetchSchemaParam, model_path, fetched_schemas
+            )
+        ):
+            # e.g. only other slots of the schema pages have been edited
+            print("Schemas unchanged since the last generation, skip generation")
+            with file_lock(manifest_path + ".lock"):
+                # re-read, the manifest may have been updated concurrently
+                manifest = OSW._read_generation_manifest(manifest_path) or manifest
+                for title, state in fetched_schemas.items():
+                    if title in manifest["schemas"]:
+                        manifest["schemas"][title]["revision_id"] = state["revision_id"]
+                OSW._write_generation_manifest(manifest_path, manifest)
+            if OSW._reload_model_if_modified(model_path):
+                self._model_class_cache.clear()
+                self._entity_cache.clear()
+            return OSW.FetchSchemaResult(
+                fetched_schema_titles=fetched_schema_titles,
+                warning_messages=warning_messages or None,
+                unchanged=True,
+            )
+
+        # model classes are replaced by the (re)generation
+        self._model_class_cache.clear()
+        self._entity_cache.clear()
+        schema_titles = [
+            title
+            for title in fetchSchemaParam.schema_title
+            if title not in error_messages
+        ]
+        generated_titles = schema_titles
+        if fetchSchemaParam.layout == "modules":
+            if fetchSchemaParam.mode == "replace":
+                OSW._reset_generated_package()
+            # one module per schema of the closure, the referenced schemas first
+            generated_titles = OSW._get_generation_order(
+                schema_titles, fetched_schemas, schema_documents
+            )
         first = True
         last = False
         results = []
-        for schema_title in fetchSchemaParam.schema_title:
-            last = schema_title == fetchSchemaParam.schema_title[-1]
+        for schema_title in generated_titles:
+            last = schema_title == schema_titles[-1]
             mode = fetchSchemaParam.mode
             if not first:  # 'replace' makes only sense for the first schema
                 mode = "append"
+            if fetchSchemaParam.layout == "modules":
+                # every schema replaces its own module
+                mode = "replace"
+                last = True
             res = self._fetch_schema(
                 OSW._FetchSchemaParam(
                     schema_title=schema_title,
@@ -470,18 +794,33 @@ class OSW(BaseModel):
                     generator_options=fetchSchemaParam.generator_options,
                     offline_pages=fetchSchemaParam.offline_pages,
                     result_model_path=fetchSchemaParam.result_model_path,
+                    overwrite=fetchSchemaParam.overwrite,
+                    layout=fetchSchemaParam.layout,
+                    format_code=fetchSchemaParam.format_code,
+                    # already fetched above
+                    fetched_schema_titles=fetched_schema_titles,
+                    fetched_schemas=fetched_schemas,
+                    schema_documents=schema_documents,
                 )
             )
             results.append(res)
             first = False
+        if schema_titles:
+            OSW._update_generation_manifest(
+                manifest_path,
+                model_path,
+                fetchSchemaParam,
+                schema_titles,
+                fetched_schemas,
+            )
 
         # merge unique results and return
         merged_result = OSW.FetchSchemaResult(
-            fetched_schema_titles=[], error_messages=[]
+            fetched_schema_titles=list(fetched_schema_titles),
+            error_messages=list(error_messages.values()),
+            warning_messages=warning_messages,
         )
         for result in results:
-            if result.fetched_schema_titles:
-                merged_result.fetched_schema_titles.extend(result.fetched_schema_titles)
             if result.error_messages:
                 merged_result.error_messages.extend(result.error_messages)
         return OSW.FetchSchemaResult(
@@ -495,6 +834,301 @@ class OSW(BaseModel):
                 if len(merged_result.error_messages) > 0
                 else None
             ),
+            warning_messages=(
+                list(dict.fromkeys(merged_result.warning_messages))
+                if len(merged_result.warning_messages) > 0
+                else None
+            ),
+        )
+
+    @staticmethod
+    def _get_model_path(
+        result_model_path: Optional[Union[str, pathlib.Path]] = None,
+        layout: str = "single",
+    ) -> str:
+        """Returns the path of the generated model file, by default
+        osw/model/entity.py. For the layout 'modules' the path of the index of the
+        generated package, which changes with every generated module."""
+        if layout == "modules":
+            return os.path.join(get_generated_package_path(), GENERATED_INDEX_FILE)
+        if result_model_path:
+            return str(result_model_path)
+        return os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "model", "entity.py"
+        )
+
+    @staticmethod
+    def _get_manifest_path(model_path: str) -> str:
+        """Returns the path of the generation manifest of a model file, e.g.
+        osw/model/entity.manifest.json"""
+        return os.path.splitext(model_path)[0] + ".manifest.json"
+
+    @staticmethod
+    def _get_generator_options_key(fetchSchemaParam: FetchSchemaParam) -> str:
+        """Returns the options affecting the generated code as a string"""
+        return json.dumps(
+            {
+                "generate_annotations": fetchSchemaParam.generate_annotations,
+                "generator_options": fetchSchemaParam.generator_options,
+                "format_code": fetchSchemaParam.format_code,
+            },
+            sort_keys=True,
+            default=str,
+        )
+
+    @staticmethod
+    def _read_generation_manifest(manifest_path: str) -> Optional[dict]:
+        """Reads the generation manifest of a model file, None if it does not exist
+        or is not readable"""
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(manifest, dict) or manifest.get("version") != 1:
+            return None
+        return manifest
+
+    @staticmethod
+    def _write_generation_manifest(manifest_path: str, manifest: dict) -> None:
+        # write to a temporary file first, other processes may read the manifest
+        #  concurrently
+        tmp_path = f"{manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp_path, manifest_path)
+
+    @staticmethod
+    def _reload_model_if_modified(model_path: str) -> bool:
+        """Reloads osw.model.entity if model_path is its file and it has been
+        regenerated (e.g. by another process) since it was imported. Returns
+        whether the module was reloaded."""
+        global _model_file_hash
+        if os.path.abspath(model_path) != os.path.abspath(model.__file__):
+            return False
+        file_hash = _get_file_hash(model_path)
+        if file_hash == _model_file_hash:
+            return False
+        importlib.reload(model)
+        _model_file_hash = file_hash
+        return True
+
+    @staticmethod
+    def _get_generated_module_name(schema_title: str) -> str:
+        """Returns the name of the module generated for a schema with the layout
+        'modules', e.g. 'OSW0e7fab2262fb4427ad0fa454bc868a0d' for
+        'Category:OSW0e7fab2262fb4427ad0fa454bc868a0d'"""
+        name = re.sub(r"\W", "_", schema_title.split(":")[-1])
+        if not name or name[0].isdigit():
+            name = "_" + name
+        return name
+
+    @staticmethod
+    def _get_generation_order(
+        schema_titles: List[str],
+        schemas: Dict[str, Dict[str, Any]],
+        schema_documents: Dict[str, str],
+    ) -> List[str]:
+        """Returns the titles of the given schemas and of all schemas they
+        reference (recursively), each after the schemas it references. Schemas
+        referencing each other are ordered as found."""
+        closure = []
+        for schema_title in schema_titles:
+            for title in OSW._get_schema_closure(schema_title, schemas):
+                if title not in closure and title in schema_documents:
+                    closure.append(title)
+        levels, _ = get_dependency_levels(
+            {title: schemas.get(title, {}).get("refs", []) for title in closure}
+        )
+        return [title for level in levels for title in level]
+
+    @staticmethod
+    def _read_generated_index() -> dict:
+        """Reads the index of the generated package, mapping the class names to
+        their modules ('classes') and the modules to their schema and the classes
+        they define ('modules')"""
+        index_path = os.path.join(get_generated_package_path(), GENERATED_INDEX_FILE)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+        if not isinstance(index, dict) or index.get("version") != 2:
+            index = {"version": 2, "classes": {}, "modules": {}}
+        return index
+
+    @staticmethod
+    def _update_generated_index(
+        module_name: str, schema_title: str, content: str
+    ) -> None:
+        """Records the classes defined by a (re)generated module in the index of the
+        generated package. The update is serialized by a lock file, since other
+        processes may generate modules concurrently."""
+        index_path = os.path.join(get_generated_package_path(), GENERATED_INDEX_FILE)
+        with file_lock(index_path + ".lock"):
+            index = OSW._read_generated_index()
+            classes = {
+                cls: module
+                for cls, module in index["classes"].items()
+                if module != module_name
+            }
+            module_classes = get_class_names(content)
+            for cls in module_classes:
+                classes.setdefault(cls, module_name)
+            index["classes"] = classes
+            index["modules"][module_name] = {
+                "schema": schema_title,
+                "classes": module_classes,
+            }
+            OSW._write_generation_manifest(index_path, index)
+
+    @staticmethod
+    def _reset_generated_package() -> None:
+        """Removes the modules of the generated package and its index"""
+        package_path = get_generated_package_path()
+        index = OSW._read_generated_index()
+        for module_name in index["modules"]:
+            try:
+                os.remove(os.path.join(package_path, module_name + ".py"))
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(os.path.join(package_path, GENERATED_INDEX_FILE))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _import_generated_classes(
+        content: str, module_name: str, ref_modules: Dict[str, List[str]]
+    ) -> str:
+        """Removes the classes defined by the modules of the referenced schemas from
+        the content of a module and imports them from these modules instead
+
+        Parameters
+        ----------
+        content
+            The generated code of the module
+        module_name
+            The name of the module
+        ref_modules
+            The modules of the referenced schemas mapped to the classes they define,
+            see _read_generated_index()
+
+        Returns
+        -------
+            The content of the module
+        """
+        imports = {}
+        for cls in get_class_names(content):
+            for module, module_classes in ref_modules.items():
+                if module != module_name and cls in module_classes:
+                    imports.setdefault(module, []).append(cls)
+                    break
+        content = remove_classes(
+            content, [cls for names in imports.values() for cls in names]
+        )
+        import_statements = "".join(
+            f"from {GENERATED_PACKAGE}.{module} import {', '.join(sorted(names))}\n"
+            for module, names in sorted(imports.items())
+        )
+        return import_statements + content
+
+    @staticmethod
+    def _get_schema_closure(
+        schema_title: str, schemas: Dict[str, Dict[str, Any]]
+    ) -> List[str]:
+        """Returns the title of the schema and of all schemas it references
+        (recursively), using the 'refs' recorded in the manifest"""
+        closure = [schema_title]
+        for title in closure:
+            for ref in schemas.get(title, {}).get("refs", []):
+                if ref not in closure:
+                    closure.append(ref)
+        return closure
+
+    @staticmethod
+    def _update_generation_manifest(
+        manifest_path: str,
+        model_path: str,
+        fetchSchemaParam: FetchSchemaParam,
+        schema_titles: List[str],
+        fetched_schemas: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """Records the generated schemas in the manifest of the model file. The
+        update is serialized by a lock file, since other processes may generate
+        schemas concurrently."""
+        with file_lock(manifest_path + ".lock"):
+            manifest = None
+            if fetchSchemaParam.mode != "replace":
+                manifest = OSW._read_generation_manifest(manifest_path)
+            if manifest is None or manifest.get(
+                "options"
+            ) != OSW._get_generator_options_key(fetchSchemaParam):
+                # the recorded schemas are not known to be up to date
+                manifest = {"version": 1, "roots": {}, "schemas": {}}
+            manifest["options"] = OSW._get_generator_options_key(fetchSchemaParam)
+            manifest["schemas"].update(fetched_schemas)
+            for schema_title in schema_titles:
+                manifest["roots"][schema_title] = OSW._get_schema_closure(
+                    schema_title, manifest["schemas"]
+                )
+            manifest["model_sha256"] = _get_file_hash(model_path)
+            OSW._write_generation_manifest(manifest_path, manifest)
+
+    def _is_generation_unchanged(
+        self,
+        manifest: dict,
+        fetchSchemaParam: FetchSchemaParam,
+        model_path: str,
+        fetched_schemas: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> bool:
+        """Returns whether generating the model file would not change it, since the
+        requested schemas were generated before and are unchanged
+
+        Parameters
+        ----------
+        manifest
+            The generation manifest of the model file
+        fetchSchemaParam
+            The param of fetch_schema()
+        model_path
+            The path of the model file
+        fetched_schemas
+            The fetched schemas with their content hashes. If None, the revision ids
+            of the recorded schemas are compared with the current ones instead,
+            without loading the schemas.
+
+        Returns
+        -------
+            True if the generation can be skipped
+        """
+        if manifest.get("model_sha256") is None or manifest.get(
+            "model_sha256"
+        ) != _get_file_hash(model_path):
+            return False  # model file missing or modified otherwise
+        if manifest.get("options") != OSW._get_generator_options_key(fetchSchemaParam):
+            return False
+        roots = manifest.get("roots", {})
+        schema_titles = set(fetchSchemaParam.schema_title)
+        if not schema_titles.issubset(roots):
+            return False
+        if fetchSchemaParam.mode == "replace" and schema_titles != set(roots):
+            return False  # the model file contains other schemas
+        recorded = manifest.get("schemas", {})
+        if fetched_schemas is not None:
+            return all(
+                title in recorded and recorded[title]["sha256"] == state["sha256"]
+                for title, state in fetched_schemas.items()
+            )
+        if fetchSchemaParam.offline_pages and any(
+            title in fetchSchemaParam.offline_pages for title in recorded
+        ):
+            return False  # offline pages have no comparable revision id
+        revision_ids = self.site.get_revision_ids(list(recorded))
+        return all(
+            state.get("revision_id") is not None
+            and revision_ids.get(title) == state["revision_id"]
+            for title, state in recorded.items()
         )
 
     class _FetchSchemaParam(BaseModel):
@@ -531,7 +1165,20 @@ class OSW(BaseModel):
         """path to the generated model file, if None,
         the default path ./model/entity.py is used"""
         fetched_schema_titles: Optional[List[str]] = []
-        """keep track of fetched schema titles to prevent recursion"""
+        """keep track of fetched schema titles to fetch each schema only once"""
+        fetched_schemas: Optional[Dict[str, Dict[str, Any]]] = {}
+        """revision id, content hash and referenced titles of the fetched schemas,
+        recorded in the generation manifest"""
+        overwrite: Optional[bool] = False
+        """in append mode, replace existing classes of the model by the newly
+        generated ones instead of keeping them"""
+        layout: Optional[str] = "single"
+        """'single' or 'modules', see FetchSchemaParam.layout"""
+        format_code: Optional[bool] = False
+        """format the generated code with black and isort"""
+        schema_documents: Optional[Dict[str, str]] = {}
+        """the preprocessed schema documents (JSON) of the fetched schemas, the input
+        of the code generation"""
         warning_messages: Optional[List[str]] = None
 
         class Config:
@@ -548,107 +1195,29 @@ class OSW(BaseModel):
         fetchSchemaParam
             See FetchSchemaParam, by default None
         """
+        global _model_file_hash
         site_cache_state = self.site.get_cache_enabled()
         self.site.enable_cache()
         if fetchSchemaParam is None:
             fetchSchemaParam = OSW._FetchSchemaParam()
         schema_title = fetchSchemaParam.schema_title
-        fetchSchemaParam.fetched_schema_titles.append(schema_title)
         root = fetchSchemaParam.root
-        schema_name = schema_title.split(":")[-1]
-        if (
-            fetchSchemaParam.offline_pages is not None
-            and schema_title in fetchSchemaParam.offline_pages
-        ):
-            print(f"Fetch {schema_title} from offline pages")
-            page = fetchSchemaParam.offline_pages[schema_title]
-        else:
-            print(f"Fetch {schema_title} from online pages")
-            page = self.site.get_page(WtSite.GetPageParam(titles=[schema_title])).pages[
-                0
-            ]
-            if not page.exists:
-                print(f"Error: Page {schema_title} does not exist")
-                return OSW.FetchSchemaResult(
-                    fetched_schema_titles=fetchSchemaParam.fetched_schema_titles,
-                    warning_messages=fetchSchemaParam.warning_messages,
-                    error_messages=[f"Page {schema_title} does not exist"],
-                )
-        # not only in the JsonSchema namespace the schema is located in the main slot
-        # in all other namespaces, the json_schema slot is used
-        if schema_title.startswith("JsonSchema:"):
-            schema_str = ""
-            if page.get_slot_content("main"):
-                schema_str = json.dumps(page.get_slot_content("main"))
-        else:
-            schema_str = ""
-            if page.get_slot_content("jsonschema"):
-                schema = merge_generated_definitions(
-                    deepcopy(page.get_slot_content("jsonschema"))
-                )
-                schema_str = json.dumps(schema)
-        if (schema_str is None) or (schema_str == ""):
-            print(f"Warning: Schema slot of {schema_title} is empty")
-            schema_str = "{}"  # empty schema to make reference work
-            if fetchSchemaParam.warning_messages is None:
-                fetchSchemaParam.warning_messages = []
-            fetchSchemaParam.warning_messages.append(
-                f"Schema slot of {schema_title} is empty"
-            )
-
-        generator = Generator()
-        schemas_for_preprocessing = [json.loads(schema_str)]
-        generator.preprocess(
-            Generator.GenerateParams(json_schemas=schemas_for_preprocessing)
-        )
-        schema_str = json.dumps(schemas_for_preprocessing[0])
-
-        schema = json.loads(schema_str.replace("$ref", "dollarref"))
 
-        jsonpath_expr = parse("$..dollarref")
-        for match in jsonpath_expr.find(schema):
-            # value = "https://" + self.mw_site.host + match.value
-            if match.value.startswith("#"):
-                continue  # skip self references
-            ref_schema_title = match.value.replace("/wiki/", "").split("?")[0]
-            ref_schema_name = ref_schema_title.split(":")[-1] + ".json"
-            value = ""
-            for _i in range(0, schema_name.count("/")):
-                value += "../"  # created relative path to top-level schema dir
-            value += ref_schema_name  # create a reference to a local file
-            # keep document-relative jsonpointer if present
-            if "#/" in match.value:
-                value += "#/" + match.value.split("#/")[-1]
-            match.full_path.update_or_create(schema, value)
-            # print(f"replace {match.value} with {value}")
-            if (
-                ref_schema_title != schema_title
-                and ref_schema_title not in fetchSchemaParam.fetched_schema_titles
-            ):  # prevent recursion in case of self references
-                _param = fetchSchemaParam.copy()
-                _param.root = False
-                _param.schema_title = ref_schema_title
-                self._fetch_schema(_param)  # resolve references recursive
-
-        model_dir_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "model"
-        )  # src/model
-        schema_path = os.path.join(model_dir_path, schema_name + ".json")
-        os.makedirs(os.path.dirname(schema_path), exist_ok=True)
-        with open(schema_path, "w", encoding="utf-8") as f:
-            schema_str = json.dumps(schema, ensure_ascii=False, indent=4).replace(
-                "dollarref", "$ref"
+        error = self._fetch_schema_closure(fetchSchemaParam)
+        if error is not None:
+            return OSW.FetchSchemaResult(
+                fetched_schema_titles=fetchSchemaParam.fetched_schema_titles,
+                warning_messages=fetchSchemaParam.warning_messages,
+                error_messages=[error],
             )
-            # print(schema_str)
-            f.write(schema_str)
 
         # result_model_path = schema_path.replace(".json", ".py")
-        result_model_path = os.path.join(model_dir_path, "entity.py")
-        if fetchSchemaParam.result_model_path:
-            result_model_path = fetchSchemaParam.result_model_path
-            if not isinstance(result_model_path, str):
-                result_model_path = str(result_model_path)
-        temp_model_path = os.path.join(model_dir_path, "temp.py")
+        result_model_path = OSW._get_model_path(fetchSchemaParam.result_model_path)
+        if fetchSchemaParam.layout == "modules":
+            module_name = OSW._get_generated_module_name(schema_title)
+            result_model_path = os.path.join(
+                get_generated_package_path(), module_name + ".py"
+            )
         data_model_type = "pydantic.BaseModel"
         if fetchSchemaParam.generator_options is not None:
             data_model_type = fetchSchemaParam.generator_options.get(
@@ -664,40 +1233,60 @@ class OSW(BaseModel):
                 datamodel_code_generator.parser.jsonschema.JsonSchemaParser = (
                     OOLDJsonSchemaParser
                 )
-            datamodel_code_generator.generate(
-                input_=pathlib.Path(schema_path),
-                input_file_type="jsonschema",
-                output=pathlib.Path(temp_model_path),
-                base_class=(
-                    "opensemantic.v1.OswBaseModel"
-                    if data_model_type == "pydantic.BaseModel"
-                    else "opensemantic.OswBaseModel"
-                ),
-                # use_default=True,
-                apply_default_values_for_required_fields=True,
-                use_unique_items_as_set=True,
-                enum_field_as_literal=datamodel_code_generator.LiteralType.Off,
-                # will create MyEnum(str, Enum) instead of MyEnum(Enum)
-                use_subclass_enum=True,
-                set_default_enum_member=True,
-                use_title_as_name=True,
-                use_schema_description=True,
-                use_field_description=True,
-                # https://github.com/koxudaxi/datamodel-code-generator/issues/2447
-                # use_standard_collections=data_model_type != "pydantic.BaseModel",
-                encoding="utf-8",
-                use_double_quotes=True,
-                collapse_root_models=True,
-                reuse_model=True,
-                field_include_all_keys=True,
-                allof_class_hierarchy=datamodel_code_generator.AllOfClassHierarchy.Always,
-                additional_imports=(
-                    ["uuid.uuid4", "pydantic.ConfigDict"]
-                    if data_model_type != "pydantic.BaseModel"
-                    else ["uuid.uuid4"]
-                ),
-                **(fetchSchemaParam.generator_options or {}),
-            )
+            generator_options = dict(fetchSchemaParam.generator_options or {})
+            if not fetchSchemaParam.format_code:
+                # the code is formatted (if requested) after the post-processing
+                generator_options.setdefault("formatters", [])
+            # the generator resolves the references between the schemas as files,
+            #  so the documents of the schema closure are written to a private
+            #  temporary directory, the code is returned in memory
+            with tempfile.TemporaryDirectory(prefix="osw_schemas_") as schema_dir:
+                schema_titles = OSW._get_schema_closure(
+                    schema_title, fetchSchemaParam.fetched_schemas
+                )
+                for title in schema_titles:
+                    document = fetchSchemaParam.schema_documents.get(title)
+                    if document is None:
+                        continue  # missing page, reported by the fetch
+                    path = os.path.join(schema_dir, title.split(":")[-1] + ".json")
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(document)
+                content = datamodel_code_generator.generate(
+                    input_=pathlib.Path(
+                        schema_dir, schema_title.split(":")[-1] + ".json"
+                    ),
+                    input_file_type="jsonschema",
+                    base_class=(
+                        "opensemantic.v1.OswBaseModel"
+                        if data_model_type == "pydantic.BaseModel"
+                        else "opensemantic.OswBaseModel"
+                    ),
+                    # use_default=True,
+                    apply_default_values_for_required_fields=True,
+                    use_unique_items_as_set=True,
+                    enum_field_as_literal=datamodel_code_generator.LiteralType.Off,
+                    # will create MyEnum(str, Enum) instead of MyEnum(Enum)
+                    use_subclass_enum=True,
+                    set_default_enum_member=True,
+                    use_title_as_name=True,
+                    use_schema_description=True,
+                    use_field_description=True,
+                    # https://github.com/koxudaxi/datamodel-code-generator/issues/2447
+                    # use_standard_collections=data_model_type != "pydantic.BaseModel",
+                    encoding="utf-8",
+                    use_double_quotes=True,
+                    collapse_root_models=True,
+                    reuse_model=True,
+                    field_include_all_keys=True,
+                    allof_class_hierarchy=datamodel_code_generator.AllOfClassHierarchy.Always,
+                    additional_imports=(
+                        ["uuid.uuid4", "pydantic.ConfigDict"]
+                        if data_model_type != "pydantic.BaseModel"
+                        else ["uuid.uuid4"]
+                    ),
+                    **generator_options,
+                )
 
             # note: we could use OOLDJsonSchemaParser directly (see below),
             # but datamodel_code_generator.generate
@@ -757,11 +1346,6 @@ class OSW(BaseModel):
             # --reuse-model: Re-use models on the field when a module has the model
             #  with the same content
 
-            content = ""
-            with open(temp_model_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            os.remove(temp_model_path)
-
             content = re.sub(
                 r"(UUID = Field\(...)",
                 r"UUID = Field(default_factory=uuid4",
@@ -785,68 +1369,7 @@ class OSW(BaseModel):
 
             # Detect empty subclasses, replaces their occurrences with base classes,
             # and removes the empty class definitions.
-            # Only processes subclasses that follow naming patterns:
-            # - BaseclassModel (e.g., DescriptionModel extends Description)
-            # - Baseclass<number> (e.g., Label1, Label2 extend Label)
-
-            # Pattern to match empty subclasses
-            # Matches: class SubClass(BaseClass):
-            # followed by optional whitespace/docstring and pass
-            pattern = "".join(
-                (
-                    r"class\s+",  # 'class' keyword
-                    r"(\w+)",  # capture subclass name
-                    r"\s*\(\s*",  # opening parenthesis
-                    r"(\w+)",  # capture base class name
-                    r"\s*\)\s*:",  # closing parenthesis and colon
-                    r"\s*",  # optional whitespace
-                    r'(?:\n\s*(?:""".*?"""|\'\'\'.*?\'\'\')'
-                    # optional docstring (triple quotes)
-                    r"\s*)?",  # end optional docstring
-                    r"\n\s*pass\s*",  # pass statement
-                    r"(?:\n|$)",  # newline or end of string
-                )
-            )
-
-            # Find all empty subclasses
-            matches = list(re.finditer(pattern, content, re.MULTILINE | re.DOTALL))
-
-            # Filter matches based on naming patterns
-            valid_matches = []
-            for match in matches:
-                subclass_name = match.group(1)
-                base_class_name = match.group(2)
-
-                # Check if subclass follows the naming patterns
-                if (
-                    subclass_name == base_class_name + "Model"  # BaseclassModel pattern
-                    or re.match(
-                        rf"^{re.escape(base_class_name)}\d+$", subclass_name
-                    )  # Baseclass<number> pattern
-                ):
-                    valid_matches.append(match)
-
-            content = content
-            replacements = []
-
-            # Process matches in reverse order to avoid offset issues when removing
-            for match in reversed(valid_matches):
-                subclass_name = match.group(1)
-                base_class_name = match.group(2)
-                replacements.append((subclass_name, base_class_name))
-
-                # Remove the entire class definition
-                start, end = match.span()
-                # Also remove any trailing newlines to avoid extra blank lines
-                while end < len(content) and content[end] == "\n":
-                    end += 1
-
-                content = content[:start] + content[end:]
-
-            # Replace all occurrences of subclass names with base class names
-            for subclass_name, base_class_name in reversed(replacements):
-                pattern_replace = r"\b" + re.escape(subclass_name) + r"\b"
-                content = re.sub(pattern_replace, base_class_name, content)
+            content = remove_empty_subclasses(content)
 
             if fetchSchemaParam.mode == "replace":
 
@@ -890,6 +1413,9 @@ class OSW(BaseModel):
                         header += (
                             "from opensemantic.base import Software, PrefectFlow\n"
                         )
+                    if fetchSchemaParam.layout == "single":
+                        # provide the classes generated with the layout 'modules'
+                        header += "from osw.model import __getattr__\n"
 
                 content = re.sub(
                     pattern=r"(^class\s*\S*\s*\(\s*[\S\s]*?\s*\)\s*:.*\n)",
@@ -899,28 +1425,30 @@ class OSW(BaseModel):
                     flags=re.MULTILINE,
                 )  # add header before first class declaration
 
+            if fetchSchemaParam.layout == "modules":
+                # the modules of the referenced schemas are generated before
+                index_modules = OSW._read_generated_index()["modules"]
+                ref_modules = {}
+                for title in OSW._get_schema_closure(
+                    schema_title, fetchSchemaParam.fetched_schemas
+                )[1:]:
+                    ref_module = OSW._get_generated_module_name(title)
+                    if ref_module in index_modules:
+                        ref_modules[ref_module] = index_modules[ref_module]["classes"]
+                content = OSW._import_generated_classes(
+                    content, module_name, ref_modules
+                )
+
             if fetchSchemaParam.mode == "append":
                 org_content = ""
                 with open(result_model_path, "r", encoding="utf-8") as f:
                     org_content = f.read()
 
-                pattern = re.compile(
-                    r"^class\s*([\S]*)\s*\(\s*[\S\s]*?\s*\)\s*:.*\n", re.MULTILINE
-                )  # match class definition [\s\S]*(?:[^\S\n]*\n){2,}
-                for cls in re.findall(pattern, org_content):
-                    content = re.sub(
-                        r"^(class\s*"
-                        + cls
-                        + r"\s*\(\s*[\S\s]*?\s*\)\s*:.*\n[\s\S]*?(?:[^\S\n]*\n){3,})",
-                        "",
-                        content,
-                        count=1,
-                        flags=re.MULTILINE,
-                    )  # replace duplicated classes
-
-                # combine original and new content
-                all_content = org_content + "\n\n\n" + content
-                content = all_content
+                # combine original and new content, with overwrite the new
+                #  definitions of duplicated classes are kept
+                content = merge_generated_code(
+                    org_content, content, fetchSchemaParam.overwrite
+                )
 
             if fetchSchemaParam.final:
                 # Resolve bare OSW ID type hints (e.g. OSW3886...)
@@ -929,79 +1457,58 @@ class OSW(BaseModel):
                 content = resolve_osw_id_type_hints(content)
 
                 # Cleanup the combined content
-                # find all "<cls>.update_forward_refs()" lines,
-                # remove duplicates and put them to EOF
-                # do the same for "<cls>.model_rebuild()"
+                # move all "<cls>.update_forward_refs()" lines (or
+                # "<cls>.model_rebuild()") without duplicates to EOF and all import
+                # statements to the beginning of the file
                 func_list = []
                 if data_model_type == "pydantic.BaseModel":
                     func_list.append("update_forward_refs")
                 if data_model_type == "pydantic_v2.BaseModel":
                     func_list.append("model_rebuild")
-                for func in func_list:
-                    pattern_forward_ref = re.compile(r"(\w+)\." + func + r"\(\s*\)\s*")
-                    forward_refs = pattern_forward_ref.findall(content)
-                    if forward_refs:
-                        # remove all occurrences
-                        content = pattern_forward_ref.sub("", content)
-                    # add unique occurrences to the end of the file
-                    unique_forward_refs = list()
-                    for cls in forward_refs:
-                        if f"{cls}.{func}()\n" not in unique_forward_refs:
-                            unique_forward_refs.append(f"{cls}.{func}()\n")
-                    content += "\n" + "".join(sorted(unique_forward_refs))
-
-                # Moves all single-line import statements to the beginning of the file.
-                import_pattern = (
-                    r"^(?:\s*#\s*[^\n]*\n)?"
-                    r"(?:from\s+(\w+(?:\.\w+)*)\s+)?import\s+(?:\w+(?:\s+as\s+\w+)?(?:\s*,\s*\w+(?:\s+as\s+\w+)?)*)"
-                    r"|^(?:\s*#\s*[^\n]*\n)?(?:from\s+(\w+(?:\.\w+)*)\s+import\s+\((?:[^\n]*\n?)*?\))\s*(?:#\s*[^\n]*)?$"
-                )
-
-                # iterate over the matches
-                # collect full import statements to move them to the top
-                # replace the original location with an empty string
-                imports = []
-                for match in re.finditer(import_pattern, content, re.MULTILINE):
-                    import_stmt = match.group(0)
-                    # # if "from __future__ import annotations" insert at index 0
-                    # if import_stmt.strip() == "from __future__ import annotations":
-                    #     imports.insert(0, import_stmt)
-                    # else:
-                    imports.append(import_stmt)
-                    # replace all occurrences with empty string
-                    # make sure to use match line start and end since import pattern
-                    # may overlap partially, e.g.
-                    # from datetime import date
-                    # from datetime import date, datetime
-                    print("Replace import statement:", import_stmt)
-                    content = re.sub(
-                        r"^" + re.escape(import_stmt) + r"$",
-                        "",
-                        content,
-                        flags=re.MULTILINE,
-                    )
-                    # remove duplicate imports (done by isort later)
-                    imports = list(set(imports))
-                # add imports to the beginning of the file
-                content = "\n".join(sorted(imports)) + "\n\n" + content
+                content = consolidate_imports_and_forward_refs(content, func_list)
 
                 # remove contrains from ForwardRefs
                 content = remove_constraints_from_forward_refs(content)
 
-                # run formatting tool black on the combined content
-                # consolidate imports as well
-                try:
-                    content = black.format_str(content, mode=black.Mode())
-                    # run isort to sort imports using Vertical Hanging Indent style
-                    content = isort.code(content, profile="black")
-                except Exception:
-                    pass  # black is optional, continue without formatting
-
-            with open(result_model_path, "w", encoding="utf-8") as f:
+                if fetchSchemaParam.format_code:
+                    # run formatting tool black on the combined content
+                    # consolidate imports as well
+                    try:
+                        import black
+                        import isort
+
+                        content = black.format_str(content, mode=black.Mode())
+                        # run isort to sort imports using Vertical Hanging Indent
+                        #  style
+                        content = isort.code(content, profile="black")
+                    except Exception:
+                        pass  # black is optional, continue without formatting
+
+            if fetchSchemaParam.layout == "modules":
+                package_path = get_generated_package_path()
+                os.makedirs(package_path, exist_ok=True)
+                init_path = os.path.join(package_path, "__init__.py")
+                if not os.path.exists(init_path):
+                    with open(init_path, "w", encoding="utf-8") as f:
+                        f.write("# modules generated by OSW.fetch_schema()\n")
+
+            # write to a temporary file first, other processes may import the
+            #  module concurrently
+            tmp_path = f"{result_model_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 f.write(content)
+            os.replace(tmp_path, result_model_path)
 
-            if fetchSchemaParam.final:
+            if fetchSchemaParam.layout == "modules":
+                OSW._update_generated_index(module_name, schema_title, content)
+                module = sys.modules.get(f"{GENERATED_PACKAGE}.{module_name}")
+                if module is not None:
+                    importlib.reload(module)  # reload the updated module
+                if not site_cache_state:
+                    self.site.disable_cache()  # restore original state
+            elif fetchSchemaParam.final:
                 importlib.reload(model)  # reload the updated module
+                _model_file_hash = _get_file_hash(model.__file__)
                 if not site_cache_state:
                     self.site.disable_cache()  # restore original state
 
@@ -1010,70 +1517,307 @@ class OSW(BaseModel):
             warning_messages=fetchSchemaParam.warning_messages,
         )
 
-    def install_dependencies(
-        self,
-        dependencies: Dict[str, str] = None,
-        mode: str = "append",
-        policy: str = "force",
-    ):
-        """Installs data models, listed in the dependencies, in the osw.model.entity
-        module.
+    def _fetch_schema_closure(
+        self, fetchSchemaParam: _FetchSchemaParam
+    ) -> Optional[str]:
+        """Fetches the schema and the schemas it references (recursively) and
+        preprocesses them for the code generation. The fetched schemas are recorded
+        in fetchSchemaParam, their documents in fetchSchemaParam.schema_documents.
 
         Parameters
         ----------
-        dependencies
-            A dictionary with the keys being the names of the dependencies and the
-            values being the full page name (IRI) of the dependencies.
-        mode
-            The mode to use when loading the dependencies. Default is 'append',
-            which will keep existing data models and only load the missing ones. The
-            mode 'replace' will replace all existing data models with the new ones.
-        policy
-            The policy to use when loading the dependencies. Default is 'force',
-            which will always load the dependencies. If policy is 'if-missing',
-            dependencies will only be loaded if they are not already installed.
-            This may lead to outdated dependencies, if the dependencies have been
-            updated on the server. If policy is 'if-outdated', dependencies will only
-            be loaded if they were updated on the server. (not implemented yet)
+        fetchSchemaParam
+            See _FetchSchemaParam
+
+        Returns
+        -------
+            An error message if the schema page does not exist, else None
         """
-        if dependencies is None:
-            if default_params.dependencies is None:
-                raise ValueError(
-                    "No 'dependencies' parameter was passed to "
-                    "install_dependencies() and "
-                    "osw.defaults.params.dependencies was not set!"
+        schema_title = fetchSchemaParam.schema_title
+
+        # discover the referenced schemas breadth-first and fetch each level in a
+        #  single batched request. Schemas fetched before (e.g. for another title of
+        #  the same fetch_schema() call) are not fetched again.
+        frontier = []
+        if schema_title not in fetchSchemaParam.fetched_schema_titles:
+            frontier.append(schema_title)
+        while frontier:
+            fetchSchemaParam.fetched_schema_titles.extend(frontier)
+            pages = self._get_schema_pages(frontier, fetchSchemaParam.offline_pages)
+            next_frontier = []
+            for title in frontier:
+                page = pages.get(title)
+                offline = (
+                    fetchSchemaParam.offline_pages is not None
+                    and title in fetchSchemaParam.offline_pages
                 )
-            dependencies = default_params.dependencies
-        schema_fpts = []
-        for k, v in dependencies.items():
-            if policy != "if-missing" or not hasattr(model, k):
-                schema_fpts.append(v)
-            if policy == "if-outdated":
-                raise NotImplementedError(
-                    "The policy 'if-outdated' is not implemented yet."
+                if page is None or not (offline or page.exists):
+                    print(f"Error: Page {title} does not exist")
+                    if title == schema_title:
+                        return f"Page {title} does not exist"
+                    continue
+                schema, ref_schema_titles = self._prepare_schema(
+                    title, page, fetchSchemaParam
                 )
-        schema_fpts = list(set(schema_fpts))
-        for schema_fpt in schema_fpts:
-            if not schema_fpt.count(":") == 1:
-                raise ValueError(
-                    f"Full page title '{schema_fpt}' does not have the correct format. "
-                    "It should be 'Namespace:Name'."
+                schema_str = json.dumps(schema, ensure_ascii=False, indent=4).replace(
+                    "dollarref", "$ref"
                 )
-        self.fetch_schema(OSW.FetchSchemaParam(schema_title=schema_fpts, mode=mode))
+                fetchSchemaParam.schema_documents[title] = schema_str
+                fetchSchemaParam.fetched_schemas[title] = {
+                    "revision_id": page.get_revision_id(),
+                    "sha256": hashlib.sha256(schema_str.encode()).hexdigest(),
+                    "refs": ref_schema_titles,
+                }
+                for ref_schema_title in ref_schema_titles:
+                    if (
+                        ref_schema_title not in fetchSchemaParam.fetched_schema_titles
+                        and ref_schema_title not in next_frontier
+                    ):
+                        next_frontier.append(ref_schema_title)
+            frontier = next_frontier
+        return None
 
-    @staticmethod
-    def check_dependencies(dependencies: Dict[str, str]) -> List[str]:
-        """Check if the dependencies are installed in the osw.model.entity module.
+    def _get_schema_pages(
+        self, titles: List[str], offline_pages: Optional[Dict[str, WtPage]] = None
+    ) -> Dict[str, WtPage]:
+        """Loads the pages of the given schemas, the online pages in batched requests
+        with only the slots holding the schemas
 
         Parameters
         ----------
-        dependencies
-            A dictionary with the keys being the names of the dependencies and the
-            values being the full page name (IRI) of the dependencies.
+        titles
+            The full titles of the schema pages
+        offline_pages
+            pages to be used offline instead of fetching them from the OSW instance
+
+        Returns
+        -------
+            Dictionary with the titles as keys and the pages as values. Invalid
+            titles are omitted.
         """
-        return [dep for dep in dependencies if not hasattr(model, dep)]
+        pages = {}
+        online_titles = []
+        for title in titles:
+            if offline_pages is not None and title in offline_pages:
+                print(f"Fetch {title} from offline pages")
+                pages[title] = offline_pages[title]
+            else:
+                print(f"Fetch {title} from online pages")
+                online_titles.append(title)
+        if online_titles:
+            # not only in the JsonSchema namespace the schema is located in the main
+            #  slot, in all other namespaces, the jsonschema slot is used
+            slots = sorted(
+                {
+                    "main" if title.startswith("JsonSchema:") else "jsonschema"
+                    for title in online_titles
+                }
+            )
+            pages.update(self.site.prefetch_pages(online_titles, slots=slots))
+        return pages
 
-    def ensure_dependencies(self, dependencies: Dict[str, str]):
+    @staticmethod
+    def _prepare_schema(
+        schema_title: str, page: WtPage, fetchSchemaParam: _FetchSchemaParam
+    ) -> Tuple[dict, List[str]]:
+        """Preprocesses the schema of a page for the code generation and replaces
+        references to other schemas with references to their local files
+
+        Parameters
+        ----------
+        schema_title
+            The full title of the schema page
+        page
+            The schema page
+        fetchSchemaParam
+            The param of the fetch, collects the warning messages
+
+        Returns
+        -------
+            The schema (with '$ref' replaced by 'dollarref') and the full titles of
+            the referenced schemas
+        """
+        schema_name = schema_title.split(":")[-1]
+        # not only in the JsonSchema namespace the schema is located in the main slot
+        # in all other namespaces, the json_schema slot is used
+        if schema_title.startswith("JsonSchema:"):
+            schema_str = ""
+            if page.get_slot_content("main"):
+                schema_str = json.dumps(page.get_slot_content("main"))
+        else:
+            schema_str = ""
+            if page.get_slot_content("jsonschema"):
+                schema = merge_generated_definitions(
+                    deepcopy(page.get_slot_content("jsonschema"))
+                )
+                schema_str = json.dumps(schema)
+        if (schema_str is None) or (schema_str == ""):
+            print(f"Warning: Schema slot of {schema_title} is empty")
+            schema_str = "{}"  # empty schema to make reference work
+            if fetchSchemaParam.warning_messages is None:
+                fetchSchemaParam.warning_messages = []
+            fetchSchemaParam.warning_messages.append(
+                f"Schema slot of {schema_title} is empty"
+            )
+
+        generator = Generator()
+        schemas_for_preprocessing = [json.loads(schema_str)]
+        generator.preprocess(
+            Generator.GenerateParams(json_schemas=schemas_for_preprocessing)
+        )
+        schema_str = json.dumps(schemas_for_preprocessing[0])
+
+        schema = json.loads(schema_str.replace("$ref", "dollarref"))
+
+        ref_schema_titles = []
+        jsonpath_expr = parse("$..dollarref")
+        for match in jsonpath_expr.find(schema):
+            # value = "https://" + self.mw_site.host + match.value
+            if match.value.startswith("#"):
+                continue  # skip self references
+            ref_schema_title = match.value.replace("/wiki/", "").split("?")[0]
+            ref_schema_name = ref_schema_title.split(":")[-1] + ".json"
+            value = ""
+            for _i in range(0, schema_name.count("/")):
+                value += "../"  # created relative path to top-level schema dir
+            value += ref_schema_name  # create a reference to a local file
+            # keep document-relative jsonpointer if present
+            if "#/" in match.value:
+                value += "#/" + match.value.split("#/")[-1]
+            match.full_path.update_or_create(schema, value)
+            # print(f"replace {match.value} with {value}")
+            if (
+                ref_schema_title != schema_title
+                and ref_schema_title not in ref_schema_titles
+            ):  # prevent recursion in case of self references
+                ref_schema_titles.append(ref_schema_title)
+        return schema, ref_schema_titles
+
+    def install_dependencies(
+        self,
+        dependencies: Dict[str, str] = None,
+        mode: str = "append",
+        policy: str = "force",
+        layout: str = "single",
+    ):
+        """Installs data models, listed in the dependencies, in the osw.model.entity
+        module.
+
+        Parameters
+        ----------
+        dependencies
+            A dictionary with the keys being the names of the dependencies and the
+            values being the full page name (IRI) of the dependencies.
+        mode
+            The mode to use when loading the dependencies. Default is 'append',
+            which will keep existing data models and only load the missing ones. The
+            mode 'replace' will replace all existing data models with the new ones.
+        policy
+            The policy to use when loading the dependencies. Default is 'force',
+            which will always load the dependencies. If policy is 'if-missing',
+            dependencies will only be loaded if they are not already installed.
+            This may lead to outdated dependencies, if the dependencies have been
+            updated on the server. If policy is 'if-outdated', dependencies will only
+            be loaded if they are missing or if they or one of the schemas they
+            depend on were updated on the server since their generation. In append
+            mode, the existing classes of these dependencies are replaced.
+        layout
+            The layout of the generated code, 'single' (osw.model.entity) or
+            'modules' (one module per dependency), see OSW.FetchSchemaParam.layout
+        """
+        if dependencies is None:
+            if default_params.dependencies is None:
+                raise ValueError(
+                    "No 'dependencies' parameter was passed to "
+                    "install_dependencies() and "
+                    "osw.defaults.params.dependencies was not set!"
+                )
+            dependencies = default_params.dependencies
+        schema_fpts = []
+        if policy == "if-outdated":
+            schema_fpts = self._get_outdated_dependencies(dependencies, layout)
+        else:
+            for k, v in dependencies.items():
+                if policy != "if-missing" or not hasattr(model, k):
+                    schema_fpts.append(v)
+        schema_fpts = list(set(schema_fpts))
+        for schema_fpt in schema_fpts:
+            if not schema_fpt.count(":") == 1:
+                raise ValueError(
+                    f"Full page title '{schema_fpt}' does not have the correct format. "
+                    "It should be 'Namespace:Name'."
+                )
+        if policy == "if-outdated" and not schema_fpts:
+            print("All dependencies are up to date")
+            return
+        self.fetch_schema(
+            OSW.FetchSchemaParam(
+                schema_title=schema_fpts,
+                mode=mode,
+                overwrite=policy == "if-outdated",
+                layout=layout,
+            )
+        )
+
+    def _get_outdated_dependencies(
+        self, dependencies: Dict[str, str], layout: str = "single"
+    ) -> List[str]:
+        """Determines the dependencies that are missing in osw.model.entity or whose
+        schemas (including the schemas they depend on) have been updated on the
+        server since the generation of the model, using the generation manifest and
+        a single batched probe of all schema pages
+
+        Parameters
+        ----------
+        dependencies
+            A dictionary with the keys being the names of the dependencies and the
+            values being the full page name (IRI) of the dependencies.
+        layout
+            The layout of the generated code, see OSW.FetchSchemaParam.layout
+
+        Returns
+        -------
+            The full page names of the outdated dependencies
+        """
+        model_path = OSW._get_model_path(layout=layout)
+        manifest = OSW._read_generation_manifest(OSW._get_manifest_path(model_path))
+        if manifest is None or manifest.get("model_sha256") != _get_file_hash(
+            model_path
+        ):
+            # the generated schemas are unknown
+            return list(dependencies.values())
+        roots = manifest.get("roots", {})
+        schemas = manifest.get("schemas", {})
+        titles = set()
+        for title in dependencies.values():
+            titles.update(roots.get(title, [title]))
+        revision_ids = self.site.get_revision_ids(sorted(titles))
+
+        outdated = []
+        for name, title in dependencies.items():
+            if not hasattr(model, name) or title not in roots:
+                outdated.append(title)
+                continue
+            for schema_title in roots[title]:
+                revision_id = schemas.get(schema_title, {}).get("revision_id")
+                if revision_id is None or revision_ids.get(schema_title) != revision_id:
+                    outdated.append(title)
+                    break
+        return outdated
+
+    @staticmethod
+    def check_dependencies(dependencies: Dict[str, str]) -> List[str]:
+        """Check if the dependencies are installed in the osw.model.entity module.
+
+        Parameters
+        ----------
+        dependencies
+            A dictionary with the keys being the names of the dependencies and the
+            values being the full page name (IRI) of the dependencies.
+        """
+        return [dep for dep in dependencies if not hasattr(model, dep)]
+
+    def ensure_dependencies(self, dependencies: Dict[str, str]):
         """Ensure that the dependencies are installed in the osw.model.entity module.
 
         Parameters
@@ -1104,6 +1848,15 @@ class OSW(BaseModel):
         """If true, disable the cache for the loading process"""
         offline_pages: Optional[Dict[str, WtPage]] = None
         """pages to be used offline instead of fetching them from the OSW instance"""
+        trusted: bool = False
+        """If true, the entities are constructed without the full validation, since
+        the jsondata has already been validated against the schema by the OSW
+        instance. Use osw.utils.construct.validate_constructed() to validate an
+        entity on demand."""
+        processes: Optional[int] = None
+        """If set to more than one, the jsondata of the entities is validated by a
+        pool of this many worker processes (not used with trusted=True). Entities of
+        classes that can not be imported by the workers are created in-process."""
 
         class Config:
             arbitrary_types_allowed = True  # allow any class as type
@@ -1173,72 +1926,103 @@ class OSW(BaseModel):
 
         entities = []
         pages = self.site.get_page(
-            WtSite.GetPageParam(titles=param.titles, offline_pages=param.offline_pages)
+            WtSite.GetPageParam(
+                titles=param.titles,
+                offline_pages=param.offline_pages,
+                slots=["jsondata"],
+            )
         ).pages
+        use_processes = (
+            param.processes is not None and param.processes > 1 and not param.trusted
+        )
+        jsondata_list = []
         for page in pages:
-            entity = None
-            schemas = []
-            schemas_fetched = True
             jsondata = page.get_slot_content("jsondata")
-            if param.remove_empty:
+            if param.remove_empty and not use_processes:
                 remove_empty(jsondata)
-            if jsondata:
-                for category in jsondata["type"]:
-                    schema = (
-                        self.site.get_page(
-                            WtSite.GetPageParam(
-                                titles=[category], offline_pages=param.offline_pages
-                            )
-                        )
-                        .pages[0]
-                        .get_slot_content("jsonschema")
-                    )
-                    schemas.append(schema)
-                    # generate model if not already exists
-                    cls_name: str = schema["title"]
-                    # If a schema_to_use is provided, we do not need to check if the
-                    #  model exists
-                    if not param.model_to_use:
-                        if not hasattr(model, cls_name):
-                            if param.autofetch_schema:
-                                self.fetch_schema(
-                                    OSW.FetchSchemaParam(
-                                        schema_title=category,
-                                        mode="append",
-                                        offline_pages=param.offline_pages,
-                                    )
-                                )
-                        if not hasattr(model, cls_name):
-                            schemas_fetched = False
-                            print(
-                                f"Error: Model {cls_name} not found. Schema {category} "
-                                f"needs to be fetched first."
-                            )
-            if not schemas_fetched:
-                continue
-
-            try:
-                if param.model_to_use:
-                    entity: model.OswBaseModel = param.model_to_use(**jsondata)
-
-                elif len(schemas) == 0:
-                    _logger.error("Error: no schema defined")
+            jsondata_list.append(jsondata)
+        if not param.model_to_use:
+            # resolve the classes of all pages at once to fetch missing schemas
+            #  in a single code generation pass
+            self._resolve_model_classes(
+                [jsondata["type"] for jsondata in jsondata_list if jsondata], param
+            )
 
-                elif len(schemas) == 1:
-                    cls: Type[model.Entity] = getattr(model, schemas[0]["title"])
-                    entity: model.Entity = cls(**jsondata)
+        classes = []
+        for jsondata in jsondata_list:
+            cls = None
+            if param.model_to_use:
+                cls = param.model_to_use
+            elif not jsondata or len(jsondata.get("type", [])) == 0:
+                _logger.error("Error: no schema defined")
+            else:
+                cls = self._model_class_cache.get(tuple(jsondata["type"]))
+            classes.append(cls)
+
+        # entities from the entity cache
+        cached: Dict[int, OswBaseModel] = {}
+        cache_keys = []
+        for index, (page, cls) in enumerate(zip(pages, classes)):
+            revision_id = page.get_revision_id()
+            cache_key = None
+            if cls is not None and revision_id is not None and not param.disable_cache:
+                # entities of trusted loads are not validated, they are served only
+                #  to trusted loads
+                cache_key = (revision_id, cls, param.remove_empty, param.trusted)
+                entity = self._entity_cache.get(page.title, cache_key)
+                if entity is not None:
+                    cached[index] = entity
+            cache_keys.append(cache_key)
+        # validated jsondata as JSON string from the workers
+        validated: Dict[int, str] = {}
+        errors: Dict[int, str] = {}
+        if use_processes:
+            validated, errors = self._validate_in_processes(
+                [cls if i not in cached else None for i, cls in enumerate(classes)],
+                jsondata_list,
+                param,
+            )
 
+        for index, (page, jsondata, cls) in enumerate(
+            zip(pages, jsondata_list, classes)
+        ):
+            entity = None
+            if cls is None:
+                continue
+            if index in cached:
+                entities.append(cached[index])
+                continue
+            data = None  # data to construct the entity from without validation
+            try:
+                if index in errors:
+                    raise ValueError(errors[index])
+                if index in validated:
+                    data = json.loads(validated[index])
                 else:
-                    bases = []
-                    for schema in schemas:
-                        bases.append(getattr(model, schema["title"]))
-                    cls = create_model("Test", __base__=tuple(bases))
-                    entity: model.Entity = cls(**jsondata)
+                    if use_processes and param.remove_empty:
+                        remove_empty(jsondata)
+                    if param.trusted:
+                        data = jsondata
+                    else:
+                        entity: model.Entity = cls(**jsondata)
+                if data is not None:
+                    if "meta" in cls.__fields__:
+                        # set the page metadata in advance instead of validated
+                        #  assignments to the entity
+                        if not data.get("meta"):
+                            data["meta"] = {}
+                        if not data["meta"].get("wiki_page"):
+                            data["meta"]["wiki_page"] = {}
+                        data["meta"]["wiki_page"].update(
+                            namespace=namespace_from_full_title(page.title),
+                            title=title_from_full_title(page.title),
+                        )
+                    entity: model.Entity = construct_trusted(cls, data)
             except Exception as e:
                 _logger.error(f"Error creating entity from page {page.title}: {e}")
                 entity = None
 
-            if entity is not None:
+            if entity is not None and data is None:
                 # make sure we do not override existing metadata
                 if not hasattr(entity, "meta") or entity.meta is None:
                     entity.meta = model.Meta()
@@ -1249,7 +2033,11 @@ class OSW(BaseModel):
                     entity.meta.wiki_page = model.WikiPage()
                 entity.meta.wiki_page.namespace = namespace_from_full_title(page.title)
                 entity.meta.wiki_page.title = title_from_full_title(page.title)
-
+            if entity is not None:
+                if cache_keys[index] is not None and index not in validated:
+                    # entities validated by the workers are constructed without
+                    #  validation in this process and are not cached
+                    self._entity_cache.set(page.title, cache_keys[index], entity)
                 entities.append(entity)
         # restore original cache state
         if cache_state:
@@ -1267,6 +2055,122 @@ class OSW(BaseModel):
         if isinstance(entity_title, OSW.LoadEntityParam):  # LoadEntityParam
             return OSW.LoadEntityResult(entities=entities)
 
+    def _validate_in_processes(
+        self,
+        classes: List[Optional[Type[OswBaseModel]]],
+        jsondata_list: List[Optional[dict]],
+        param: LoadEntityParam,
+    ) -> Tuple[Dict[int, str], Dict[int, str]]:
+        """Validates the jsondata of the entities in a process pool.
+
+        Parameters
+        ----------
+        classes
+            The model class of each entity, None if not resolved
+        jsondata_list
+            The jsondata of each entity
+        param
+            The LoadEntityParam of the calling load_entity()
+
+        Returns
+        -------
+            Two dictionaries mapping the index of the entity to its validated data
+            (as JSON string) or to an error message. Entities of classes not
+            importable by the workers are omitted.
+        """
+        work_items = []
+        specs = {}
+        for index, (cls, jsondata) in enumerate(zip(classes, jsondata_list)):
+            if cls is None:
+                continue
+            if cls not in specs:
+                specs[cls] = _get_model_class_spec(cls)
+            if specs[cls] is not None:
+                work_items.append((index, specs[cls], jsondata))
+        if len(work_items) == 0:
+            return {}, {}
+        # a few chunks per process to balance the load while keeping the
+        #  inter-process communication overhead low
+        chunk_size = max(1, -(-len(work_items) // (param.processes * 4)))
+        chunks = [
+            work_items[i : i + chunk_size]
+            for i in range(0, len(work_items), chunk_size)
+        ]
+        validated = {}
+        errors = {}
+        with ProcessPoolExecutor(max_workers=param.processes) as executor:
+            futures = [
+                executor.submit(_validate_jsondata_chunk, chunk, param.remove_empty)
+                for chunk in chunks
+            ]
+            for future in futures:
+                for index, success, data in future.result():
+                    if success:
+                        validated[index] = data
+                    else:
+                        errors[index] = data
+        return validated, errors
+
+    def _resolve_model_classes(
+        self, type_lists: List[List[str]], param: LoadEntityParam
+    ) -> None:
+        """Resolves the model classes for the given categories ('type' of entities)
+        and stores them in the model class cache. If param.autofetch_schema is set,
+        all schemas missing in osw.model.entity are fetched in a single
+        fetch_schema() call.
+
+        Parameters
+        ----------
+        type_lists
+            The 'type' (list of category full page titles) of each entity
+        param
+            The LoadEntityParam of the calling load_entity()
+        """
+        type_tuples = list(
+            dict.fromkeys(
+                tuple(types)
+                for types in type_lists
+                if tuple(types) not in self._model_class_cache
+            )
+        )
+        if len(type_tuples) == 0:
+            return
+        categories = list(dict.fromkeys(c for types in type_tuples for c in types))
+        cls_names: Dict[str, str] = {}
+        for page in self.site.get_page(
+            WtSite.GetPageParam(titles=categories, offline_pages=param.offline_pages)
+        ).pages:
+            schema = page.get_slot_content("jsonschema")
+            if schema and "title" in schema:
+                cls_names[page.title] = schema["title"]
+        # generate models if not already existing
+        missing = [
+            category
+            for category in categories
+            if category in cls_names and not hasattr(model, cls_names[category])
+        ]
+        if len(missing) > 0 and param.autofetch_schema:
+            self.fetch_schema(
+                OSW.FetchSchemaParam(
+                    schema_title=missing,
+                    mode="append",
+                    offline_pages=param.offline_pages,
+                )
+            )
+        for types in type_tuples:
+            bases = []
+            for category in types:
+                cls_name = cls_names.get(category)
+                if cls_name is None or not hasattr(model, cls_name):
+                    print(
+                        f"Error: Model {cls_name} not found. Schema {category} "
+                        f"needs to be fetched first."
+                    )
+                    break
+                bases.append(getattr(model, cls_name))
+            else:
+                self._model_class_cache[types] = get_composed_model_class(tuple(bases))
+
     class OverwriteClassParam(OswBaseModel):
         model: Type[OswBaseModel]  # ModelMetaclass
         """The model class for which this is the overwrite params object."""
@@ -1389,27 +2293,59 @@ class OSW(BaseModel):
                     overwrite=self.policy,
                 )
 
+    @staticmethod
+    def _get_overwrite_patch(
+        remote_jsondata: dict, local_jsondata: dict, policy: OSW.OverwriteClassParam
+    ) -> dict:
+        """Determines the properties of the remote jsondata to be changed according
+        to the (per property) overwrite policy:
+        * properties not present in the remote jsondata are added
+        * properties with the setting True are overwritten
+        * properties with the setting 'only empty' are overwritten if the remote value
+          is empty
+        * all other properties are kept
+        todo: include logic for hidden and read_only properties!
+
+        Parameters
+        ----------
+        remote_jsondata:
+            The jsondata of the existing page
+        local_jsondata:
+            The jsondata of the entity to store
+        policy:
+            The overwrite policy
+
+        Returns
+        -------
+            The properties with changed values, an empty dict if the remote jsondata
+            is up to date
+        """
+        patch = {}
+        for key, value in local_jsondata.items():
+            if key in remote_jsondata:
+                setting = policy.get_overwrite_setting(key)
+                if not (
+                    setting == OverwriteOptions.true
+                    or setting == OverwriteOptions.only_empty
+                    and is_empty(remote_jsondata[key])
+                ):
+                    continue
+                if remote_jsondata[key] == value:
+                    continue
+            patch[key] = value
+        return patch
+
     @staticmethod
     def _apply_overwrite_policy(param: OSW._ApplyOverwriteParam) -> WtPage:
+        """Applies the overwrite policy to the page of the entity. The page content is
+        only changed (see WtPage.has_unsaved_changes()) if the stored entity differs
+        from the remote one."""
         if param.inplace:
             page = param.page
         else:
-            page = deepcopy(param.page)
+            page = param.page.shallow_copy()
         entity_title = f"{param.namespace}:{get_title(param.entity)}"
 
-        def set_content(content_to_set: dict) -> None:
-            if param.debug:
-                print(f"content_to_set: {str(content_to_set)}")
-            for slot_ in content_to_set.keys():
-                page.set_slot_content(slot_, content_to_set[slot_])
-
-        # Create a variable to hold the new content
-        new_content = {
-            # required for json parsing and header rendering
-            "header": "{{#invoke:Entity|header}}",
-            # required for footer rendering
-            "footer": "{{#invoke:Entity|footer}}",
-        }
         # Take the shortcut if
         # 1. page does not exist AND any setting of overwrite
         # 2. overwrite is "replace remote"
@@ -1419,11 +2355,28 @@ class OSW(BaseModel):
             or param.offline is True
         ):
             # Use pydantic serialization, skip none values:
-            new_content["jsondata"] = json.loads(param.entity.json(exclude_none=True))
+            new_content = {
+                # required for json parsing and header rendering
+                "header": "{{#invoke:Entity|header}}",
+                # required for footer rendering
+                "footer": "{{#invoke:Entity|footer}}",
+                "jsondata": json.loads(param.entity.json(exclude_none=True)),
+            }
             if param.remove_empty:
                 remove_empty(new_content["jsondata"])
-            set_content(new_content)
-            page.changed = True
+            if param.debug:
+                print(f"content_to_set: {str(new_content)}")
+            for slot, content in new_content.items():
+                remote = page.get_slot_content(slot, clone=False)
+                if slot == "jsondata" and isinstance(remote, dict):
+                    # the meta data (e.g. the change_id of this call) differs for
+                    #  every call and is only stored along with other changes
+                    if _without_meta(remote) == _without_meta(content):
+                        continue
+                elif remote == content:
+                    continue
+                page.set_slot_content(slot, content)
+            page.changed = param.offline is True or page.has_unsaved_changes()
             return page  # Guard clause --> exit function
         # 3. pages does exist AND overwrite is "keep existing"
         if (
@@ -1441,92 +2394,32 @@ class OSW(BaseModel):
         # 4.2 If overwrite is False --> don't overwrite existing properties
         # 4.3 If overwrite is "only empty" --> overwrite existing properties if
         #     they are empty
-        # * Download page
-        # * Merge slots selectively based on per_property
-
-        # Create variables to hold local and remote content prior to merging
-        local_content = {}
-        remote_content = {}
-        # Get the remote content
-        for slot in ["jsondata", "header", "footer"]:  # SLOTS:
-            remote_content[slot] = page.get_slot_content(slot)
-            # Todo: remote content does not contain properties that are not set
+        # Only the difference between the remote and the local content is applied
+        for slot in ["header", "footer"]:
+            if not page.get_slot_content(slot, clone=False):  # None or {} or ""
+                page.set_slot_content(slot, "{{#invoke:Entity|" + slot + "}}")
+        original_jsondata = page.get_slot_content("jsondata", clone=False)
+        remote_jsondata = page.get_slot_content("jsondata") or {}
+        # Todo: remote content does not contain properties that are not set
         if param.remove_empty:
-            remove_empty(remote_content["jsondata"])
-        if remote_content["header"]:  # not None or {} or ""
-            new_content["header"] = remote_content["header"]
-        if remote_content["footer"]:
-            new_content["footer"] = remote_content["footer"]
-        if param.debug:
-            print(f"'remote_content': {str(remote_content)}")
-        # Get the local content
+            remove_empty(remote_jsondata)
         # Properties that are not set in the local content will be set to None
         # We want those not to be listed as keys
-        local_content["jsondata"] = json.loads(param.entity.json(exclude_none=True))
+        local_jsondata = json.loads(param.entity.json(exclude_none=True))
         if param.remove_empty:
-            remove_empty(local_content["jsondata"])
-        if param.debug:
-            print(f"'local_content': {str(local_content)}")
-        # Apply the overwrite logic
-        # a) If there is a key in the remote content that is not in the local
-        #    content, we have to keep it
-        if remote_content["jsondata"] is None:
-            remote_content["jsondata"] = {}
-        new_content["jsondata"] = remote_content["jsondata"]
-        # new_content["jsondata"] = {
-        #     key: value
-        #     for (key, value) in remote_content["jsondata"].items()
-        #     if key not in local_content["jsondata"].keys()
-        # }
-        if param.debug:
-            print(f"'New content' after 'remote' update: {str(new_content)}")
-        # b) If there is a key in the local content that is not in the remote
-        #    content, we have to keep it
-        new_content["jsondata"].update(
-            {
-                key: value
-                for (key, value) in local_content["jsondata"].items()
-                if key not in remote_content["jsondata"].keys()
-            }
-        )
-        if param.debug:
-            print(f"'New content' after 'local' update: {str(new_content)}")
-        # c) If there is a key in both contents, we have to apply the overwrite
-        #    logic
-        # todo: include logic for hidden and read_only properties!
-        new_content["jsondata"].update(
-            {
-                key: value
-                for (key, value) in local_content["jsondata"].items()
-                if param.policy.get_overwrite_setting(key) == OverwriteOptions.true
-            }
-        )
-        if param.debug:
-            print(f"'New content' after 'True' update: {str(new_content)}")
-        new_content["jsondata"].update(
-            {
-                key: value
-                for (key, value) in remote_content["jsondata"].items()
-                if param.policy.get_overwrite_setting(key) == OverwriteOptions.false
-            }
-        )
-        if param.debug:
-            print(f"'New content' after 'False' update: {str(new_content)}")
-        new_content["jsondata"].update(
-            {
-                key: value
-                for (key, value) in local_content["jsondata"].items()
-                if (
-                    param.policy.get_overwrite_setting(key)
-                    == OverwriteOptions.only_empty
-                    and is_empty(remote_content["jsondata"].get(key))
-                )
-            }
-        )
+            remove_empty(local_jsondata)
+        patch = OSW._get_overwrite_patch(remote_jsondata, local_jsondata, param.policy)
+        if list(patch) == ["meta"]:
+            # the meta data (e.g. the change_id of this call) differs for every call
+            #  and is only stored along with other changes
+            patch = {}
         if param.debug:
-            print(f"'New content' after 'only empty' update: {str(new_content)}")
-            print(f"'New content' to be stored: {str(new_content)}")
-        set_content(new_content)
+            print(f"'remote_content': {str(remote_jsondata)}")
+            print(f"'local_content': {str(local_jsondata)}")
+            print(f"'patch' to be applied: {str(patch)}")
+        if patch or remote_jsondata != original_jsondata:
+            remote_jsondata.update(patch)
+            page.set_slot_content("jsondata", remote_jsondata)
         return page  # Guard clause --> exit function
 
     class StoreEntityParam(OswBaseModel):
@@ -1559,12 +2452,23 @@ class OSW(BaseModel):
         offline: Optional[bool] = False
         """If set to True, the processed entities are not upload but only returned as WtPages.
         Can be used to create WtPage objects from entities without uploading them."""
+        plan: Optional[bool] = False
+        """If set to True, nothing is written. The current pages are fetched and
+        compared with the entities and the changes are returned as
+        StoreEntityResult.plan, which can be written later with OSW.apply()."""
+        journal: Optional[StoreJournal] = None
+        """If set, the state of each entity (queued, in flight, committed, failed) is
+        recorded in this journal, to resume an interrupted run with
+        OSW.flush_journal()."""
         _overwrite_per_class: Dict[str, Dict[str, OSW.OverwriteClassParam]] = (
             PrivateAttr()
         )
         """Private attribute, for internal use only. Use 'overwrite_per_class'
         instead."""
 
+        class Config:
+            arbitrary_types_allowed = True
+
         def __init__(self, **data):
             super().__init__(**data)
             if not isinstance(self.entities, list):
@@ -1603,6 +2507,118 @@ class OSW(BaseModel):
                     self._overwrite_per_class["by name"][model_name] = param
                     self._overwrite_per_class["by type"][model_type] = param
 
+    def _get_meta_category_templates(
+        self, meta_category_titles: List[str]
+    ) -> Dict[str, Any]:
+        """Returns the compiled schema templates of the given meta categories and the
+        meta categories they inherit from. The meta categories are cached
+        process-wide by title and revision, so that only their current revision ids
+        are requested if they did not change since the last call. The templates are
+        compiled in memory unless osw.defaults.paths.template_cache_dir is set, in
+        which case the precompiled templates are cached in that directory.
+
+        Parameters
+        ----------
+        meta_category_titles:
+            The full titles of the meta categories
+
+        Returns
+        -------
+            Dictionary with the meta category titles as keys and the compiled
+            templates as values, the most generic template first
+        """
+        host = self.site.mw_site.host
+        templates = {}
+        visited = set()
+        # We have to do this iteratively to support meta categories inheritance
+        while meta_category_titles:
+            visited.update(meta_category_titles)
+            revision_ids = self.site.get_revision_ids(meta_category_titles)
+            with _meta_category_cache_lock:
+                entries = {
+                    title: _meta_category_cache.get((host, title))
+                    for title in meta_category_titles
+                }
+            outdated = [
+                title
+                for title, entry in entries.items()
+                if entry is None
+                or revision_ids.get(title) is None
+                or entry[0] != revision_ids[title]
+            ]
+            if outdated:
+                meta_categories = self.site.get_page(
+                    WtSite.GetPageParam(
+                        titles=outdated, slots=["jsondata", "schema_template"]
+                    )
+                ).pages
+                for meta_category in meta_categories:
+                    jsondata = meta_category.get_slot_content("jsondata") or {}
+                    entry = (
+                        meta_category.get_revision_id(),
+                        meta_category.get_slot_content("schema_template"),
+                        jsondata.get("subclass_of") or [],
+                    )
+                    entries[meta_category.title] = entry
+                    if entry[0] is not None:
+                        with _meta_category_cache_lock:
+                            _meta_category_cache[(host, meta_category.title)] = entry
+
+            next_titles = []
+            for title, entry in entries.items():
+                if entry is None:
+                    continue
+                _, template_str, subclass_of = entry
+                if template_str:
+                    templates[title] = get_compiled_handlebars_template(
+                        (host, title),
+                        template_str,
+                        cache_dir=default_paths.template_cache_dir,
+                    )
+                next_titles.extend(
+                    t for t in subclass_of if t not in visited and t not in next_titles
+                )
+            meta_category_titles = next_titles
+        # inverse order to have the most generic template first
+        return dict(reversed(templates.items()))
+
+    class StoreEntityPlan(OswBaseModel):
+        """Changes determined by store_entity() with plan=True, see OSW.apply()"""
+
+        change_id: str
+        """The ID of the change"""
+        pages: Dict[str, WtPage]
+        """The pages with changed content to be written"""
+        created: List[str]
+        """The full titles of the pages to be created"""
+        updated: List[str]
+        """The full titles of the existing pages to be updated"""
+        unchanged: List[str]
+        """The full titles of the entities whose page content is up to date"""
+        sizes: Dict[str, int]
+        """The number of bytes of the changed slot contents to be sent per page"""
+        base_revision_ids: Dict[str, Optional[int]] = {}
+        """The ids of the revisions the changes are based on per page, None for pages
+        to be created or if the revision is unknown. Pages changed since are not
+        written by apply()."""
+        levels: List[List[str]]
+        """The full titles of the pages in the order of upload, see
+        StoreEntityResult.levels"""
+        parallel: Optional[bool] = None
+        """If set to True, the pages of one level are written in parallel"""
+        edit_comment: Optional[str] = None
+        """Additional comment to explain the edit"""
+        bot_edit: Optional[bool] = True
+        """Mark the edit as bot edit"""
+
+        class Config:
+            arbitrary_types_allowed = True
+
+        @property
+        def byte_volume(self) -> int:
+            """The total number of bytes of the changed slot contents to be sent"""
+            return sum(self.sizes.values())
+
     class StoreEntityResult(OswBaseModel):
         """Result of store_entity()"""
 
@@ -1610,6 +2626,23 @@ class OSW(BaseModel):
         """The ID of the change"""
         pages: Dict[str, WtPage]
         """The pages that have been stored"""
+        levels: Optional[List[List[str]]] = None
+        """The full titles of the entities in the order of upload. Entities of one
+        level only reference entities of previous levels and have been uploaded in
+        parallel (if enabled)."""
+        critical_path: Optional[List[str]] = None
+        """The longest chain of entities referencing each other, which determines
+        the minimum number of upload levels"""
+        changed: Optional[List[str]] = None
+        """The full titles of the entities whose page content has been changed"""
+        unchanged: Optional[List[str]] = None
+        """The full titles of the entities whose page content was already up to date
+        and has therefore not been written"""
+        plan: Optional[OSW.StoreEntityPlan] = None
+        """The changes to be written, if store_entity() was called with plan=True"""
+        conflicts: Optional[List[str]] = None
+        """The full titles of the pages that have been changed or created by others
+        since the plan was made and have therefore not been written by apply()"""
 
         class Config:
             arbitrary_types_allowed = True
@@ -1636,35 +2669,17 @@ class OSW(BaseModel):
 
         max_index = len(param.entities)
         created_pages = {}
+        changed_titles = []
+        unchanged_titles = []
 
         meta_category_templates = {}
         if param.namespace == "Category":
             meta_category_titles = param.meta_category_title
             if not isinstance(meta_category_titles, list):
                 meta_category_titles = [meta_category_titles]
-            meta_category_template_strs = {}
-            # We have to do this iteratively to support meta categories inheritance
-            while meta_category_titles is not None and len(meta_category_titles) > 0:
-                meta_categories = self.site.get_page(
-                    WtSite.GetPageParam(titles=meta_category_titles)
-                ).pages
-                for meta_category in meta_categories:
-                    meta_category_template_strs[meta_category.title] = (
-                        meta_category.get_slot_content("schema_template")
-                    )
-
-                meta_category_titles = meta_category.get_slot_content("jsondata").get(
-                    "subclass_of"
-                )
-
-            for title in meta_category_template_strs.keys():
-                meta_category_template_str = meta_category_template_strs[title]
-                if meta_category_template_str:
-                    meta_category_templates[title] = compile_handlebars_template(
-                        meta_category_template_str
-                    )
-            # inverse order to have the most generic template first
-            meta_category_templates = dict(reversed(meta_category_templates.items()))
+            meta_category_templates = self._get_meta_category_templates(
+                meta_category_titles
+            )
 
         def store_entity_(
             entity_: model.Entity,
@@ -1695,11 +2710,14 @@ class OSW(BaseModel):
             if overwrite_class_param is None:
                 raise TypeError("'overwrite_class_param' must not be None!")
             entity_title = namespace_ + ":" + title_
+            page = prefetched_pages.get(entity_title)
+            if page is None:
+                page = WtPage(
+                    wtSite=self.site, title=entity_title, do_init=not param.offline
+                )
             page = self._apply_overwrite_policy(
                 OSW._ApplyOverwriteParam(
-                    page=WtPage(
-                        wtSite=self.site, title=entity_title, do_init=not param.offline
-                    ),
+                    page=page,
                     entity=entity_,
                     namespace=namespace_,
                     policy=overwrite_class_param,
@@ -1745,11 +2763,38 @@ class OSW(BaseModel):
                     )
                 ).aggregated_schema
                 page.set_slot_content("jsonschema", new_schema)
-            if param.offline is False:
-                page.edit(
-                    param.edit_comment, bot_edit=param.bot_edit
-                )  # will set page.changed if the content of the page has changed
-            if not param.offline and page.changed:
+            if not page.has_unsaved_changes():
+                # the page is up to date, skip the write path
+                unchanged_titles.append(page.title)
+                if journal is not None:
+                    journal.set_state(
+                        entity_title,
+                        JournalState.committed,
+                        revision_id=page.get_revision_id(),
+                    )
+            else:
+                changed_titles.append(page.title)
+                if param.offline is False and not param.plan:
+                    self._entity_cache.invalidate([entity_title])
+                    if journal is not None:
+                        journal.set_state(entity_title, JournalState.in_flight)
+                    page.edit(
+                        param.edit_comment, bot_edit=param.bot_edit
+                    )  # will set page.changed if the content of the page has changed
+                    if journal is not None:
+                        if page.has_unsaved_changes():
+                            journal.set_state(
+                                entity_title,
+                                JournalState.failed,
+                                error="The page could not be edited",
+                            )
+                        else:
+                            journal.set_state(
+                                entity_title,
+                                JournalState.committed,
+                                revision_id=page.get_revision_id(),
+                            )
+            if not param.offline and not param.plan and page.changed:
                 if index is None:
                     print(f"Entity stored at '{page.get_url()}'.")
                 else:
@@ -1805,6 +2850,83 @@ class OSW(BaseModel):
                 )
                 upload_index += 1
 
+        upload_titles: List[Optional[str]] = []
+        for upload_object in upload_object_list:
+            try:
+                namespace_ = upload_object.namespace or get_namespace(
+                    upload_object.entity
+                )
+                title_ = get_title(upload_object.entity)
+            except Exception:
+                namespace_ = title_ = None  # reported by store_entity_()
+            if namespace_ is not None and title_ is not None:
+                upload_titles.append(f"{namespace_}:{title_}")
+            else:
+                upload_titles.append(None)
+
+        # nothing is written in offline and plan mode
+        journal = None if param.offline or param.plan else param.journal
+        if journal is not None:
+            journal.add(
+                [
+                    JournalEntry(
+                        title=title,
+                        change_id=param.change_id,
+                        model=_get_model_class_spec(upload_object.entity.__class__),
+                        data=json.loads(upload_object.entity.json(exclude_none=True)),
+                    )
+                    for upload_object, title in zip(upload_object_list, upload_titles)
+                    if title is not None
+                ]
+            )
+
+        prefetched_pages: Dict[str, WtPage] = {}
+        if not param.offline:
+            # load all target pages in batched requests instead of two requests
+            #  per entity
+            try:
+                prefetched_pages = self.site.prefetch_pages(
+                    [title for title in upload_titles if title is not None]
+                )
+            except Exception as e:
+                _logger.warning(f"Prefetching the pages failed: {e}")
+
+        # Entities referencing other entities of this call (e.g. via 'type',
+        #  'subclass_of' or any other property) are uploaded after them
+        indices_by_title = {
+            title: index
+            for index, title in enumerate(upload_titles)
+            if title is not None
+        }
+        dependencies = {}
+        for index, upload_object in enumerate(upload_object_list):
+            dependencies[index] = [
+                indices_by_title[iri]
+                for iri in _get_referenced_iris(upload_object.entity)
+                if iri in indices_by_title
+            ]
+        levels, critical_path = get_dependency_levels(dependencies)
+        if levels:
+            previous = {index for level in levels[:-1] for index in level}
+            cyclic = [
+                upload_titles[index]
+                for index in levels[-1]
+                if any(
+                    dep not in previous and dep != index for dep in dependencies[index]
+                )
+            ]
+            if cyclic:
+                _logger.warning(
+                    f"Entities with cyclic references are uploaded in the last level: "
+                    f"{cyclic}"
+                )
+        if param.debug:
+            print(
+                f"Uploading {len(upload_object_list)} entities in {len(levels)} "
+                f"level(s). Critical path: "
+                f"{[upload_titles[i] for i in critical_path]}"
+            )
+
         def handle_upload_object_(upload_object: UploadObject) -> None:
             try:
                 store_entity_(
@@ -1816,17 +2938,232 @@ class OSW(BaseModel):
             except Exception as e:
                 entity_name = getattr(upload_object.entity, "name", None) or "unknown"
                 _logger.error(f"Error storing entity '{entity_name}': {e}")
+                title = upload_titles[upload_object.index]
+                if journal is not None and title is not None:
+                    journal.set_state(title, JournalState.failed, error=str(e))
+
+        for level in levels:
+            level_objects = [upload_object_list[index] for index in level]
+            if param.parallel and len(level_objects) > 1:
+                _ = parallelize(
+                    handle_upload_object_, level_objects, flush_at_end=param.debug
+                )
+            else:
+                _ = [
+                    handle_upload_object_(upload_object)
+                    for upload_object in level_objects
+                ]
+        title_levels = [
+            [upload_titles[index] for index in level if upload_titles[index]]
+            for level in levels
+        ]
+        plan = None
+        if param.plan:
+            planned_pages = {
+                title: created_pages[title]
+                for title in changed_titles
+                if title in created_pages
+            }
+            plan = OSW.StoreEntityPlan(
+                change_id=param.change_id,
+                pages=planned_pages,
+                created=[t for t, p in planned_pages.items() if not p.exists],
+                updated=[t for t, p in planned_pages.items() if p.exists],
+                unchanged=unchanged_titles,
+                sizes={
+                    title: sum(
+                        len(content.encode("utf-8"))
+                        for content in page.get_unsaved_slot_contents().values()
+                    )
+                    for title, page in planned_pages.items()
+                },
+                base_revision_ids={
+                    title: page.get_revision_id() if page.exists else None
+                    for title, page in planned_pages.items()
+                },
+                levels=title_levels,
+                parallel=param.parallel,
+                edit_comment=param.edit_comment,
+                bot_edit=param.bot_edit,
+            )
+            if param.debug:
+                print(
+                    f"Planned changes: {len(plan.created)} page(s) to create, "
+                    f"{len(plan.updated)} to update, {len(plan.unchanged)} "
+                    f"unchanged, {plan.byte_volume} bytes to send."
+                )
+        return OSW.StoreEntityResult(
+            change_id=param.change_id,
+            pages=created_pages,
+            levels=title_levels,
+            critical_path=[
+                upload_titles[index] for index in critical_path if upload_titles[index]
+            ],
+            changed=changed_titles,
+            unchanged=unchanged_titles,
+            plan=plan,
+        )
+
+    def apply(self, plan: StoreEntityPlan) -> StoreEntityResult:
+        """Writes the changes determined by store_entity() with plan=True. Only the
+        pages with changed content are sent. Pages that have been changed or created
+        by others since the plan was made are not written but reported as conflicts.
+
+        Parameters
+        ----------
+        plan:
+            The plan returned as StoreEntityResult.plan
 
-        if param.parallel:
-            _ = parallelize(
-                handle_upload_object_, upload_object_list, flush_at_end=param.debug
+        Returns
+        -------
+            The result of the write, equivalent to the result of store_entity()
+        """
+        stored_pages = {}
+
+        def apply_(title: str) -> None:
+            page = plan.pages[title]
+            try:
+                self._entity_cache.invalidate([title])
+                page.edit(plan.edit_comment, bot_edit=plan.bot_edit)
+            except Exception as e:
+                _logger.error(f"Error storing page '{title}': {e}")
+                return
+            if page.changed:
+                print(f"Entity stored at '{page.get_url()}'.")
+            stored_pages[title] = page
+
+        pending = [
+            title
+            for level in plan.levels
+            for title in level
+            if title in plan.pages and plan.pages[title].has_unsaved_changes()
+        ]
+        # compare the current revisions with the ones the plan is based on
+        probes = self.site.probe(pending) if pending else {}
+        conflicts = []
+        for title in pending:
+            probe = probes.get(title)
+            if probe is None:
+                continue  # invalid title, reported by the edit
+            if title in plan.created:
+                if probe.exists:
+                    conflicts.append(title)
+            elif plan.base_revision_ids.get(title) not in (None, probe.revision_id):
+                conflicts.append(title)
+        if conflicts:
+            _logger.warning(
+                f"Pages changed since the plan was made are not written: {conflicts}"
             )
-        else:
-            _ = [
-                handle_upload_object_(upload_object)
-                for upload_object in upload_object_list
+
+        for level in plan.levels:
+            titles = [
+                title for title in level if title in pending and title not in conflicts
             ]
-        return OSW.StoreEntityResult(change_id=param.change_id, pages=created_pages)
+            if plan.parallel and len(titles) > 1:
+                _ = parallelize(apply_, titles, flush_at_end=False)
+            else:
+                _ = [apply_(title) for title in titles]
+        return OSW.StoreEntityResult(
+            change_id=plan.change_id,
+            pages=stored_pages,
+            levels=plan.levels,
+            changed=list(stored_pages),
+            unchanged=plan.unchanged,
+            conflicts=conflicts,
+        )
+
+    @staticmethod
+    def enqueue_entities(
+        journal: StoreJournal,
+        entities: Union[OswBaseModel, List[OswBaseModel]],
+        namespace: Optional[str] = None,
+    ) -> List[str]:
+        """Records entities in the journal to be stored later by flush_journal(), e.g.
+        by producers without a connection to the OSW instance.
+
+        Parameters
+        ----------
+        journal:
+            The journal to record the entities in
+        entities:
+            The entities to store
+        namespace:
+            The namespace of the entities. If not set, the namespace is derived from
+            the entity.
+
+        Returns
+        -------
+            The full titles of the recorded entities
+        """
+        if not isinstance(entities, list):
+            entities = [entities]
+        entries = []
+        for entity in entities:
+            namespace_ = namespace or get_namespace(entity)
+            title_ = get_title(entity)
+            if namespace_ is None or title_ is None:
+                raise ValueError(
+                    f"The title of the entity '{getattr(entity, 'name', None)}' "
+                    f"could not be determined."
+                )
+            model_spec = _get_model_class_spec(entity.__class__)
+            if model_spec is None:
+                raise ValueError(
+                    f"The class '{entity.__class__.__name__}' is not importable and "
+                    f"can therefore not be restored from the journal."
+                )
+            entries.append(
+                JournalEntry(
+                    title=f"{namespace_}:{title_}",
+                    model=model_spec,
+                    data=json.loads(entity.json(exclude_none=True)),
+                )
+            )
+        journal.add(entries)
+        return [entry.title for entry in entries]
+
+    def flush_journal(
+        self, journal: StoreJournal, param: Optional[StoreEntityParam] = None
+    ) -> StoreEntityResult:
+        """Stores all entities of the journal that have not been committed yet, i.e.
+        resumes an interrupted store_entity() run or stores the entities recorded by
+        enqueue_entities(). Entities which have been stored although their edit has
+        not been recorded as committed are detected as unchanged and not written
+        again.
+
+        Parameters
+        ----------
+        journal:
+            The journal
+        param:
+            Template for the parameters of the store_entity() call, e.g. to set the
+            overwrite policy. Its entities are replaced by those of the journal.
+
+        Returns
+        -------
+            The result of store_entity()
+        """
+        entities = []
+        for entry in journal.get_pending():
+            try:
+                cls = _import_model_class(entry.model)
+                entities.append(cls(**entry.data))
+            except Exception as e:
+                _logger.error(f"Error restoring entity '{entry.title}': {e}")
+                journal.set_state(entry.title, JournalState.failed, error=str(e))
+        if param is None:
+            param = OSW.StoreEntityParam(entities=entities, journal=journal)
+        else:
+            param = OSW.StoreEntityParam(
+                **{
+                    name: getattr(param, name)
+                    for name in param.__fields_set__
+                    if name not in ["entities", "journal"]
+                },
+                entities=entities,
+                journal=journal,
+            )
+        return self.store_entity(param)
 
     class DeleteEntityParam(OswBaseModel):
         entities: Union[OswBaseModel, List[OswBaseModel]]
@@ -1854,15 +3191,13 @@ class OSW(BaseModel):
         if comment is not None:
             entity.comment = comment
 
-        def delete_entity_(entity_, comment_: str = None):
-            """Deletes the given entity from the OSW instance.
+        def get_entity_title_(entity_) -> Optional[str]:
+            """Returns the full page title of the given entity
 
             Parameters
             ----------
             entity_:
                 The dataclass instance to delete
-            comment_:
-                Command for the change log, by default None
             """
             title_ = None
             namespace_ = None
@@ -1878,27 +3213,36 @@ class OSW(BaseModel):
                 title_ = OSW.get_osw_id(entity_.uuid)
             if namespace_ is None or title_ is None:
                 print("Error: Unsupported entity type")
-                return
-            entity_title = namespace_ + ":" + title_
-            page = self.site.get_page(WtSite.GetPageParam(titles=[entity_title])).pages[
-                0
-            ]
-
-            if page.exists:
-                page.delete(comment_)
-                print("Entity deleted: " + page.get_url())
+                return None
+            return namespace_ + ":" + title_
+
+        entity_titles = [get_entity_title_(e) for e in entity.entities]
+        entity_titles = [title for title in entity_titles if title is not None]
+        # checks the existence of all pages in batched requests without loading
+        #  their content
+        probes = self.site.probe(entity_titles)
+        self._entity_cache.invalidate(entity_titles)
+        existing_pages = []
+        for entity_title in entity_titles:
+            probe = probes.get(entity_title)
+            if probe is not None and probe.exists:
+                existing_pages.append(probe)
             else:
                 print(f"Entity '{entity_title}' does not exist!")
-
-        if entity.parallel:
-            _ = parallelize(
-                delete_entity_,
-                entity.entities,
-                flush_at_end=entity.debug,
-                comment_=entity.comment,
+        if not existing_pages:
+            return
+        results = self.site.delete_page(
+            WtSite.DeletePageParam(
+                page=existing_pages,
+                comment=entity.comment,
+                parallel=entity.parallel,
+                debug=entity.debug,
             )
-        else:
-            _ = [delete_entity_(e, entity.comment) for e in entity.entities]
+        )
+        for probe, result in zip(existing_pages, results):
+            # delete_page() warns about pages that could not be deleted
+            if result is not None:
+                print(f"Entity deleted: https://{self.mw_site.host}/wiki/{probe.title}")
 
     class QueryInstancesParam(OswBaseModel):
         categories: Union[
@@ -2102,4 +3446,5 @@ class OSW(BaseModel):
 
 OSW._ApplyOverwriteParam.update_forward_refs()
 OSW.StoreEntityParam.update_forward_refs()
+OSW.StoreEntityResult.update_forward_refs()
 OSW.ExportJsonLdParams.update_forward_refs()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 
 from pydantic.v1 import BaseModel, PrivateAttr, validator
 
@@ -90,6 +90,11 @@ class Paths(Defaults):
     download_dir: Path = DOWNLOAD_DIR_DEFAULT
     """If you want to specify the default download directory, use
     Path.download_dir = new_path."""
+    template_cache_dir: Optional[Path] = None
+    """Directory to cache the precompiled handlebars templates in. By default (None)
+    templates are compiled in memory only. Caching on disk is opt-in, use
+    Path.template_cache_dir = new_path. Note that the cached files are Python modules
+    that are imported, so the directory must not be writable by untrusted users."""
 
     def __setattr__(self, name, value):
         old_value = getattr(self, name)
@@ -116,7 +121,8 @@ class Paths(Defaults):
 
         def update_attr(set_attr, to_update, old_val, new_val):
             for attr_name in to_update:
-                if old_val in getattr(self, attr_name).parents:
+                attr_val = getattr(self, attr_name)
+                if attr_val is not None and old_val in attr_val.parents:
                     old_rel_path = getattr(self, attr_name).relative_to(old_val)
                     new_rel_path = new_val / old_rel_path
                     setattr(self, attr_name, new_rel_path)
@@ -128,13 +134,21 @@ class Paths(Defaults):
         if attr_name == "base":
             update_attr(
                 "base",
-                ["osw_files_dir", "cred_filepath", "download_dir"],
+                [
+                    "osw_files_dir",
+                    "cred_filepath",
+                    "download_dir",
+                    "template_cache_dir",
+                ],
                 old_value,
                 new_value,
             )
         elif attr_name == "osw_files_dir":
             update_attr(
-                "osw_files_dir", ["cred_filepath", "download_dir"], old_value, new_value
+                "osw_files_dir",
+                ["cred_filepath", "download_dir", "template_cache_dir"],
+                old_value,
+                new_value,
             )
 
 
@@ -1 +1,58 @@
 # This file is required to make Python treat directories containing the file as packages.
+"""Data models of osw. The classes generated by OSW.fetch_schema() are provided by
+osw.model.entity (layout 'single') or by one module per schema in the package
+osw.model.generated (layout 'modules'). Classes of the latter are imported lazily on
+first access, e.g. `osw.model.Device` imports only the module of the schema
+defining Device and the modules it depends on."""
+
+import importlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+GENERATED_PACKAGE = "osw.model.generated"
+"""The package of the per-schema modules"""
+GENERATED_INDEX_FILE = "index.json"
+"""The index of the per-schema modules within the package directory, mapping the
+class names to the modules defining them"""
+
+_generated_index: Optional[Tuple[Tuple[int, int], Dict[str, str]]] = None
+_generated_index_lock = threading.Lock()
+
+
+def get_generated_package_path() -> str:
+    """Returns the directory of the package of the per-schema modules"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated")
+
+
+def get_generated_module_name(cls_name: str) -> Optional[str]:
+    """Returns the name of the per-schema module defining the class, None if no
+    module defines it. The index is re-read if it has been regenerated."""
+    global _generated_index
+    index_path = os.path.join(get_generated_package_path(), GENERATED_INDEX_FILE)
+    try:
+        stat = os.stat(index_path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _generated_index_lock:
+        if _generated_index is None or _generated_index[0] != key:
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    classes = json.load(f).get("classes", {})
+            except (OSError, ValueError):
+                classes = {}
+            _generated_index = (key, classes)
+        return _generated_index[1].get(cls_name)
+
+
+def __getattr__(name: str):
+    """Imports generated classes lazily (PEP 562)"""
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name = get_generated_module_name(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{GENERATED_PACKAGE}.{module_name}")
+    return getattr(module, name)
@@ -26,3 +26,6 @@ from opensemantic.base.v1 import (  # isort:skip
     Software,
     PrefectFlow,
 )  # noqa: F401, E402
+
+# provide the classes generated with the layout 'modules' as well
+from osw.model import __getattr__  # noqa: F401, E402 isort:skip
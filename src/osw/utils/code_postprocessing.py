@@ -1,4 +1,6 @@
+import ast
 import re
+from typing import Dict, Iterable, List, Set
 
 
 def remove_constraints_from_forward_refs(src_code):
@@ -77,9 +79,10 @@ def resolve_osw_id_type_hints(content: str) -> str:
         start = match.start()
         end = class_starts[i + 1].start() if i + 1 < len(class_starts) else len(content)
         class_block = content[start:end]
+        # the quotes depend on whether the code has been formatted
         uuid_match = re.search(
-            r'"uuid":\s*"([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}'
-            r"-[0-9a-f]{4}-[0-9a-f]{12})" + '"',
+            r"[\"']uuid[\"']:\s*[\"']([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}"
+            r"-[0-9a-f]{4}-[0-9a-f]{12})[\"']",
             class_block,
         )
         if uuid_match:
@@ -104,3 +107,221 @@ def resolve_osw_id_type_hints(content: str) -> str:
         )
 
     return "".join(_resolve_line(line) for line in content.splitlines(keepends=True))
+
+
+def _get_statement_lines(node: ast.stmt) -> range:
+    """Returns the line numbers of a statement, including its decorators"""
+    start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+    return range(start, node.end_lineno + 1)
+
+
+def _remove_lines(content: str, line_numbers: Set[int]) -> str:
+    """Removes the given lines (1-based, as reported by ast) and the blank lines
+    following each removed block in a single pass"""
+    if not line_numbers:
+        return content
+    result = []
+    removing = False
+    for number, line in enumerate(content.split("\n"), start=1):
+        if number in line_numbers:
+            removing = True
+        elif removing and not line.strip():
+            pass  # blank line after a removed block
+        else:
+            removing = False
+            result.append(line)
+    return "\n".join(result)
+
+
+def get_class_names(content: str) -> List[str]:
+    """Returns the names of the classes defined at the top level of the code"""
+    tree = ast.parse(content)
+    return [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+
+
+def remove_classes(content: str, class_names: Iterable[str]) -> str:
+    """Removes the top level definitions of the given classes from the code
+
+    Parameters
+    ----------
+    content : str
+        The Python source code
+    class_names
+        The names of the classes to remove
+
+    Returns
+    -------
+    str
+        The source code without the classes
+    """
+    class_names = set(class_names)
+    if not class_names:
+        return content
+    tree = ast.parse(content)
+    line_numbers = set()
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name in class_names:
+            line_numbers.update(_get_statement_lines(node))
+    return _remove_lines(content, line_numbers)
+
+
+def merge_generated_code(org_content: str, content: str, overwrite=False) -> str:
+    """Appends generated code to existing code, removing duplicated classes
+
+    Parameters
+    ----------
+    org_content : str
+        The existing source code
+    content : str
+        The newly generated source code
+    overwrite
+        If True, classes defined in both are taken from the new code, otherwise
+        the existing definitions are kept
+
+    Returns
+    -------
+    str
+        The combined source code
+    """
+    if overwrite:
+        org_content = remove_classes(org_content, get_class_names(content))
+    else:
+        content = remove_classes(content, get_class_names(org_content))
+    return org_content + "\n\n\n" + content
+
+
+def remove_empty_subclasses(content: str) -> str:
+    """Replaces empty subclasses by their base classes and removes their
+    definitions. Only subclasses following the naming patterns of
+    datamodel-code-generator are processed:
+    - BaseclassModel (e.g., DescriptionModel extends Description)
+    - Baseclass<number> (e.g., Label1, Label2 extend Label)
+
+    Parameters
+    ----------
+    content : str
+        The generated Python source code
+
+    Returns
+    -------
+    str
+        The source code without the empty subclasses
+    """
+    tree = ast.parse(content)
+    replacements: Dict[str, str] = {}
+    line_numbers = set()
+    for node in tree.body:
+        if (
+            not isinstance(node, ast.ClassDef)
+            or len(node.bases) != 1
+            or not isinstance(node.bases[0], ast.Name)
+            or node.keywords
+            or node.decorator_list
+        ):
+            continue
+        body = node.body
+        if ast.get_docstring(node, clean=False) is not None:
+            body = body[1:]
+        if len(body) != 1 or not isinstance(body[0], ast.Pass):
+            continue
+        base_class_name = node.bases[0].id
+        if node.name == base_class_name + "Model" or re.match(
+            rf"^{re.escape(base_class_name)}\d+$", node.name
+        ):
+            replacements[node.name] = base_class_name
+            line_numbers.update(_get_statement_lines(node))
+    if not replacements:
+        return content
+    # resolve chains, e.g. Label2 -> Label1 -> Label
+    for subclass_name, base_class_name in replacements.items():
+        while base_class_name in replacements:
+            base_class_name = replacements[base_class_name]
+        replacements[subclass_name] = base_class_name
+
+    content = _remove_lines(content, line_numbers)
+    # replace all occurrences of the subclass names with one combined pattern
+    pattern = re.compile(
+        r"\b("
+        + "|".join(
+            re.escape(name) for name in sorted(replacements, key=len, reverse=True)
+        )
+        + r")\b"
+    )
+    return pattern.sub(lambda m: replacements[m.group(1)], content)
+
+
+def _format_alias(alias: ast.alias) -> str:
+    return f"{alias.name} as {alias.asname}" if alias.asname else alias.name
+
+
+def _format_import(module: str, names: List[str]) -> str:
+    line = f"from {module} import {', '.join(names)}"
+    if len(line) <= 88:
+        return line
+    return f"from {module} import (\n" + "".join(f"    {n},\n" for n in names) + ")"
+
+
+def consolidate_imports_and_forward_refs(
+    content: str, forward_ref_funcs: Iterable[str] = ("update_forward_refs",)
+) -> str:
+    """Moves the top level import statements to the beginning of the code, merging
+    the imports of the same module, and moves the forward reference updates (e.g.
+    '<cls>.update_forward_refs()') to the end of the code, removing duplicates.
+
+    Parameters
+    ----------
+    content : str
+        The Python source code, e.g. multiple generated modules combined
+    forward_ref_funcs
+        The names of the methods updating forward references, e.g.
+        'update_forward_refs' (pydantic v1) or 'model_rebuild' (pydantic v2)
+
+    Returns
+    -------
+    str
+        The consolidated source code
+    """
+    forward_ref_funcs = set(forward_ref_funcs)
+    tree = ast.parse(content)
+    line_numbers = set()
+    from_imports: Dict[str, Dict[str, None]] = {}
+    imports: Dict[str, None] = {}
+    forward_refs = set()
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            names = from_imports.setdefault(module, {})
+            for alias in node.names:
+                names[_format_alias(alias)] = None
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[_format_alias(alias)] = None
+        elif (
+            isinstance(node, ast.Expr)
+            and isinstance(node.value, ast.Call)
+            and not node.value.args
+            and not node.value.keywords
+            and isinstance(node.value.func, ast.Attribute)
+            and node.value.func.attr in forward_ref_funcs
+            and isinstance(node.value.func.value, ast.Name)
+        ):
+            forward_refs.add(f"{node.value.func.value.id}.{node.value.func.attr}()")
+        else:
+            continue
+        line_numbers.update(_get_statement_lines(node))
+    content = _remove_lines(content, line_numbers).strip("\n")
+
+    import_statements = []
+    if "__future__" in from_imports:
+        future_names = from_imports.pop("__future__")
+        import_statements.append(_format_import("__future__", sorted(future_names)))
+    import_statements.extend(f"import {name}" for name in sorted(imports))
+    import_statements.extend(
+        _format_import(module, sorted(names))
+        for module, names in sorted(from_imports.items())
+    )
+    if import_statements:
+        content = "\n".join(import_statements) + "\n\n\n" + content
+    if forward_refs:
+        content += "\n\n\n" + "\n".join(sorted(forward_refs))
+    return content + "\n"
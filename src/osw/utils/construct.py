@@ -0,0 +1,201 @@
+"""Construction of model instances from trusted data, e.g. jsondata loaded from the
+OSW instance, which has already been validated against the same JSON schema.
+Skipping the pydantic validation reduces the CPU load of large loads significantly.
+"""
+
+from enum import Enum
+from typing import Any, Callable, Dict, Literal, Type, TypeVar, get_origin
+
+from opensemantic.v1 import OswBaseModel
+from pydantic.v1 import BaseModel, ValidationError
+from pydantic.v1.fields import (
+    SHAPE_FROZENSET,
+    SHAPE_LIST,
+    SHAPE_SEQUENCE,
+    SHAPE_SET,
+    SHAPE_SINGLETON,
+    ModelField,
+)
+
+from osw.utils.strings import pascal_case
+
+T = TypeVar("T", bound=BaseModel)
+
+_LIST_SHAPES = (SHAPE_LIST, SHAPE_SET, SHAPE_FROZENSET, SHAPE_SEQUENCE)
+
+
+def construct_trusted(cls: Type[T], data: Dict[str, Any]) -> T:
+    """Creates an instance of cls from trusted data without running the full
+    pydantic validation. Other than BaseModel.construct(), nested models are
+    constructed recursively, defaults are applied, link fields are set and values
+    not matching the JSON type of a field (e.g. UUIDs, enums, constrained strings)
+    are validated field-wise.
+
+    Parameters
+    ----------
+    cls
+        The model class to instantiate
+    data
+        The (json) data of the instance, e.g. the jsondata slot of a page
+
+    Returns
+    -------
+        The instance of cls. Use validate_constructed() to validate it on demand.
+    """
+    plan = _get_construction_plan(cls)
+    data = dict(data)
+    if plan.is_osw_model:
+        # mirrors OswBaseModel.__init__
+        if data.get("name") is None and data.get("label") and plan.has_name:
+            label = data["label"]
+            if isinstance(label, list) and len(label) > 0:
+                first = label[0]
+                text = first.text if hasattr(first, "text") else first.get("text")
+                if text:
+                    data["name"] = pascal_case(text)
+        if "uuid" not in data and plan.has_uuid:
+            data["uuid"] = OswBaseModel._init_uuid(**data)
+
+    values = {}
+    fields_set = set()
+    link_data = {}
+    for name, alias, field, construct_value in plan.fields:
+        if alias in data:
+            value = data[alias]
+        elif plan.by_field_name and name in data:
+            value = data[name]
+        elif construct_value is None:  # link field
+            continue
+        else:
+            values[name] = None if field in plan.none_defaults else field.get_default()
+            continue
+        if construct_value is None:
+            link_data[name] = value
+        else:
+            values[name] = None if value is None else construct_value(value)
+            fields_set.add(name)
+    entity = cls.__new__(cls)
+    object.__setattr__(entity, "__dict__", values)
+    object.__setattr__(entity, "__fields_set__", fields_set)
+    entity._init_private_attributes()
+
+    # mirrors LinkedBaseModel.__init__: link values are held by the descriptors
+    for name, iris in plan.link_defaults.items():
+        if name not in link_data:
+            link_data[name] = iris
+    for name, value in link_data.items():
+        plan.link_fields[name].set_value(entity, value)
+    return entity
+
+
+def validate_constructed(entity: T) -> T:
+    """Validates an instance created by construct_trusted()
+
+    Parameters
+    ----------
+    entity
+        The instance to validate
+
+    Returns
+    -------
+        A validated copy of the instance
+
+    Raises
+    ------
+    ValidationError
+        If the data of the instance is not valid
+    """
+    return entity.__class__(**entity.dict(exclude_unset=True, by_alias=True))
+
+
+class _ConstructionPlan:
+    """Per-class information required by construct_trusted(), determined once"""
+
+    def __init__(self, cls: Type[BaseModel]):
+        self.is_osw_model = issubclass(cls, OswBaseModel)
+        self.has_name = "name" in cls.__fields__
+        self.has_uuid = "uuid" in cls.__fields__
+        self.by_field_name = cls.__config__.allow_population_by_field_name
+        self.link_fields = getattr(cls, "__link_fields__", {})
+        self.link_defaults = {
+            name: iris
+            for name, iris in getattr(cls, "__link_defaults__", {}).items()
+            if name in self.link_fields
+        }
+        self.none_defaults = {
+            field
+            for field in cls.__fields__.values()
+            if field.default is None and field.default_factory is None
+        }
+        self.fields = [
+            (
+                name,
+                field.alias,
+                field,
+                (
+                    None
+                    if name in self.link_fields
+                    else _get_value_constructor(cls, field)
+                ),
+            )
+            for name, field in cls.__fields__.items()
+        ]
+
+
+_construction_plans: Dict[Type[BaseModel], _ConstructionPlan] = {}
+
+
+def _get_construction_plan(cls: Type[BaseModel]) -> _ConstructionPlan:
+    plan = _construction_plans.get(cls)
+    if plan is None:
+        plan = _ConstructionPlan(cls)
+        _construction_plans[cls] = plan
+    return plan
+
+
+def _get_value_constructor(
+    cls: Type[BaseModel], field: ModelField
+) -> Callable[[Any], Any]:
+    """Returns a function creating the value of the field from its (json) value or
+    from the value of a validated instance (see BaseModel.dict())"""
+
+    def validate(value):
+        # fallback for unions, mappings, constrained and non-json types
+        value, errors = field.validate(value, {}, loc=field.alias, cls=cls)
+        if errors:
+            if not isinstance(errors, list):
+                errors = [errors]
+            raise ValidationError(errors, cls)
+        return value
+
+    if field.shape == SHAPE_SINGLETON and not field.sub_fields:
+        type_ = field.type_
+        if isinstance(type_, type) and issubclass(type_, BaseModel):
+            return lambda v: (
+                construct_trusted(type_, v) if isinstance(v, dict) else validate(v)
+            )
+        if type_ is Any or get_origin(type_) is Literal:
+            return lambda v: v
+        if isinstance(type_, type) and issubclass(type_, Enum):
+            # e.g. LangCode(str, Enum): the value is converted to the member
+            return lambda v: v if type(v) is type_ else validate(v)
+        for json_type in (bool, str, int, float):
+            if isinstance(type_, type) and issubclass(type_, json_type):
+                # includes constrained types, the value is already validated
+                return lambda v: v if type(v) is json_type else validate(v)
+        if isinstance(type_, type):
+            # e.g. UUID, datetime: only values not yet of this type are validated
+            return lambda v: v if type(v) is type_ else validate(v)
+        return validate
+    if field.shape in _LIST_SHAPES:
+        item_field = field.sub_fields[0]
+        construct_item = _get_value_constructor(cls, item_field)
+        container = {SHAPE_SET: set, SHAPE_FROZENSET: frozenset}.get(field.shape, list)
+
+        def construct_list(value):
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                return validate(value)
+            return container(None if v is None else construct_item(v) for v in value)
+
+        return construct_list
+    return validate
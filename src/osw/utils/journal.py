@@ -0,0 +1,207 @@
+"""A durable journal of the entities to store, to resume interrupted bulk uploads and
+to collect entities without a connection to the OSW instance. See
+OSW.enqueue_entities() and OSW.flush_journal()."""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from pydantic.v1 import BaseModel
+
+
+class JournalState(Enum):
+    """States of an entity in the journal"""
+
+    queued = "queued"
+    """The entity is to be stored"""
+    in_flight = "in flight"
+    """The entity is being stored, it is unknown whether the edit succeeded"""
+    committed = "committed"
+    """The entity has been stored (or was already up to date)"""
+    failed = "failed"
+    """Storing the entity failed"""
+
+
+class JournalEntry(BaseModel):
+    """An entity recorded in the journal"""
+
+    title: str
+    """The full title of the entity's page"""
+    state: JournalState = JournalState.queued
+    """The state of the entity"""
+    change_id: Optional[str] = None
+    """The change_id of the store_entity() call"""
+    revision_id: Optional[int] = None
+    """The revision id of the page after the entity was committed"""
+    model: Optional[List[Tuple[str, str]]] = None
+    """(module, name) of the model class or its bases, to restore the entity"""
+    data: Optional[dict] = None
+    """The jsondata of the entity"""
+    error: Optional[str] = None
+    """The error message, if storing the entity failed"""
+    updated: Optional[datetime] = None
+    """The time of the last state change"""
+
+
+class StoreJournal:
+    """A journal of entities to store, persisted in an SQLite database. Every state
+    change is committed immediately, so the journal reflects the progress of a
+    store_entity() run even if the process is killed. Safe to use from multiple
+    threads.
+
+    Examples
+    --------
+    >>> with StoreJournal("upload.sqlite") as journal:
+    >>>     osw.store_entity(OSW.StoreEntityParam(entities=entities, journal=journal))
+    >>> # after an interruption, store only what is missing:
+    >>> with StoreJournal("upload.sqlite") as journal:
+    >>>     osw.flush_journal(journal)
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Opens the journal, creating the database file if it does not exist
+
+        Parameters
+        ----------
+        path
+            The path of the SQLite database file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "title TEXT PRIMARY KEY, state TEXT NOT NULL, change_id TEXT, "
+                "revision_id INTEGER, model TEXT, data TEXT, error TEXT, "
+                "updated TEXT)"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def add(self, entries: List[JournalEntry]) -> None:
+        """Adds entries to the journal in a single transaction. Existing entries with
+        the same title are replaced.
+
+        Parameters
+        ----------
+        entries
+            The entries to add
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (
+                entry.title,
+                entry.state.value,
+                entry.change_id,
+                entry.revision_id,
+                None if entry.model is None else json.dumps(entry.model),
+                None if entry.data is None else json.dumps(entry.data),
+                entry.error,
+                now,
+            )
+            for entry in entries
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def set_state(
+        self,
+        title: str,
+        state: JournalState,
+        revision_id: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Sets the state of an entry
+
+        Parameters
+        ----------
+        title
+            The full title of the entity's page
+        state
+            The new state
+        revision_id
+            The revision id of the page, if committed
+        error
+            The error message, if failed
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE entries SET state = ?, revision_id = ?, error = ?, updated = ? "
+                "WHERE title = ?",
+                (
+                    state.value,
+                    revision_id,
+                    error,
+                    datetime.now(timezone.utc).isoformat(),
+                    title,
+                ),
+            )
+
+    def get_entries(
+        self, states: Optional[List[JournalState]] = None
+    ) -> List[JournalEntry]:
+        """Returns the entries of the journal in the order they were added
+
+        Parameters
+        ----------
+        states
+            If given, only entries in these states are returned
+
+        Returns
+        -------
+            The entries
+        """
+        query = "SELECT * FROM entries"
+        params = []
+        if states is not None:
+            query += f" WHERE state IN ({', '.join('?' for _ in states)})"
+            params = [state.value for state in states]
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY rowid", params)
+            rows = rows.fetchall()
+        return [
+            JournalEntry(
+                title=title,
+                state=JournalState(state),
+                change_id=change_id,
+                revision_id=revision_id,
+                model=None if model is None else json.loads(model),
+                data=None if data is None else json.loads(data),
+                error=error,
+                updated=updated,
+            )
+            for title, state, change_id, revision_id, model, data, error, updated in rows
+        ]
+
+    def get_pending(self) -> List[JournalEntry]:
+        """Returns the entries that have not been committed (yet)"""
+        return self.get_entries(
+            [JournalState.queued, JournalState.in_flight, JournalState.failed]
+        )
+
+    def get_counts(self) -> Dict[JournalState, int]:
+        """Returns the number of entries per state"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT state, COUNT(*) FROM entries GROUP BY state"
+            ).fetchall()
+        counts = {state: 0 for state in JournalState}
+        counts.update({JournalState(state): count for state, count in rows})
+        return counts
@@ -1,30 +1,140 @@
+import hashlib
+import importlib.util
+import logging
+import os
 import re
+import threading
+from pathlib import Path
+from typing import Dict, Hashable, Tuple, Union
 
+import pybars
 from pybars import Compiler
 
+_logger = logging.getLogger(__name__)
 
-def compile_handlebars_template(template):
-    """compiles a handlebars template.
-    WARNING: not thread safe!
+# pybars keeps the state of a compilation in class attributes of the Compiler
+_compile_lock = threading.RLock()
+
+_compiled_templates: Dict[Hashable, Tuple[str, object]] = {}
+_compiled_templates_lock = threading.Lock()
+
+
+def _escape_handlebars_template(template: str) -> str:
+    # pybars does not support inline escaping, so we have to wrap the raw block
+    # e.g. \{{escaped}} => {{{{raw}}}}{{escaped}}{{{{/raw}}}}
+    # this workaround does not support expressions withing the escaped block,
+    # e.g. \{{escaped {{some_var}} }} will not work
+    # see https://handlebarsjs.com/guide/expressions.html#escaping-handlebars-expressions
+    # see https://github.com/wbond/pybars3/pull/47
+    return re.sub(r"\\\{\{([^}]+)\}\}", r"{{{{raw}}}}{{\1}}{{{{/raw}}}}", template)
+
+
+def compile_handlebars_template(template, cache_dir: Union[str, Path] = None):
+    """compiles a handlebars template. Compilations are serialized by a lock, since
+    pybars is not thread safe.
 
     Parameters
     ----------
     template
         the template string
+    cache_dir
+        if given, the template is compiled ahead of time to a python module in this
+        directory (named by the hash of the template) and imported from there.
+        Later calls, also in other processes, import the existing module instead of
+        compiling the template again.
 
     Returns
     -------
         the compiled template
     """
-    compiler = Compiler()
-    # pybars does not support inline escaping, so we have to wrap the raw block
-    # e.g. \{{escaped}} => {{{{raw}}}}{{escaped}}{{{{/raw}}}}
-    # this workaround does not support expressions withing the escaped block,
-    # e.g. \{{escaped {{some_var}} }} will not work
-    # see https://handlebarsjs.com/guide/expressions.html#escaping-handlebars-expressions
-    # see https://github.com/wbond/pybars3/pull/47
-    template = re.sub(r"\\\{\{([^}]+)\}\}", r"{{{{raw}}}}{{\1}}{{{{/raw}}}}", template)
-    compiled_template = compiler.compile(template)
+    template = _escape_handlebars_template(template)
+    if cache_dir is not None:
+        try:
+            return _load_precompiled_handlebars_template(template, Path(cache_dir))
+        except Exception as e:
+            _logger.warning(f"Loading the precompiled template failed: {e}")
+    with _compile_lock:
+        compiled_template = Compiler().compile(template)
+    return compiled_template
+
+
+def precompile_handlebars_template(template: str, cache_dir: Union[str, Path]) -> Path:
+    """compiles a handlebars template ahead of time to a python module, e.g. to ship
+    the compiled templates with a deployment. Existing modules are reused.
+
+    Parameters
+    ----------
+    template
+        the template string
+    cache_dir
+        the directory to store the module in
+
+    Returns
+    -------
+        the path of the module, which provides the compiled template as 'render'
+    """
+    template = _escape_handlebars_template(template)
+    return _precompile_handlebars_template(template, Path(cache_dir))
+
+
+def _precompile_handlebars_template(template: str, cache_dir: Path) -> Path:
+    # the pybars version is part of the key, since the generated code depends on it
+    key = hashlib.sha256(f"{pybars.__version__}\n{template}".encode()).hexdigest()
+    module_path = cache_dir / f"osw_template_{key}.py"
+    if module_path.exists():
+        return module_path
+    with _compile_lock:
+        code = Compiler().precompile(template)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first, other processes may import the module
+    #  concurrently
+    tmp_path = module_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(code, encoding="utf-8")
+    os.replace(tmp_path, module_path)
+    return module_path
+
+
+def _load_precompiled_handlebars_template(template: str, cache_dir: Path):
+    module_path = _precompile_handlebars_template(template, cache_dir)
+    spec = importlib.util.spec_from_file_location(module_path.stem, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.render
+
+
+def get_compiled_handlebars_template(
+    key: Hashable, template: str, cache_dir: Union[str, Path] = None
+):
+    """returns the compiled handlebars template from a process-wide cache, compiling
+    it on the first request. Safe to use from multiple threads.
+
+    Parameters
+    ----------
+    key
+        the cache key, e.g. the title of the page holding the template
+    template
+        the template string. If it differs from the cached template of the key
+        (e.g. after an edit of the page), the template is recompiled.
+    cache_dir
+        directory of precompiled templates, see compile_handlebars_template()
+
+    Returns
+    -------
+        the compiled template
+    """
+    with _compiled_templates_lock:
+        cached = _compiled_templates.get(key)
+    if cached is not None and cached[0] == template:
+        return cached[1]
+    with _compile_lock:
+        # another thread may have compiled the template in the meantime
+        with _compiled_templates_lock:
+            cached = _compiled_templates.get(key)
+        if cached is not None and cached[0] == template:
+            return cached[1]
+        compiled_template = compile_handlebars_template(template, cache_dir)
+        with _compiled_templates_lock:
+            _compiled_templates[key] = (template, compiled_template)
     return compiled_template
 
 
@@ -153,7 +263,6 @@ def eval_handlebars_template(
     if partials is None:
         partials = {}
     """evaluates a handlebars template with the given data.
-    WARNING: not thread safe!
 
     Parameters
     ----------
@@ -1,14 +1,26 @@
 import asyncio
 import functools
+import os
 import sys
+import time
 from asyncio import Queue
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import redirect_stdout, suppress
+from contextlib import contextmanager, redirect_stdout, suppress
 from io import StringIO  # , BytesIO,
 
 # import stdio_proxy
 from pathlib import Path
-from typing import IO, Callable, Dict, Iterable, List, Optional, Union
+from typing import (
+    IO,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import dask
 from dask.diagnostics import ProgressBar
@@ -399,6 +411,111 @@ def file_in_paths(
     return {"found": result, "file path": path}
 
 
+def get_dependency_levels(
+    dependencies: Dict[Hashable, Iterable[Hashable]],
+) -> Tuple[List[List[Hashable]], List[Hashable]]:
+    """Sorts the nodes of a dependency graph into levels (Kahn's algorithm), so that
+    each node only depends on nodes of previous levels. The nodes of a level can be
+    processed in parallel.
+
+    Parameters
+    ----------
+    dependencies:
+        Dictionary with the nodes as keys and the nodes they depend on as values.
+        Dependencies on nodes that are not keys of the dictionary are ignored.
+
+    Returns
+    -------
+    levels:
+        List of levels, each a list of nodes in the order of the dictionary. Nodes
+        within a dependency cycle are placed in an additional last level.
+    critical_path:
+        The longest chain of dependent nodes, starting with the node without
+        dependencies.
+    """
+    depends_on = {
+        node: {dep for dep in deps if dep in dependencies and dep != node}
+        for node, deps in dependencies.items()
+    }
+    dependents = {node: [] for node in depends_on}
+    for node, deps in depends_on.items():
+        for dep in deps:
+            dependents[dep].append(node)
+    remaining = {node: len(deps) for node, deps in depends_on.items()}
+    # length of and predecessor on the longest chain ending at the node
+    chain = {node: (1, None) for node in depends_on}
+    order = {node: i for i, node in enumerate(depends_on)}
+    levels = []
+    level = [node for node, count in remaining.items() if count == 0]
+    while level:
+        levels.append(level)
+        next_level = []
+        for node in level:
+            del remaining[node]
+            for dependent in dependents[node]:
+                if chain[node][0] + 1 > chain[dependent][0]:
+                    chain[dependent] = (chain[node][0] + 1, node)
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    next_level.append(dependent)
+        level = sorted(next_level, key=order.get)
+    if remaining:
+        levels.append([node for node in depends_on if node in remaining])
+
+    critical_path = []
+    if chain:
+        node = max(chain, key=lambda n: chain[n][0])
+        while node is not None:
+            critical_path.insert(0, node)
+            node = chain[node][1]
+    return levels, critical_path
+
+
+@contextmanager
+def file_lock(lock_path: Union[str, Path], timeout: float = 60.0):
+    """Serializes a read-modify-write of a file across threads and processes by
+    exclusively creating a lock file next to it. A lock file older than the
+    timeout is considered left behind by a crashed process and is removed.
+
+    Parameters
+    ----------
+    lock_path:
+        The path of the lock file, e.g. the path of the file to modify + '.lock'
+    timeout:
+        Seconds to wait for the lock before a TimeoutError is raised
+
+    Examples
+    --------
+    >>> with file_lock("index.json.lock"):
+    ...     index = read_index()
+    ...     write_index(index)
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue  # released in the meantime
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not acquire the lock '{lock_path}'")
+            time.sleep(0.05)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+
 def async_parallelize(func: Callable, iterable: Iterable, **kwargs):
     """Work in progress"""
 
@@ -1,3 +1,4 @@
+import copy
 import getpass
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -129,6 +130,11 @@ def create_site_object(
     return site
 
 
+MAX_TITLES_PER_QUERY = 50
+"""Maximum number of titles per API query (limit of the MediaWiki API for
+non-bot users)"""
+
+
 class SearchParam(OswBaseModel):
     """Search parameters for semantic and prefix search"""
 
@@ -406,16 +412,21 @@ def get_file_info_and_usage(
     Returns
     -------
     result:
-        Dictionary with page titles as keys and nested dictionary with keys 'info' and
-        'usage'.
+        List of dictionaries (one per requested title) with keys 'info' and 'usage'.
 
     Notes
     -----
+    Titles are queried in batches of up to MAX_TITLES_PER_QUERY titles per request,
+    continuations ('fucontinue', 'iicontinue') are followed until complete or until
+    every file has query.limit usages, further usages are dropped. The usages of
+    missing files are included.
+    The result list is in the same order as the requested titles.
+
     Query to reproduce:
         action=query
         format=json
         prop=imageinfo|fileusage
-        titles=File%3AOSW857d85031d85425aa94db8b4720e84b7.png
+        titles=File%3AOSW857d85031d85425aa94db8b4720e84b7.png|File%3A...
         &iiprop=timestamp%7Cuser&fulimit=5000"
 
     Resources
@@ -428,17 +439,8 @@ def get_file_info_and_usage(
     else:  # SearchParam
         query = title
 
-    def get_file_info_and_usage_(single_title):
-        api_request_result = site.api(
-            action="query",
-            format="json",
-            prop="imageinfo|fileusage",
-            titles=single_title,
-            iiprop="timestamp|user",
-            fulimit=query.limit,
-        )
-        using_pages = []
-        file_info = {
+    def new_file_info(single_title):
+        return {
             "title": single_title,
             "author": "File not found or no creation logged",
             "timestamp": "File not found or no creation logged",
@@ -446,44 +448,83 @@ def get_file_info_and_usage(
             "editing_timestamp": [],
         }
 
-        if len(api_request_result["query"]["pages"]) == 0:
-            if query.debug:
-                print(f"Page not found: '{single_title}'!")
-        else:
-            image_info: List[Dict[str, str]] = []
-            file_usage: List[Dict[str, Union[str, int]]] = []
-            for _page_id, page_dict in api_request_result["query"]["pages"].items():
-                if page_dict["title"] == single_title:
-                    image_info = page_dict.get("imageinfo", [])
-                    file_usage = page_dict.get("fileusage", [])
-            if len(image_info) != 0:
-                file_info["author"] = image_info[0]["user"]
-                file_info["timestamp"] = image_info[0]["timestamp"]
+    def get_file_info_and_usage_(titles_batch: List[str]):
+        results = {
+            single_title: {"info": new_file_info(single_title), "usage": []}
+            for single_title in titles_batch
+        }
+        # Maps the titles returned by the API to the requested titles
+        requested_titles = {single_title: single_title for single_title in titles_batch}
+        continue_params = {}
+        while True:
+            api_request_result = site.api(
+                action="query",
+                format="json",
+                prop="imageinfo|fileusage",
+                titles="|".join(titles_batch),
+                iiprop="timestamp|user",
+                fulimit=query.limit,
+                **continue_params,
+            )
+            result_query = api_request_result.get("query", {})
+            for normalized in result_query.get("normalized", []):
+                requested_titles[normalized["to"]] = normalized["from"]
+            for page_dict in result_query.get("pages", {}).values():
+                single_title = requested_titles.get(page_dict["title"])
+                if single_title is None:
+                    continue
+                if "missing" in page_dict or "invalid" in page_dict:
+                    if query.debug:
+                        print(f"Page not found: '{single_title}'!")
+                    if "invalid" in page_dict:
+                        continue
+                    # missing files may still be used by pages
+                file_info = results[single_title]["info"]
+                image_info: List[Dict[str, str]] = page_dict.get("imageinfo", [])
+                file_usage: List[Dict[str, Union[str, int]]] = page_dict.get(
+                    "fileusage", []
+                )
+                if len(image_info) != 0 and len(file_info["editor"]) == 0:
+                    file_info["author"] = image_info[0]["user"]
+                    file_info["timestamp"] = image_info[0]["timestamp"]
                 for ii in image_info:
                     file_info["editor"].append(ii["user"])
                     file_info["editing_timestamp"].append(ii["timestamp"])
-            if file_usage is not None:
-                for fu_page_dict in file_usage:
-                    using_pages.append(fu_page_dict["title"])
-            if query.debug:
-                # todo: find out why this message is printed (sometimes) when using the
-                #  redirect,  which messes up the Progressbar
-                #  printed messages do not appear in the MessageBuffer
-                print(f"File info for '{single_title}' retrieved.")
-        return {"info": file_info, "usage": using_pages}
-
-    if query.parallel:
-        api_request_results = parallelize(
+                usage = results[single_title]["usage"]
+                for fu_page_dict in file_usage[: max(query.limit - len(usage), 0)]:
+                    usage.append(fu_page_dict["title"])
+            # Follow 'fucontinue' / 'iicontinue' until all results are retrieved, at
+            #  most query.limit usages per file
+            if "continue" not in api_request_result:
+                break
+            if all(len(r["usage"]) >= query.limit for r in results.values()):
+                break
+            # the continuation values are passed on unchanged, their format depends
+            #  on the number of titles. Usages beyond query.limit are dropped above.
+            continue_params = dict(api_request_result["continue"])
+        if query.debug:
+            print(f"File info for {len(titles_batch)} file(s) retrieved.")
+        return results
+
+    # Deduplicate while preserving the order of the query
+    unique_titles = list(dict.fromkeys(query.query))
+    titles_batches = [
+        unique_titles[i : i + MAX_TITLES_PER_QUERY]
+        for i in range(0, len(unique_titles), MAX_TITLES_PER_QUERY)
+    ]
+    if query.parallel and len(titles_batches) > 1:
+        batch_results = parallelize(
             func=get_file_info_and_usage_,
-            iterable=query.query,
+            iterable=titles_batches,
             flush_at_end=query.debug,
         )
     else:
-        api_request_results = [
-            get_file_info_and_usage_(single_title=st) for st in query.query
-        ]
+        batch_results = [get_file_info_and_usage_(batch) for batch in titles_batches]
+    results = {}
+    for batch_result in batch_results:
+        results.update(batch_result)
 
-    return api_request_results
+    return [copy.deepcopy(results[single_title]) for single_title in query.query]
 
 
 def search_redirection_sources(
@@ -5,16 +5,18 @@ caching OpenSemanticLab specific features are located in osw.core.OSW
 import json
 import os
 import shutil
+import threading
 import urllib
 import warnings
 import xml.etree.ElementTree as et
-from copy import deepcopy
+from concurrent.futures import Future
+from copy import copy, deepcopy
 from datetime import datetime
 from io import StringIO
 from pathlib import Path
 from pprint import pprint
 from time import sleep
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from warnings import warn
 
 import mwclient
@@ -23,7 +25,7 @@ import requests
 from jsonpath_ng.ext import parse
 from mwclient.page import Page as MwPage
 from opensemantic.v1 import OswBaseModel
-from pydantic.v1 import FilePath
+from pydantic.v1 import FilePath, PrivateAttr
 from typing_extensions import deprecated
 
 import osw.model.page_package as package
@@ -49,6 +51,39 @@ SLOTS = {
 }
 
 
+PAGE_CONTENT_QUERY_PARAMS = {
+    "prop": "info|revisions",
+    "inprop": "protection",
+    "rvprop": "ids|timestamp|flags|comment|user|content|contentmodel|roles|"
+    "slotsize|slotsha1",
+    "rvslots": "*",
+}
+"""Parameters of a 'query' API call to load the info and the current revision with
+the content of all slots of one or more pages, see WtPage._init_from_query_result()
+"""
+
+PAGE_PROBE_QUERY_PARAMS = {
+    "prop": "info|revisions",
+    "inprop": "protection",
+    "rvprop": "ids|slotsize|slotsha1",
+    "rvslots": "*",
+}
+"""Parameters of a 'query' API call to load the info and the slot hashes of the
+current revision of one or more pages without their content, see WtSite.probe()"""
+
+
+def _merge_query_pages(pages: Dict[str, dict], result: dict) -> None:
+    """Adds the pages of a 'query' API result to the pages collected from previous
+    requests. The revisions of a page may be spread over continued requests."""
+    for page_id, page_dict in result.get("query", {}).get("pages", {}).items():
+        if page_id in pages:
+            pages[page_id].setdefault("revisions", []).extend(
+                page_dict.get("revisions", [])
+            )
+        else:
+            pages[page_id] = page_dict
+
+
 # Classes
 class WtSite:
     """A wrapper class of mwclient.Site, mainly to provide multi-slot page handling and
@@ -154,6 +189,9 @@ class WtSite:
         #  the wiki
         self._page_cache = {}
         self._cache_enabled = False
+        # pages being loaded by a thread, see _load_page()
+        self._page_requests: Dict[Tuple[str, Optional[Tuple[str, ...]]], Future] = {}
+        self._page_requests_lock = threading.Lock()
 
     def _relogin(self):
         """Re-login to the wiki site using stored credentials.
@@ -298,6 +336,9 @@ class WtSite:
         """Whether to raise a warning if a page does not exist occurs"""
         offline_pages: Optional[Dict[str, "WtPage"]] = None
         """pages to be used offline instead of fetching them from the OSW instance"""
+        slots: Optional[List[str]] = None
+        """the keys of the slots to download, e.g. ['jsondata'], by default all
+        slots. Cached pages loaded without one of these slots are downloaded again."""
 
         class Config:
             arbitrary_types_allowed = True  # allows to use WtPage in type hints
@@ -346,14 +387,16 @@ class WtSite:
                         wtpage = param.offline_pages[title]
                         wtpage.exists = True
                         msg += "Page loaded from offline pages. "
-                    elif self._cache_enabled and title in self._page_cache:
+                    elif (
+                        self._cache_enabled
+                        and title in self._page_cache
+                        and self._page_cache[title].has_loaded_slots(param.slots)
+                    ):
                         wtpage = self._page_cache[title]
                         msg += "Page loaded from cache. "
                     else:
-                        wtpage = WtPage(self, title)
+                        wtpage = self._load_page(title, param.slots)
                         msg += "Page loaded. "
-                        if self._cache_enabled:
-                            self._page_cache[title] = wtpage
                     pages.append(wtpage)
                     if not wtpage.exists:
                         if param.raise_warning:
@@ -391,6 +434,51 @@ class WtSite:
 
         return self.GetPageResult(pages=pages, errors=exceptions)
 
+    def _load_page(self, title: str, slots: Optional[List[str]] = None) -> "WtPage":
+        """Loads a page from the site and puts it into the page cache, if enabled.
+        With the cache enabled, concurrent requests of the same page are
+        deduplicated: the first request loads the page, the other threads wait for
+        it and share its result instead of requesting the page again.
+
+        Parameters
+        ----------
+        title:
+            The full page title
+        slots:
+            The keys of the slots to load, by default all slots
+
+        Returns
+        -------
+        page:
+            The loaded page
+        """
+        if not self._cache_enabled:
+            return WtPage(self, title, slots=slots)
+        key = (title, None if slots is None else tuple(sorted(slots)))
+        with self._page_requests_lock:
+            # the page may have been loaded since the cache lookup of the caller
+            cached = self._page_cache.get(title)
+            if cached is not None and cached.has_loaded_slots(slots):
+                return cached
+            future = self._page_requests.get(key)
+            is_loading = future is None
+            if is_loading:
+                future = Future()
+                self._page_requests[key] = future
+        if not is_loading:
+            return future.result()
+        try:
+            page = WtPage(self, title, slots=slots)
+            self._page_cache[title] = page
+            future.set_result(page)
+            return page
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._page_requests_lock:
+                del self._page_requests[key]
+
     @deprecated("Use get_page instead")
     @try_and_renew_token
     def get_WtPage(self, title: str = None):
@@ -687,7 +775,16 @@ class WtSite:
             return [copy_single_page(content) for content in content_list]
 
     class DeletePageParam(OswBaseModel):
-        page: Union["WtPage", List["WtPage"], str, List[str]]
+        page: Union[
+            "WtPage",
+            List["WtPage"],
+            str,
+            List[str],
+            "WtSite.PageProbe",
+            List["WtSite.PageProbe"],
+        ]
+        """The pages to delete, WtSite.PageProbe objects of existing pages allow to
+        delete pages by title without another request"""
         comment: Optional[str] = None
         debug: Optional[bool] = True
         """If True, debug messages will be printed."""
@@ -709,7 +806,14 @@ class WtSite:
     @try_and_renew_token
     def delete_page(
         self,
-        param: Union["WtPage", List["WtPage"], str, List[str], DeletePageParam],
+        param: Union[
+            "WtPage",
+            List["WtPage"],
+            str,
+            List[str],
+            "WtSite.PageProbe",
+            DeletePageParam,
+        ],
         comment: str = None,
     ):
         """Deletes a page or a list of pages from the site.
@@ -732,7 +836,9 @@ class WtSite:
             self._site.tokens["csrf"] = self._site.get_token("csrf")
 
         def delete_single_page(page_: Union["WtPage", MwPage], comment: str):
-            if isinstance(page_, str):
+            if isinstance(page_, WtSite.PageProbe):
+                page_ = MwPage(self._site, page_.title, info=page_._info)
+            elif isinstance(page_, str):
                 try:
                     page_ = self._site.pages[page_]
                 except Exception as e:
@@ -1142,13 +1248,263 @@ class WtSite:
 
     @try_and_renew_token
     def get_file_pages(self, limit: int = 1000000) -> List[str]:
-        """Get all file pages in the wiki"""
+        """Get all file pages in the wiki. See iter_file_pages() for a memory
+        efficient alternative"""
         full_page_titles = wt.prefix_search(
             site=self._site,
             text=wt.SearchParam(query="File:", debug=False, limit=limit),
         )
         return full_page_titles
 
+    def _iter_query(self, **params) -> Iterator[dict]:
+        """Performs a 'query' API call and follows the continuation of the result.
+        Yields the raw API result of each request.
+
+        Parameters
+        ----------
+        params:
+            The parameters of the query, e.g. list="allimages"
+        """
+        continue_params = {}
+        while True:
+            result = self._site.api("query", **{**params, **continue_params})
+            yield result
+            if "continue" not in result:
+                break
+            continue_params = result["continue"]
+
+    def _iter_query_pages(
+        self, titles: List[str], batch_size: int, **params
+    ) -> Iterator[Tuple[str, dict]]:
+        """Performs 'query' API calls for many pages in batches of titles, follows
+        the continuation of each batch and merges the results.
+
+        Parameters
+        ----------
+        titles:
+            The full page titles, duplicates are queried once
+        batch_size:
+            Number of titles per request (max. 50 for non-bot users)
+        params:
+            The further parameters of the query, e.g. prop="info"
+
+        Yields
+        ------
+        title, page_dict:
+            The requested title, also if normalized by the API, and the page entry
+            of the query result. Invalid titles are omitted.
+        """
+        titles = list(dict.fromkeys(titles))
+        for i in range(0, len(titles), batch_size):
+            batch_titles = titles[i : i + batch_size]
+            # maps the titles returned by the API to the requested titles
+            requested_titles = {title: title for title in batch_titles}
+            batch: Dict[str, dict] = {}
+            for result in self._iter_query(titles="|".join(batch_titles), **params):
+                for normalized in result.get("query", {}).get("normalized", []):
+                    requested_titles[normalized["to"]] = normalized["from"]
+                _merge_query_pages(batch, result)
+            for page_dict in batch.values():
+                if "invalid" in page_dict:
+                    continue
+                title = requested_titles.get(page_dict["title"], page_dict["title"])
+                yield title, page_dict
+
+    def iter_file_pages(self, batch_size: int = 500) -> Iterator[str]:
+        """Iterates over the titles of all files in the wiki, fetching them batchwise
+        (list=allimages) instead of collecting them in memory.
+
+        Parameters
+        ----------
+        batch_size:
+            Number of titles to fetch per API request (max. 500 for non-bot users)
+
+        Yields
+        ------
+        title:
+            The full page title of the file page, e.g. 'File:OSW123.png'
+        """
+        for result in self._iter_query(list="allimages", ailimit=batch_size):
+            for image in result.get("query", {}).get("allimages", []):
+                yield image["title"]
+
+    def iter_namespace(
+        self,
+        namespace: Union[int, str],
+        with_content: bool = False,
+        batch_size: int = 50,
+    ) -> Iterator[Union[str, "WtPage"]]:
+        """Iterates over all pages in a namespace (generator=allpages), fetching them
+        batchwise instead of collecting them in memory.
+
+        Parameters
+        ----------
+        namespace:
+            The namespace id (e.g. 6) or name (e.g. 'File')
+        with_content:
+            If True, the content of all slots is fetched in the same request and
+            initialized WtPage objects are yielded instead of titles
+        batch_size:
+            Number of pages to fetch per API request (max. 50 if with_content is True)
+
+        Yields
+        ------
+        page:
+            The full page title or, if with_content is True, the WtPage
+        """
+        if isinstance(namespace, str):
+            namespace_ids = {name: id_ for id_, name in self._site.namespaces.items()}
+            if namespace not in namespace_ids:
+                raise ValueError(f"Unknown namespace: '{namespace}'")
+            namespace = namespace_ids[namespace]
+        params = dict(generator="allpages", gapnamespace=namespace, gaplimit=batch_size)
+        if with_content:
+            params.update(PAGE_CONTENT_QUERY_PARAMS)
+        batch: Dict[str, dict] = {}
+        for result in self._iter_query(**params):
+            _merge_query_pages(batch, result)
+            if "batchcomplete" in result or "continue" not in result:
+                for page_dict in sorted(batch.values(), key=lambda p: p["title"]):
+                    if with_content:
+                        page = WtPage(self, page_dict["title"], do_init=False)
+                        page._init_from_query_result(page_dict)
+                        yield page
+                    else:
+                        yield page_dict["title"]
+                batch = {}
+
+    @try_and_renew_token
+    def prefetch_pages(
+        self,
+        titles: List[str],
+        batch_size: int = wt.MAX_TITLES_PER_QUERY,
+        slots: Optional[List[str]] = None,
+    ) -> Dict[str, "WtPage"]:
+        """Loads the existence, current revision and slot contents of many pages in
+        batched queries (prop=info|revisions) instead of two requests per page.
+        The pages are added to the page cache if the cache is enabled.
+
+        Parameters
+        ----------
+        titles:
+            The full page titles
+        batch_size:
+            Number of titles per request (max. 50 for non-bot users)
+        slots:
+            The keys of the slots to load, by default all slots
+
+        Returns
+        -------
+        pages:
+            Dictionary with the requested titles as keys and the initialized WtPage
+            objects as values. Non-existing pages are included with exists=False,
+            invalid titles are omitted.
+        """
+        pages = {}
+        params = dict(PAGE_CONTENT_QUERY_PARAMS)
+        if slots is not None:
+            params["rvslots"] = "|".join(slots)
+        for title, page_dict in self._iter_query_pages(titles, batch_size, **params):
+            page = WtPage(self, title, do_init=False)
+            page._init_from_query_result(page_dict, slots)
+            pages[title] = page
+            if self._cache_enabled:
+                self._page_cache[title] = page
+        return pages
+
+    def get_revision_ids(
+        self, titles: List[str], batch_size: int = wt.MAX_TITLES_PER_QUERY
+    ) -> Dict[str, Optional[int]]:
+        """Loads the ids of the current revisions of many pages without loading their
+        content, e.g. to check whether cached content is still up to date. Shorthand
+        for probe().
+
+        Parameters
+        ----------
+        titles:
+            The full page titles
+        batch_size:
+            Number of titles per request (max. 50 for non-bot users)
+
+        Returns
+        -------
+        revision_ids:
+            Dictionary with the requested titles as keys and the current revision id
+            as values. Non-existing pages are included with None, invalid titles are
+            omitted.
+        """
+        return {
+            title: probe.revision_id
+            for title, probe in self.probe(titles, batch_size).items()
+        }
+
+    class PageProbe(OswBaseModel):
+        """The state of a page as returned by WtSite.probe()"""
+
+        title: str
+        """The full page title"""
+        exists: bool
+        """Whether the page exists"""
+        page_id: Optional[int] = None
+        """The page id, None if the page does not exist"""
+        revision_id: Optional[int] = None
+        """The id of the current revision, None if the page does not exist"""
+        length: Optional[int] = None
+        """The size of the current revision in bytes"""
+        slot_sha1: Dict[str, str] = {}
+        """The sha1 hashes of the slot contents of the current revision"""
+        _info: dict = PrivateAttr(default_factory=dict)
+        """The page entry of the query result, allows to create a mwclient page
+        without another request"""
+
+    @try_and_renew_token
+    def probe(
+        self, titles: List[str], batch_size: int = wt.MAX_TITLES_PER_QUERY
+    ) -> Dict[str, PageProbe]:
+        """Loads the existence, page id, current revision id, length and slot hashes
+        of many pages in batched queries without loading their content, e.g. to
+        check whether pages exist before deleting or creating them.
+
+        Parameters
+        ----------
+        titles:
+            The full page titles
+        batch_size:
+            Number of titles per request (max. 50 for non-bot users)
+
+        Returns
+        -------
+        probes:
+            Dictionary with the requested titles as keys and the state of the pages
+            as values. Non-existing pages are included with exists=False, invalid
+            titles are omitted.
+        """
+        probes = {}
+        for title, page_dict in self._iter_query_pages(
+            titles, batch_size, **PAGE_PROBE_QUERY_PARAMS
+        ):
+            revisions = page_dict.pop("revisions", [])
+            slot_sha1 = {}
+            if revisions:
+                slots = revisions[-1].get("slots", {})
+                slot_sha1 = {
+                    slot_key: slot["sha1"]
+                    for slot_key, slot in slots.items()
+                    if "sha1" in slot
+                }
+            exists = "missing" not in page_dict
+            probe = WtSite.PageProbe(
+                title=title,
+                exists=exists,
+                page_id=page_dict.get("pageid"),
+                revision_id=page_dict.get("lastrevid") if exists else None,
+                length=page_dict.get("length"),
+                slot_sha1=slot_sha1,
+            )
+            probe._info = page_dict
+            probes[title] = probe
+        return probes
+
     @try_and_renew_token
     def get_file_info_and_usage(
         self,
@@ -1287,15 +1643,15 @@ class WtSite:
             # print("Requesting", url)
             if "/wiki/" in url:
                 title = url.split("/wiki/")[-1].split("?")[0]
+                schema_slot = "main" if "JsonSchema:" in title else "jsonschema"
                 page = self.get_page(
                     WtSite.GetPageParam(
-                        titles=[title], offline_pages=params.offline_pages
+                        titles=[title],
+                        offline_pages=params.offline_pages,
+                        slots=[schema_slot],
                     )
                 ).pages[0]
-                if "JsonSchema:" in title:
-                    schema = page.get_slot_content("main")
-                else:
-                    schema = page.get_slot_content("jsonschema")
+                schema = page.get_slot_content(schema_slot)
                 if isinstance(schema, str):
                     schema = json.loads(schema)
                 schema["@context"] = self._replace_jsonld_context_mapping(
@@ -1323,7 +1679,13 @@ class WtSite:
 class WtPage:
     """A wrapper class of mwclient.page, mainly to provide multi-slot page handling"""
 
-    def __init__(self, wtSite: WtSite = None, title: str = None, do_init: bool = True):
+    def __init__(
+        self,
+        wtSite: WtSite = None,
+        title: str = None,
+        do_init: bool = True,
+        slots: Optional[List[str]] = None,
+    ):
         """Creates a new WtPage object for the given title and loads the page from the
         site if the page already exists.
 
@@ -1335,6 +1697,8 @@ class WtPage:
             the page title, by default None
         do_init
             whether to initialize the page, by default True
+        slots
+            the keys of the slots to load if do_init is True, by default all slots
         """
         self.wtSite = wtSite
         self.title = title
@@ -1345,57 +1709,103 @@ class WtPage:
         self._slots: Dict[str, Union[str, dict]] = {"main": ""}
         self._slots_changed: Dict[str, bool] = {"main": False}
         self._content_model: Dict[str, str] = {"main": "wikitext"}
+        self._loaded_slots: Optional[List[str]] = None  # None: all slots
 
         if do_init:
-            self.init()
+            self.init(slots)
         else:
             self.exists = False  # actually this is unknown
 
-    def init(self):
-        """Initializes the page by loading the content and meta data from the site"""
-        # inits the mwclient object - triggers an API call
-        self._page = self.wtSite.mw_site.pages[self.title]
-        self.exists = self._page.exists
+    def init(self, slots: Optional[List[str]] = None):
+        """Initializes the page by loading the content and meta data from the site in
+        a single API call
 
+        Parameters
+        ----------
+        slots
+            the keys of the slots to load, by default all slots. Slots that are not
+            loaded are missing in the page, e.g. get_slot_content() returns None.
+        """
+        params = dict(PAGE_CONTENT_QUERY_PARAMS)
+        if slots is not None:
+            params["rvslots"] = "|".join(slots)
+        result = self.wtSite.mw_site.api(
+            "query", titles=self.title, format="json", **params
+        )
+        page_dict = next(iter(result["query"]["pages"].values()))
+        self._init_from_query_result(page_dict, slots)
+
+    def _init_from_revisions(self, revisions: List[dict]):
+        """Sets the slot contents and content models from the 'revisions' list of a
+        'query' API result (prop=revisions with rvslots)"""
+        for revision in revisions:
+            self._current_revision = revision
+            if "slots" in revision:
+                for slot_key in revision.get("slots", {}):
+                    if "*" not in revision["slots"][slot_key]:
+                        continue  # requested slot missing in the revision
+                    self._slots[slot_key] = revision["slots"][slot_key]["*"]
+                    self._content_model[slot_key] = revision["slots"][slot_key][
+                        "contentmodel"
+                    ]
+                    self._slots_changed[slot_key] = False
+                    # self._slots_sha1[slot_key] = \
+                    #     revision["slots"][slot_key]["*"]
+                    if self._content_model[slot_key] == "json":
+                        self._slots[slot_key] = json.loads(self._slots[slot_key])
+            else:  # legacy MW instances < 1.35
+                self._slots["main"] = revision["*"]
+                self._content_model["main"] = "wikitext"
+                self._slots_changed["main"] = False
+                # self._slots_sha1["main"] = revision["sha1"]
+        # todo: set content for slots not in revision["slots"] (use
+        #  SLOTS) --> create empty slots
+
+    def _init_from_query_result(
+        self, page_dict: dict, slots: Optional[List[str]] = None
+    ):
+        """Initializes the page from a page entry of a 'query' API result with
+        prop=info|revisions (rvslots=*) without any further API call
+
+        Parameters
+        ----------
+        page_dict
+            The entry of the page in result["query"]["pages"]
+        slots
+            the keys of the slots requested with rvslots, by default all slots
+        """
+        self._page = MwPage(self.wtSite.mw_site, self.title, info=page_dict)
+        self.exists = self._page.exists
+        self._loaded_slots = slots
         if self.exists:
-            self._original_content = self._page.text()
-            # multi content revisions
-            # second API call - ToDo: combine / replace with first call
-            rev = self.wtSite.mw_site.api(
-                "query",
-                prop="revisions",
-                titles=self.title,
-                rvprop="ids|timestamp|flags|comment|user|content|contentmodel|roles|"
-                "slotsize|slotsha1",
-                rvslots="*",
-                rvlimit="1",
-                format="json",
-            )
-            for page_id in rev["query"]["pages"]:
-                page = rev["query"]["pages"][page_id]
-                if page["title"].replace(" ", "_") == self.title.replace(" ", "_"):
-                    for revision in page["revisions"]:
-                        self._current_revision = revision
-                        if "slots" in revision:
-                            for slot_key in revision.get("slots", {}):
-                                self._slots[slot_key] = revision["slots"][slot_key]["*"]
-                                self._content_model[slot_key] = revision["slots"][
-                                    slot_key
-                                ]["contentmodel"]
-                                self._slots_changed[slot_key] = False
-                                # self._slots_sha1[slot_key] = \
-                                #     revision["slots"][slot_key]["*"]
-                                if self._content_model[slot_key] == "json":
-                                    self._slots[slot_key] = json.loads(
-                                        self._slots[slot_key]
-                                    )
-                        else:  # legacy MW instances < 1.35
-                            self._slots["main"] = revision["*"]
-                            self._content_model["main"] = "wikitext"
-                            self._slots_changed["main"] = False
-                            # self._slots_sha1["main"] = revision["sha1"]
-                    # todo: set content for slots not in revision["slots"] (use
-                    #  SLOTS) --> create empty slots
+            if slots is not None and "main" not in slots:
+                # the content of the main slot is unknown, not empty
+                for slot_dict in (
+                    self._slots,
+                    self._slots_changed,
+                    self._content_model,
+                ):
+                    slot_dict.pop("main", None)
+            self._init_from_revisions(page_dict.get("revisions", []))
+            self._original_content = self._slots.get("main", "")
+
+    def has_loaded_slots(self, slots: Optional[List[str]] = None) -> bool:
+        """Returns whether the given slots were requested when the page was loaded
+
+        Parameters
+        ----------
+        slots
+            the keys of the slots, by default all slots
+
+        Returns
+        -------
+            False if the page was loaded with a subset of slots not containing all
+            given slots
+        """
+        loaded_slots = getattr(self, "_loaded_slots", None)
+        if loaded_slots is None:
+            return True
+        return slots is not None and set(slots).issubset(loaded_slots)
 
     def try_and_renew_token(func):
         """Tries to execute the method call. If the auth token has expired already,
@@ -1559,6 +1969,45 @@ class WtPage:
                 self._slots_changed[slot_key] = True
         self._slots[slot_key] = content
 
+    def has_unsaved_changes(self) -> bool:
+        """Returns whether the content of any slot has been changed since the page
+        was loaded or last edited, i.e. whether edit() would write to the site"""
+        return any(self._slots_changed.values())
+
+    def get_unsaved_slot_contents(self) -> Dict[str, str]:
+        """Returns the serialized contents of the changed slots, as they would be
+        sent to the site by edit()
+
+        Returns
+        -------
+            Dictionary with the slot keys as keys and the contents as values
+        """
+        contents = {}
+        for slot_key, changed in self._slots_changed.items():
+            if changed:
+                content = self._slots[slot_key]
+                if self._content_model[slot_key] == "json" and not isinstance(
+                    content, str
+                ):
+                    content = json.dumps(content, ensure_ascii=False)
+                contents[slot_key] = content
+        return contents
+
+    def shallow_copy(self) -> "WtPage":
+        """Returns a copy of the page that can be modified by set_slot_content()
+        without affecting this page. Unlike deepcopy(), the site object and the slot
+        contents are shared, not copied.
+
+        Returns
+        -------
+            The copy of the page
+        """
+        page = copy(self)
+        page._slots = dict(self._slots)
+        page._slots_changed = dict(self._slots_changed)
+        page._content_model = dict(self._content_model)
+        return page
+
     def set_parsed_slot_content(self, slot_key: str, content: List):
         """Sets the parsed content of a slot by calling
         wt.get_wikitext_from_flat_content_structure().
@@ -1755,38 +2204,33 @@ class WtPage:
         if not comment:
             comment = "[bot] update of page content"
         if mode == "action-multislot":
-            params = {}
-            changed = False
-            for slot_key in self._slots:
-                if self._slots_changed[slot_key]:
-                    changed = True
-                    self._slots_changed[slot_key] = False
-                    content = self._slots[slot_key]
-                    if self._content_model[slot_key] == "json":
-                        if not isinstance(content, str):
-                            content = json.dumps(content, ensure_ascii=False)
-                    params["slot_" + slot_key] = content
-            if changed:
-                self.changed = True
-                self.wtSite.mw_site.api(
+            contents = self.get_unsaved_slot_contents()
+            if contents:
+                result = self.wtSite.mw_site.api(
                     "editslots",
                     token=self.wtSite.mw_site.get_token("csrf"),
                     title=self.title,
                     summary=comment,
                     bot=bot_edit,
-                    **params,
+                    **{"slot_" + slot_key: c for slot_key, c in contents.items()},
                 )
+                # reset only after success, so that a retry sends the changes again
+                for slot_key in contents:
+                    self._slots_changed[slot_key] = False
+                self.changed = True
                 self.wtSite._clear_cookies()
+                self._update_after_edit(result)
 
         else:
             changed = False
+            result = None
             for slot_key in self._slots:
                 if self._slots_changed[slot_key]:
                     changed = True
                     content = self._slots[slot_key]
                     if self._content_model[slot_key] == "json":
                         content = json.dumps(content, ensure_ascii=False)
-                    self.wtSite.mw_site.api(
+                    result = self.wtSite.mw_site.api(
                         "editslot",
                         token=self.wtSite.mw_site.get_token("csrf"),
                         title=self.title,
@@ -1798,6 +2242,57 @@ class WtPage:
                     self._slots_changed[slot_key] = False
             if changed:
                 self.changed = True
+                self._update_after_edit(result)
+
+    def _update_after_edit(self, result: Any) -> None:
+        """Updates the revision and existence of the page after a successful edit and
+        puts the page into the page cache of the site (if enabled), so that
+        subsequent reads of the page do not need to request it again. If the edit
+        result has no new revision id, the page is removed from the cache instead.
+
+        Parameters
+        ----------
+        result
+            The result of the 'editslots' / 'editslot' API call
+        """
+        edit_result = {}
+        if isinstance(result, dict):
+            for value in result.values():
+                if isinstance(value, dict) and value.get("newrevid") is not None:
+                    edit_result = value
+                    break
+        revision_id = edit_result.get("newrevid")
+        # without the new revision id, the previous one must not be kept, since it
+        #  identifies the content, e.g. in the entity cache of OSW.load_entity()
+        self._current_revision = {
+            **getattr(self, "_current_revision", {}),
+            "revid": revision_id,
+        }
+        self.exists = True
+        self._original_content = self._slots.get("main", "")
+        if revision_id is None:
+            # the state of the page is unknown, it is loaded again on request
+            self.wtSite._page_cache.pop(self.title, None)
+            return
+        # create or update the mwclient page (used by delete(), move(), ...) without
+        #  another request, also for pages created with do_init=False
+        info = dict(getattr(getattr(self, "_page", None), "_info", None) or {})
+        info.pop("missing", None)
+        if "ns" not in info:
+            namespace_ids = {
+                name: id_ for id_, name in self.wtSite.mw_site.namespaces.items()
+            }
+            prefix = self.title.split(":", 1)[0] if ":" in self.title else ""
+            info["ns"] = namespace_ids.get(prefix, 0)
+        info.update(
+            title=self.title,
+            lastrevid=revision_id,
+            pageid=edit_result.get("pageid", info.get("pageid")),
+            touched=edit_result.get("newtimestamp", info.get("touched")),
+        )
+        self._page = MwPage(self.wtSite.mw_site, self.title, info=info)
+        if self.wtSite.get_cache_enabled():
+            self.wtSite._page_cache[self.title] = self
 
     @try_and_renew_token
     def delete(self, comment: str = None):
@@ -1830,6 +2325,16 @@ class WtPage:
             )
             self.title = new_title
 
+    def get_revision_id(self) -> Optional[int]:
+        """Returns the id of the loaded revision of the page
+
+        Returns
+        -------
+            The revision id or None if the page does not exist or was not loaded
+            from the site
+        """
+        return getattr(self, "_current_revision", {}).get("revid")
+
     def get_last_changed_time(self):
         """Gets the timestamp of the last change of the page
 
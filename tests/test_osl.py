@@ -1,12 +1,26 @@
+import hashlib
 import json
+import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from typing import Any, Dict, Union
+from unittest.mock import MagicMock, patch
 from uuid import UUID
 
+import osw.model
 import osw.model.entity as model
-from osw.core import OSW, AddOverwriteClassOptions, OverwriteOptions
+from osw.core import (
+    OSW,
+    AddOverwriteClassOptions,
+    OverwriteOptions,
+    _get_referenced_iris,
+    get_composed_model_class,
+)
+from osw.defaults import paths as default_paths
+from osw.utils.journal import JournalState, StoreJournal
 from osw.utils.wiki import remove_empty
-from osw.wtsite import WtPage
+from osw.wtsite import WtPage, WtSite
 
 
 class OfflineWtPage(WtPage):
@@ -355,3 +369,796 @@ def check_reproducible_uuid():
     assert entity1.uuid != entity2.uuid
     assert entity1.uuid != entity3.uuid
     assert entity2.uuid != entity3.uuid
+
+
+def _offline_osw(pages: Dict[str, Dict[str, Any]]) -> OSW:
+    """Creates an OSW instance with a mocked site serving the given slot contents
+    (full page title -> slot key -> content) as offline pages."""
+    offline_pages = {}
+    for revision_id, (title, slots) in enumerate(pages.items()):
+        page = OfflineWtPage(title=title)
+        for slot_key, content in slots.items():
+            page.set_slot_content(slot_key, content)
+        page._current_revision = {"revid": revision_id}
+        offline_pages[title] = page
+
+    site = MagicMock(spec=WtSite)
+    site.get_cache_enabled.return_value = False
+    site.get_page.side_effect = lambda param: WtSite.GetPageResult(
+        pages=[offline_pages[title] for title in param.titles], errors=[]
+    )
+    return OSW(site=site)
+
+
+def test_load_entity_caches_model_class_resolution():
+    items = {
+        f"Item:OSW{i}": {
+            "jsondata": {
+                "type": ["Category:Item"],
+                "uuid": str(uuid.uuid4()),
+                "label": [{"text": f"Item {i}"}],
+            }
+        }
+        for i in range(3)
+    }
+    osw = _offline_osw({**items, "Category:Item": {"jsonschema": {"title": "Item"}}})
+
+    entities = osw.load_entity(list(items.keys()))
+
+    assert [type(e) for e in entities] == [model.Item] * 3
+    requested_titles = [
+        title for c in osw.site.get_page.call_args_list for title in c.args[0].titles
+    ]
+    assert requested_titles.count("Category:Item") == 1
+    assert osw._model_class_cache == {("Category:Item",): model.Item}
+
+
+def test_get_composed_model_class_is_memoized():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        classes = list(
+            executor.map(
+                lambda _: get_composed_model_class((model.Software, model.WikiFile)),
+                range(8),
+            )
+        )
+
+    cls = classes[0]
+    assert all(c is cls for c in classes)
+    assert cls.__name__ == "Software_WikiFile"
+    assert issubclass(cls, model.Software) and issubclass(cls, model.WikiFile)
+    # bases covered by a more specific base are dropped
+    assert get_composed_model_class((model.Item, model.WikiFile)) is model.WikiFile
+
+
+def test_load_entity_fetches_missing_schemas_at_once():
+    items = {
+        f"Item:OSW{i}": {
+            "jsondata": {
+                "type": [category],
+                "uuid": str(uuid.uuid4()),
+                "label": [{"text": f"Item {i}"}],
+            }
+        }
+        for i, category in enumerate(["Category:Foo", "Category:Bar", "Category:Foo"])
+    }
+    osw = _offline_osw(
+        {
+            **items,
+            "Category:Foo": {"jsonschema": {"title": "FooNotInModel"}},
+            "Category:Bar": {"jsonschema": {"title": "BarNotInModel"}},
+        }
+    )
+
+    with patch.object(OSW, "fetch_schema") as fetch_schema:
+        entities = osw.load_entity(list(items.keys()))
+
+    fetch_schema.assert_called_once()
+    assert fetch_schema.call_args.args[0].schema_title == [
+        "Category:Foo",
+        "Category:Bar",
+    ]
+    assert entities == []
+
+
+def test_load_entity_trusted():
+    jsondata = {
+        "type": ["Category:Item"],
+        "uuid": str(uuid.uuid4()),
+        "label": [{"text": "Item 1"}],
+    }
+    osw = _offline_osw(
+        {
+            "Item:OSW1": {"jsondata": jsondata},
+            "Category:Item": {"jsonschema": {"title": "Item"}},
+        }
+    )
+
+    result = osw.load_entity(OSW.LoadEntityParam(titles="Item:OSW1", trusted=True))
+
+    entity = result.entities[0]
+    assert type(entity) is model.Item
+    assert entity.uuid == uuid.UUID(jsondata["uuid"])
+    assert entity.meta.wiki_page.title == "OSW1"
+
+
+def test_load_entity_in_processes():
+    items = {
+        f"Item:OSW{i}": {
+            "jsondata": {
+                "type": ["Category:Item"],
+                "uuid": str(uuid.uuid4()),
+                "label": [{"text": f"Item {i}"}],
+                "description": [],
+            }
+        }
+        for i in range(5)
+    }
+    items["Item:OSWinvalid"] = {
+        "jsondata": {"type": ["Category:Item"], "label": [{"text": ""}]}
+    }
+    osw = _offline_osw({**items, "Category:Item": {"jsonschema": {"title": "Item"}}})
+
+    result = osw.load_entity(OSW.LoadEntityParam(titles=list(items), processes=2))
+
+    assert len(result.entities) == 5
+    for entity, (title, content) in zip(result.entities, items.items()):
+        expected = model.Item(**remove_empty(deepcopy(content["jsondata"])))
+        assert type(entity) is model.Item
+        assert entity.uuid == expected.uuid
+        assert entity.label == expected.label
+        assert entity.description is None
+        assert entity.meta.wiki_page.title == title.split(":")[1]
+
+
+def test_load_entity_uses_entity_cache():
+    jsondata = {
+        "type": ["Category:Item"],
+        "uuid": str(uuid.uuid4()),
+        "label": [{"text": "Item 1"}],
+    }
+    osw = _offline_osw(
+        {
+            "Item:OSW1": {"jsondata": jsondata},
+            "Category:Item": {"jsonschema": {"title": "Item"}},
+        }
+    )
+    first = osw.load_entity("Item:OSW1")
+    first.label[0].text = "changed"
+
+    with patch.object(model.Item, "__init__", side_effect=AssertionError):
+        second = osw.load_entity("Item:OSW1")
+
+    assert second is not first
+    assert second.label[0].text == "Item 1"
+    assert second.meta.wiki_page.title == "OSW1"
+
+    osw._entity_cache.invalidate(["Item:OSW1"])
+    with patch.object(model.Item, "__init__", side_effect=AssertionError):
+        assert osw.load_entity("Item:OSW1") is None
+
+
+def test_load_entity_cached_equals_first_load():
+    jsondata = {
+        "type": ["Category:Item"],
+        "uuid": str(uuid.uuid4()),
+        "label": [{"text": "Item 1", "lang": "de"}],
+    }
+    osw = _offline_osw(
+        {
+            "Item:OSW1": {"jsondata": jsondata},
+            "Category:Item": {"jsonschema": {"title": "Item"}},
+        }
+    )
+    for trusted in (False, True):
+        param = OSW.LoadEntityParam(titles=["Item:OSW1"], trusted=trusted)
+        first = osw.load_entity(param).entities[0]
+        second = osw.load_entity(param).entities[0]
+
+        assert second is not first
+        assert type(second) is type(first)
+        assert second.json() == first.json()
+        assert second.__fields_set__ == first.__fields_set__
+        assert second.label[0].lang is model.LangCode.de
+        assert second.label[0].lang.value == "de"
+
+
+def test_store_entity_uploads_referenced_entities_first():
+    base = model.Item(uuid=uuid.uuid4(), label=[model.Label(text="Base")])
+    base_iri = base.get_iri()
+    items = [
+        model.Item(
+            uuid=uuid.uuid4(),
+            label=[model.Label(text=f"Derived {i}")],
+            based_on=[base_iri],
+        )
+        for i in range(2)
+    ]
+    osw = _offline_osw({})
+    result = osw.store_entity(
+        OSW.StoreEntityParam(entities=items + [base], offline=True)
+    )
+    item_iris = [item.get_iri() for item in items]
+    assert result.levels == [[base_iri], item_iris]
+    assert result.critical_path == [base_iri, item_iris[0]]
+    assert set(result.pages) == {base_iri, *item_iris}
+
+
+def test_get_referenced_iris_without_serialization():
+    entity = model.Item(
+        uuid=uuid.uuid4(),
+        label=[model.Label(text="Item")],
+        based_on=["Item:OSW1"],
+        statements=[
+            model.ObjectStatement(predicate="Property:HasPart", object="Item:OSW2")
+        ],
+    )
+    with patch.object(model.Item, "dict", side_effect=AssertionError):
+        iris = _get_referenced_iris(entity)
+    assert {"Item:OSW1", "Property:HasPart", "Item:OSW2"} <= iris
+    assert iris == _get_referenced_iris(entity.dict(exclude_none=True))
+
+
+def test_get_meta_category_templates_is_cached(tmp_path):
+    osw = _offline_osw(
+        {
+            "Category:Meta": {
+                "jsondata": {"subclass_of": ["Category:Base"]},
+                "schema_template": '{"title": "{{name}}"}',
+            },
+            "Category:Base": {"jsondata": {}, "schema_template": '{"type": "object"}'},
+        }
+    )
+    revision_ids = {"Category:Meta": 0, "Category:Base": 1}
+    osw.site.get_revision_ids.side_effect = lambda titles: {
+        title: revision_ids[title] for title in titles
+    }
+
+    # the on-disk cache is opt-in
+    assert default_paths.template_cache_dir is None
+    with patch.object(default_paths, "template_cache_dir", tmp_path):
+        templates = osw._get_meta_category_templates(["Category:Meta"])
+    assert list(templates) == ["Category:Base", "Category:Meta"]
+    assert osw.site.get_page.call_count == 2
+    assert len(list(tmp_path.glob("*.py"))) == 2
+
+    # unchanged meta categories are neither fetched nor compiled again
+    cached = osw._get_meta_category_templates(["Category:Meta"])
+    assert osw.site.get_page.call_count == 2
+    assert all(cached[title] is templates[title] for title in templates)
+
+    # changed meta categories are fetched again
+    revision_ids["Category:Meta"] = 2
+    osw._get_meta_category_templates(["Category:Meta"])
+    assert osw.site.get_page.call_count == 3
+    assert osw.site.get_page.call_args[0][0].titles == ["Category:Meta"]
+
+
+def test_get_overwrite_patch():
+    policy = OSW.OverwriteClassParam(
+        model=model.Item,
+        overwrite=OverwriteOptions.false,
+        per_property={
+            "name": OverwriteOptions.true,
+            "description": OverwriteOptions.only_empty,
+        },
+    )
+    remote = {"name": "A", "iri": "a", "description": [], "image": "File:A.png"}
+    local = {
+        "name": "B",
+        "iri": "b",
+        "description": [{"text": "B"}],
+        "query_label": "B",
+    }
+    patch_ = OSW._get_overwrite_patch(remote, local, policy)
+    assert patch_ == {"name": "B", "description": [{"text": "B"}], "query_label": "B"}
+    assert OSW._get_overwrite_patch(local, local, policy) == {}
+
+
+def test_store_entity_skips_unchanged_entities():
+    items = [
+        model.Item(uuid=uuid.uuid4(), label=[model.Label(text=f"Item {i}")])
+        for i in range(2)
+    ]
+    pages = {}
+    for item in items:
+        page = OfflineWtPage(wtSite=MagicMock(), title=item.get_iri())
+        page.set_slot_content("jsondata", json.loads(item.json(exclude_none=True)))
+        page.set_slot_content("header", "{{#invoke:Entity|header}}")
+        page.set_slot_content("footer", "{{#invoke:Entity|footer}}")
+        page._slots_changed = {slot: False for slot in page._slots_changed}
+        pages[page.title] = page
+    osw = _offline_osw({})
+    osw.site.prefetch_pages.return_value = pages
+    items[1].label = [model.Label(text="Item 1 (changed)")]
+
+    result = osw.store_entity(
+        OSW.StoreEntityParam(entities=items, overwrite=OverwriteOptions.true)
+    )
+
+    assert result.unchanged == [items[0].get_iri()]
+    assert result.changed == [items[1].get_iri()]
+    pages[items[0].get_iri()].wtSite.mw_site.api.assert_not_called()
+    edit_call = pages[items[1].get_iri()].wtSite.mw_site.api.call_args
+    assert edit_call.args == ("editslots",)
+    assert json.loads(edit_call.kwargs["slot_jsondata"])["label"][0]["text"] == (
+        "Item 1 (changed)"
+    )
+
+
+def _plan_store_entity(items, site):
+    """Plans to store the given items with the first two already stored, the second
+    one with changed content, and the third one to be created"""
+    pages = {}
+    for revision_id, item in enumerate(items[:2]):
+        page = OfflineWtPage(wtSite=site, title=item.get_iri())
+        page.set_slot_content("jsondata", json.loads(item.json(exclude_none=True)))
+        page.set_slot_content("header", "{{#invoke:Entity|header}}")
+        page.set_slot_content("footer", "{{#invoke:Entity|footer}}")
+        page._slots_changed = {slot: False for slot in page._slots_changed}
+        page._current_revision = {"revid": revision_id + 10}
+        pages[page.title] = page
+    new_page = OfflineWtPage(wtSite=site, title=items[2].get_iri())
+    new_page.exists = False
+    pages[new_page.title] = new_page
+    osw = _offline_osw({})
+    osw.site.prefetch_pages.return_value = pages
+    items[1].label = [model.Label(text="Item 1 (changed)")]
+
+    plan = osw.store_entity(
+        OSW.StoreEntityParam(entities=items, overwrite=OverwriteOptions.true, plan=True)
+    ).plan
+    return osw, plan
+
+
+def test_store_entity_plan_and_apply():
+    items = [
+        model.Item(uuid=uuid.uuid4(), label=[model.Label(text=f"Item {i}")])
+        for i in range(3)
+    ]
+    site = MagicMock()
+    osw, plan = _plan_store_entity(items, site)
+
+    site.mw_site.api.assert_not_called()
+    assert plan.created == [items[2].get_iri()]
+    assert plan.updated == [items[1].get_iri()]
+    assert plan.unchanged == [items[0].get_iri()]
+    assert set(plan.pages) == {items[1].get_iri(), items[2].get_iri()}
+    assert plan.byte_volume == sum(plan.sizes.values()) > 0
+    assert plan.base_revision_ids == {items[1].get_iri(): 11, items[2].get_iri(): None}
+
+    osw.site.probe.return_value = {
+        items[1].get_iri(): WtSite.PageProbe(
+            title=items[1].get_iri(), exists=True, revision_id=11
+        ),
+        items[2].get_iri(): WtSite.PageProbe(title=items[2].get_iri(), exists=False),
+    }
+    result = osw.apply(plan)
+
+    assert set(osw.site.probe.call_args.args[0]) == set(plan.pages)
+    assert result.conflicts == []
+    assert set(result.changed) == set(plan.pages)
+    edited = {call.kwargs["title"] for call in site.mw_site.api.call_args_list}
+    assert edited == set(plan.pages)
+
+
+def test_apply_skips_conflicting_pages():
+    items = [
+        model.Item(uuid=uuid.uuid4(), label=[model.Label(text=f"Item {i}")])
+        for i in range(3)
+    ]
+    site = MagicMock()
+    osw, plan = _plan_store_entity(items, site)
+    # both pages have been changed by others since the plan was made
+    osw.site.probe.return_value = {
+        items[1].get_iri(): WtSite.PageProbe(
+            title=items[1].get_iri(), exists=True, revision_id=12
+        ),
+        items[2].get_iri(): WtSite.PageProbe(
+            title=items[2].get_iri(), exists=True, revision_id=13
+        ),
+    }
+
+    result = osw.apply(plan)
+
+    assert set(result.conflicts) == set(plan.pages)
+    assert result.changed == []
+    site.mw_site.api.assert_not_called()
+
+
+def test_store_entity_journal_and_flush(tmp_path):
+    items = [
+        model.Item(uuid=uuid.uuid4(), label=[model.Label(text=f"Item {i}")])
+        for i in range(3)
+    ]
+    site = MagicMock()
+    failing_titles = {items[1].get_iri()}
+
+    def api(action, **kwargs):
+        if kwargs["title"] in failing_titles:
+            raise ConnectionError("connection lost")
+        return {"editslots": {"result": "Success", "newrevid": 7}}
+
+    site.mw_site.api.side_effect = api
+    pages = {}
+    for item in items:
+        page = OfflineWtPage(wtSite=site, title=item.get_iri())
+        page.exists = False
+        pages[page.title] = page
+    osw = _offline_osw({})
+    osw.site.prefetch_pages.return_value = pages
+
+    with StoreJournal(tmp_path / "journal.sqlite") as journal, patch(
+        "osw.wtsite.sleep"
+    ):
+        osw.store_entity(OSW.StoreEntityParam(entities=items, journal=journal))
+        failed = journal.get_entries([JournalState.failed])
+        assert [entry.title for entry in failed] == [items[1].get_iri()]
+        assert journal.get_counts()[JournalState.committed] == 2
+
+        failing_titles.clear()
+        site.mw_site.api.reset_mock()
+        result = osw.flush_journal(journal)
+
+        assert result.changed == [items[1].get_iri()]
+        assert journal.get_counts()[JournalState.committed] == 3
+        assert [call.kwargs["title"] for call in site.mw_site.api.call_args_list] == [
+            items[1].get_iri()
+        ]
+
+
+def test_enqueue_entities(tmp_path):
+    item = model.Item(uuid=uuid.uuid4(), label=[model.Label(text="Item")])
+    with StoreJournal(tmp_path / "journal.sqlite") as journal:
+        assert OSW.enqueue_entities(journal, item) == [item.get_iri()]
+        (entry,) = journal.get_pending()
+    assert entry.state == JournalState.queued
+    assert model.Item(**entry.data) == item
+
+
+def test_delete_entity_probes_pages():
+    items = [
+        model.Item(uuid=uuid.uuid4(), label=[model.Label(text=f"Item {i}")])
+        for i in range(2)
+    ]
+    titles = [item.get_iri() for item in items]
+    site = MagicMock(spec=WtSite)
+    site.probe.return_value = {
+        titles[0]: WtSite.PageProbe(title=titles[0], exists=True, revision_id=1),
+        titles[1]: WtSite.PageProbe(title=titles[1], exists=False),
+    }
+    site.delete_page.return_value = [{"delete": {}}]
+    osw = OSW(site=site)
+
+    osw.delete_entity(items)
+
+    site.probe.assert_called_once_with(titles)
+    site.get_page.assert_not_called()
+    (param,), _ = site.delete_page.call_args
+    assert [probe.title for probe in param.page] == [titles[0]]
+
+
+def test_fetch_schema_fetches_levels_in_batches(tmp_path):
+    refs = {
+        "Category:A": ["Category:B", "Category:C"],
+        "Category:B": ["Category:C", "Category:D"],
+        "Category:C": ["Category:A"],
+        "Category:D": [],
+    }
+
+    def prefetch_pages(titles, slots=None):
+        pages = {}
+        for title in titles:
+            page = OfflineWtPage(title=title)
+            schema = {
+                "title": title.split(":")[-1],
+                "type": "object",
+                "allOf": [{"$ref": f"/wiki/{ref}?action=raw"} for ref in refs[title]],
+            }
+            page.set_slot_content("jsonschema", schema)
+            pages[title] = page
+        return pages
+
+    site = MagicMock(spec=WtSite)
+    site.get_cache_enabled.return_value = True
+    site.prefetch_pages.side_effect = prefetch_pages
+    osw = OSW(site=site)
+
+    param = OSW._FetchSchemaParam(schema_title="Category:A", root=False)
+    # the schemas are kept in memory, nothing is written next to osw.core
+    with patch("osw.core.__file__", str(tmp_path / "core.py")):
+        osw._fetch_schema_closure(param)
+
+    assert [c.args[0] for c in site.prefetch_pages.call_args_list] == [
+        ["Category:A"],
+        ["Category:B", "Category:C"],
+        ["Category:D"],
+    ]
+    assert site.prefetch_pages.call_args.kwargs["slots"] == ["jsonschema"]
+    assert sorted(param.fetched_schema_titles) == sorted(refs)
+    assert sorted(param.schema_documents) == sorted(refs)
+    schema = json.loads(param.schema_documents["Category:B"])
+    assert [s["$ref"] for s in schema["allOf"]] == ["C.json", "D.json"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_fetch_schema_generates_in_memory(tmp_path):
+    pages = {}
+    for title, schema in [
+        ("Category:Base", {"title": "Base", "type": "object"}),
+        (
+            "Category:A",
+            {
+                "title": "A",
+                "type": "object",
+                "allOf": [{"$ref": "/wiki/Category:Base?action=raw"}],
+                "properties": {"a": {"type": "string"}},
+            },
+        ),
+    ]:
+        pages[title] = OfflineWtPage(title=title)
+        pages[title].set_slot_content("jsonschema", schema)
+    site = MagicMock(spec=WtSite)
+    site.get_cache_enabled.return_value = True
+    osw = OSW(site=site)
+
+    with patch("osw.core.__file__", str(tmp_path / "core.py")):
+        result = osw.fetch_schema(
+            OSW.FetchSchemaParam(
+                schema_title="Category:A",
+                offline_pages=pages,
+                result_model_path=tmp_path / "out.py",
+            )
+        )
+
+    assert result.error_messages is None
+    # neither schema files nor temporary modules are written
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "out.manifest.json",
+        "out.py",
+    ]
+    content = (tmp_path / "out.py").read_text()
+    assert "class A(Base):" in content
+    compile(content, "out.py", "exec")
+
+
+def test_fetch_schema_skips_unchanged_schemas(tmp_path):
+    schema = {"title": "A", "type": "object"}
+
+    def prefetch_pages(titles, slots=None):
+        page = OfflineWtPage(title="Category:A")
+        page.set_slot_content("jsonschema", schema)
+        page._current_revision = {"revid": 6}
+        return {"Category:A": page}
+
+    site = MagicMock(spec=WtSite)
+    site.get_cache_enabled.return_value = True
+    site.prefetch_pages.side_effect = prefetch_pages
+    site.get_revision_ids.return_value = {"Category:A": 5}
+    osw = OSW(site=site)
+    model_path = tmp_path / "model.py"
+    model_path.write_text("class A:\n    pass\n")
+    param = OSW.FetchSchemaParam(
+        schema_title="Category:A", result_model_path=model_path
+    )
+    with patch("osw.core.__file__", str(tmp_path / "core.py")):
+        closure_param = OSW._FetchSchemaParam(schema_title="Category:A")
+        osw._fetch_schema_closure(closure_param)
+    manifest_path = tmp_path / "model.manifest.json"
+    manifest = {
+        "version": 1,
+        "options": OSW._get_generator_options_key(param),
+        "roots": {"Category:A": ["Category:A"]},
+        "schemas": {
+            "Category:A": {
+                **closure_param.fetched_schemas["Category:A"],
+                "revision_id": 5,
+            }
+        },
+        "model_sha256": hashlib.sha256(model_path.read_bytes()).hexdigest(),
+    }
+    manifest_path.write_text(json.dumps(manifest))
+    site.prefetch_pages.reset_mock()
+
+    with patch("osw.core.__file__", str(tmp_path / "core.py")), patch.object(
+        OSW, "_fetch_schema", return_value=OSW.FetchSchemaResult()
+    ) as _fetch_schema:
+        # unchanged revisions: nothing is fetched
+        assert osw.fetch_schema(param).unchanged
+        site.prefetch_pages.assert_not_called()
+
+        # new revision with the same schema: only the manifest is updated
+        site.get_revision_ids.return_value = {"Category:A": 6}
+        assert osw.fetch_schema(param).unchanged
+        manifest = json.loads(manifest_path.read_text())
+        assert manifest["schemas"]["Category:A"]["revision_id"] == 6
+        _fetch_schema.assert_not_called()
+
+        # changed schema: the model is generated
+        site.get_revision_ids.return_value = {"Category:A": 7}
+        schema["description"] = "changed"
+        assert not osw.fetch_schema(param).unchanged
+        _fetch_schema.assert_called_once()
+    recorded = json.loads(manifest_path.read_text())["schemas"]["Category:A"]
+    assert recorded["sha256"] != manifest["schemas"]["Category:A"]["sha256"]
+
+
+def test_install_dependencies_if_outdated(tmp_path):
+    model_path = tmp_path / "model" / "entity.py"
+    model_path.parent.mkdir()
+    model_path.write_text("class Item:\n    pass\n")
+    manifest = {
+        "version": 1,
+        "roots": {
+            "Category:Item": ["Category:Item", "Category:X"],
+            "Category:Entity": ["Category:Entity"],
+        },
+        "schemas": {
+            "Category:Item": {"revision_id": 1},
+            "Category:X": {"revision_id": 2},
+            "Category:Entity": {"revision_id": 3},
+        },
+        "model_sha256": hashlib.sha256(model_path.read_bytes()).hexdigest(),
+    }
+    (tmp_path / "model" / "entity.manifest.json").write_text(json.dumps(manifest))
+    site = MagicMock(spec=WtSite)
+    site.get_revision_ids.return_value = {
+        "Category:Item": 1,
+        "Category:X": 5,  # updated since the generation
+        "Category:Entity": 3,
+    }
+    osw = OSW(site=site)
+    dependencies = {
+        "Item": "Category:Item",
+        "Entity": "Category:Entity",
+        "NotInstalled": "Category:NotInstalled",
+    }
+
+    with patch("osw.core.__file__", str(tmp_path / "core.py")), patch.object(
+        OSW, "fetch_schema"
+    ) as fetch_schema:
+        osw.install_dependencies(dependencies, policy="if-outdated")
+
+    site.get_revision_ids.assert_called_once()
+    assert sorted(site.get_revision_ids.call_args.args[0]) == [
+        "Category:Entity",
+        "Category:Item",
+        "Category:NotInstalled",
+        "Category:X",
+    ]
+    (param,) = fetch_schema.call_args.args
+    assert sorted(param.schema_title) == ["Category:Item", "Category:NotInstalled"]
+    assert param.overwrite
+
+
+def test_update_generated_index_concurrently(tmp_path):
+    modules = [f"Module{i}" for i in range(20)]
+
+    def update(module_name):
+        OSW._update_generated_index(
+            module_name,
+            f"Category:{module_name}",
+            f"class {module_name}Class:\n    pass\n",
+        )
+
+    with patch("osw.core.get_generated_package_path", return_value=str(tmp_path)):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(update, modules))
+        index = OSW._read_generated_index()
+
+    # no update is lost
+    assert set(index["modules"]) == set(modules)
+    assert index["classes"] == {f"{module}Class": module for module in modules}
+    assert not list(tmp_path.glob("*.lock"))
+
+
+def _generated_package(tmp_path, monkeypatch):
+    """Redirects the package osw.model.generated to a temporary directory"""
+    package_path = tmp_path / "model" / "generated"
+    package_path.mkdir(parents=True)
+    (package_path / "__init__.py").write_text("")
+    monkeypatch.setattr(osw.model, "__path__", [str(tmp_path / "model")])
+    monkeypatch.setattr(osw.model, "_generated_index", None)
+    for name in ("osw.core", "osw.model"):
+        monkeypatch.setattr(
+            f"{name}.get_generated_package_path", lambda: str(package_path)
+        )
+    return package_path
+
+
+def _unload_generated_modules():
+    for name in [m for m in sys.modules if m.startswith("osw.model.generated")]:
+        del sys.modules[name]
+
+
+def test_generated_modules_are_imported_lazily(tmp_path, monkeypatch):
+    package_path = _generated_package(tmp_path, monkeypatch)
+
+    content_base = "class Base(object):\n    x: int = 1\n"
+    (package_path / "Base.py").write_text(content_base)
+    OSW._update_generated_index("Base", "Category:Base", content_base)
+    ref_modules = {"Base": ["Base"]}
+    content = content_base + "\n\nclass {}(Base):\n    pass\n"
+    for name in ("A", "B"):
+        # classes of the referenced schemas are imported from their modules
+        module_content = OSW._import_generated_classes(
+            content.format(name), name, ref_modules
+        )
+        assert "class Base" not in module_content
+        assert "from osw.model.generated.Base import Base" in module_content
+        (package_path / f"{name}.py").write_text(module_content)
+        OSW._update_generated_index(name, f"Category:{name}", module_content)
+    assert OSW._read_generated_index()["classes"] == {
+        "Base": "Base",
+        "A": "A",
+        "B": "B",
+    }
+
+    try:
+        assert osw.model.A.__module__ == "osw.model.generated.A"
+        assert "osw.model.generated.B" not in sys.modules
+        assert issubclass(model.B, osw.model.Base)
+        assert not hasattr(model, "C")
+    finally:
+        _unload_generated_modules()
+
+
+def test_fetch_schema_generates_one_module_per_schema(tmp_path, monkeypatch):
+    package_path = _generated_package(tmp_path, monkeypatch)
+    pages = {}
+    for title, schema in [
+        ("Category:Base", {"title": "Base", "type": "object"}),
+        (
+            "Category:A",
+            {
+                "title": "A",
+                "type": "object",
+                "allOf": [{"$ref": "/wiki/Category:Base?action=raw"}],
+                "properties": {"a": {"type": "string"}},
+            },
+        ),
+        (
+            "Category:B",
+            {
+                "title": "B",
+                "type": "object",
+                "allOf": [{"$ref": "/wiki/Category:Base?action=raw"}],
+                "properties": {"b": {"type": "string"}},
+            },
+        ),
+    ]:
+        pages[title] = OfflineWtPage(title=title)
+        pages[title].set_slot_content("jsonschema", schema)
+    site = MagicMock(spec=WtSite)
+    site.get_cache_enabled.return_value = True
+    osw_obj = OSW(site=site)
+
+    try:
+        # the order of the requested schemas does not matter
+        result = osw_obj.fetch_schema(
+            OSW.FetchSchemaParam(
+                schema_title=["Category:B", "Category:A"],
+                offline_pages=pages,
+                layout="modules",
+            )
+        )
+
+        assert result.error_messages is None
+        modules = OSW._read_generated_index()["modules"]
+        assert {module: entry["schema"] for module, entry in modules.items()} == {
+            "Base": "Category:Base",
+            "A": "Category:A",
+            "B": "Category:B",
+        }
+        for name in ("A", "B"):
+            content = (package_path / f"{name}.py").read_text()
+            assert f"class {name}(Base):" in content
+            assert "class Base" not in content
+            assert "from osw.model.generated.Base import Base" in content
+        assert "class Base" in (package_path / "Base.py").read_text()
+
+        # only the dependency chain of a class is imported
+        _unload_generated_modules()
+        assert issubclass(osw.model.B, osw.model.Base)
+        assert "osw.model.generated.A" not in sys.modules
+    finally:
+        _unload_generated_modules()
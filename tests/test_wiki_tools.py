@@ -128,3 +128,148 @@ def test_prefix_search_returns_flat_list_of_titles():
 
     # return_json=False (the default) still yields a flat list of page titles
     assert out == ["Star Wars", "Star Trek"]
+
+
+def _file_info_result(pages, normalized=None, continue_=None):
+    """Build a minimal ``prop=imageinfo|fileusage`` API result dict."""
+    result = {
+        "query": {
+            "pages": {str(-i - 1): page_dict for i, page_dict in enumerate(pages)}
+        }
+    }
+    if normalized:
+        result["query"]["normalized"] = normalized
+    if continue_:
+        result["continue"] = continue_
+    return result
+
+
+def test_get_file_info_and_usage_batches_titles():
+    titles = [f"File:OSW{i}.png" for i in range(60)]
+
+    def api(**kwargs):
+        return _file_info_result(
+            [
+                {
+                    "title": t,
+                    "imageinfo": [{"user": "Alice", "timestamp": "2024-01-01"}],
+                    "fileusage": [{"title": f"Item:{t[5:-4]}"}],
+                }
+                for t in kwargs["titles"].split("|")
+            ]
+        )
+
+    site = MagicMock()
+    site.api.side_effect = api
+
+    out = wt.get_file_info_and_usage(site, wt.SearchParam(query=titles, parallel=False))
+
+    assert site.api.call_count == 2
+    assert len(site.api.call_args_list[0].kwargs["titles"].split("|")) == 50
+    assert [r["info"]["title"] for r in out] == titles
+    assert out[59]["info"]["author"] == "Alice"
+    assert out[59]["usage"] == ["Item:OSW59"]
+
+
+def test_get_file_info_and_usage_follows_continuation_and_normalization():
+    first = _file_info_result(
+        [
+            {
+                "title": "File:OSW1.png",
+                "imageinfo": [{"user": "Alice", "timestamp": "2024-01-01"}],
+                "fileusage": [{"title": "Item:A"}],
+            },
+            {"title": "File:Missing.png", "missing": ""},
+        ],
+        normalized=[{"from": "File:OSW1.png ", "to": "File:OSW1.png"}],
+        # several titles: '<file title>|<page id of the using page>'
+        continue_={"fucontinue": "OSW1.png|2", "continue": "||imageinfo"},
+    )
+    second = _file_info_result(
+        [{"title": "File:OSW1.png", "fileusage": [{"title": "Item:B"}]}],
+    )
+    site = MagicMock()
+    site.api.side_effect = [first, second]
+
+    out = wt.get_file_info_and_usage(site, ["File:OSW1.png ", "File:Missing.png"])
+
+    assert site.api.call_args_list[1].kwargs["fucontinue"] == "OSW1.png|2"
+    assert out[0]["info"]["title"] == "File:OSW1.png "
+    assert out[0]["info"]["author"] == "Alice"
+    assert out[0]["usage"] == ["Item:A", "Item:B"]
+    assert out[1]["info"]["author"] == "File not found or no creation logged"
+    assert out[1]["usage"] == []
+
+
+def test_get_file_info_and_usage_of_missing_files():
+    site = MagicMock()
+    site.api.return_value = _file_info_result(
+        [
+            {
+                "title": "File:Missing.png",
+                "missing": "",
+                "fileusage": [{"title": "Item:A"}],
+            }
+        ]
+    )
+
+    out = wt.get_file_info_and_usage(site, "File:Missing.png")
+
+    assert out[0]["info"]["author"] == "File not found or no creation logged"
+    assert out[0]["usage"] == ["Item:A"]
+
+
+def test_get_file_info_and_usage_respects_limit():
+    def result(fileusage, fucontinue):
+        return {
+            "query": {
+                "pages": {
+                    "1": {"title": "File:A.png", "fileusage": fileusage[0]},
+                    "2": {"title": "File:B.png", "fileusage": fileusage[1]},
+                }
+            },
+            "continue": {"fucontinue": fucontinue, "continue": "||imageinfo"},
+        }
+
+    site = MagicMock()
+    site.api.side_effect = [
+        result([[{"title": "Item:A1"}, {"title": "Item:A2"}], []], "A.png|3"),
+        result(
+            [[{"title": "Item:A3"}], [{"title": "Item:B1"}, {"title": "Item:B2"}]],
+            "B.png|5",
+        ),
+    ]
+
+    out = wt.get_file_info_and_usage(
+        site, wt.SearchParam(query=["File:A.png", "File:B.png"], limit=2)
+    )
+
+    # the continuation of the server is passed on unchanged and not followed
+    #  once all files have 'limit' usages, further usages are dropped
+    assert site.api.call_count == 2
+    assert site.api.call_args_list[1].kwargs["fucontinue"] == "A.png|3"
+    assert out[0]["usage"] == ["Item:A1", "Item:A2"]
+    assert out[1]["usage"] == ["Item:B1", "Item:B2"]
+
+
+def test_get_file_info_and_usage_follows_continuation_of_single_title():
+    def result(fileusage, continue_):
+        return {
+            "query": {"pages": {"1": {"title": "File:A.png", "fileusage": fileusage}}},
+            **continue_,
+        }
+
+    site = MagicMock()
+    site.api.side_effect = [
+        # one title: '<page id of the using page>'
+        result(
+            [{"title": "Item:A1"}], {"continue": {"fucontinue": "7", "continue": "||"}}
+        ),
+        result([{"title": "Item:A2"}], {}),
+    ]
+
+    out = wt.get_file_info_and_usage(site, wt.SearchParam(query="File:A.png", limit=5))
+
+    assert site.api.call_count == 2
+    assert site.api.call_args_list[1].kwargs["fucontinue"] == "7"
+    assert out[0]["usage"] == ["Item:A1", "Item:A2"]
@@ -1,6 +1,12 @@
 import re
 
-from osw.utils.code_postprocessing import remove_constraints_from_forward_refs
+from osw.utils.code_postprocessing import (
+    consolidate_imports_and_forward_refs,
+    merge_generated_code,
+    remove_constraints_from_forward_refs,
+    remove_empty_subclasses,
+    resolve_osw_id_type_hints,
+)
 
 
 def test_remove_constraints_from_forward_refs():
@@ -220,6 +226,105 @@ class ForwardType(Item):
     print("All edge case tests passed!")
 
 
+def test_remove_empty_subclasses():
+    src_code = '''class Label(OswBaseModel):
+    text: str
+
+
+class Label1(Label):
+    """A label"""
+
+    pass
+
+
+class LabelModel(Label):
+    pass
+
+
+class Other(Label):
+    pass
+
+
+class Item(OswBaseModel):
+    label: list[Label1] | None = None
+    name: LabelModel | None = None
+'''
+    result = remove_empty_subclasses(src_code)
+    assert "class Label1" not in result
+    assert "class LabelModel" not in result
+    assert "class Other(Label):" in result  # does not follow the naming patterns
+    assert "label: list[Label] | None = None" in result
+    assert "name: Label | None = None" in result
+    compile(result, "<generated>", "exec")
+
+
+def test_merge_generated_code():
+    org_content = "class A(Base):\n    x: int = 1\n\n\nclass B(Base):\n    pass\n"
+    content = "class B(Base):\n    y: int = 2\n\n\nclass C(Base):\n    pass\n"
+
+    result = merge_generated_code(org_content, content)
+    assert result.count("class B(Base):") == 1
+    assert "x: int = 1" in result and "y: int = 2" not in result
+    assert "class C(Base):" in result
+
+    result = merge_generated_code(org_content, content, overwrite=True)
+    assert result.count("class B(Base):") == 1
+    assert "y: int = 2" in result
+    assert "class A(Base):" in result
+
+
+def test_consolidate_imports_and_forward_refs():
+    src_code = """# generated
+from __future__ import annotations
+
+from datetime import date
+from pydantic.v1 import Field  # noqa
+
+
+class A(Base):
+    d: date = Field(None)
+
+
+A.update_forward_refs()
+from datetime import date, datetime
+from __future__ import annotations
+
+
+class B(Base):
+    from typing import Any  # not moved, not at the top level
+
+    d: datetime
+
+
+A.update_forward_refs()
+B.update_forward_refs()
+"""
+    result = consolidate_imports_and_forward_refs(src_code)
+    assert result.startswith(
+        "from __future__ import annotations\n"
+        "from datetime import date, datetime\n"
+        "from pydantic.v1 import Field\n"
+    )
+    assert result.endswith("A.update_forward_refs()\nB.update_forward_refs()\n")
+    assert result.count("update_forward_refs") == 2
+    assert "    from typing import Any" in result
+    compile(result, "<generated>", "exec")
+
+
+def test_resolve_osw_id_type_hints_unformatted():
+    # without formatting, the generated dicts use single quotes
+    src_code = """class Process(Item):
+    class Config:
+        schema_extra = {'uuid': '38867408-59ae-4595-88fe-e73d3bb3c83e'}
+
+
+class Child(Process):
+    parent: OSW3886740859ae459588fee73d3bb3c83e | None = None
+"""
+    result = resolve_osw_id_type_hints(src_code)
+    assert "parent: Process | None = None" in result
+
+
 if __name__ == "__main__":
     test_remove_constraints_from_forward_refs()
     test_edge_cases()
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from pydantic.v1 import ValidationError
+
+import osw.model.entity as model
+from osw.utils.construct import construct_trusted, validate_constructed
+
+
+def _item_data():
+    return {
+        "type": ["Category:OSW0e7fab2262fb4427ad0fa454bc868a0d"],
+        "uuid": str(uuid.uuid4()),
+        "label": [{"text": "my item", "lang": "en"}, {"text": "mein Item"}],
+        "description": [{"text": "some description"}],
+        "rdf_type": ["schema:Thing", "schema:Thing"],
+        "keywords": ["Item:OSW123"],
+        "statements": [
+            {
+                "uuid": str(uuid.uuid4()),
+                "predicate": "Property:HasPart",
+                "object": "Item:OSW456",
+            }
+        ],
+        "meta": {"uuid": str(uuid.uuid4()), "wiki_page": {"title": "OSW1"}},
+    }
+
+
+def test_construct_trusted_equals_validated_instance():
+    data = _item_data()
+
+    expected = model.Item(**data)
+    entity = construct_trusted(model.Item, data)
+
+    assert type(entity) is model.Item
+    assert entity.json() == expected.json()
+    assert entity.__fields_set__ == expected.__fields_set__
+    assert isinstance(entity.uuid, uuid.UUID)
+    assert isinstance(entity.label[0], model.Label)
+    assert isinstance(entity.label[0].lang, model.LangCode)
+    assert entity.label[1].lang is model.LangCode.en  # default of a nested model
+    assert entity.rdf_type == {"schema:Thing"}
+    assert isinstance(entity.statements[0], model.ObjectStatement)
+    assert entity.name == "MyItem"
+    assert entity.get_iri_ref("keywords") == expected.get_iri_ref("keywords")
+
+
+def test_validate_constructed():
+    data = _item_data()
+    entity = construct_trusted(model.Item, data)
+    assert validate_constructed(entity).json() == entity.json()
+
+    data["label"] = [{"text": ""}]  # violates min_length
+    with pytest.raises(ValidationError):
+        validate_constructed(construct_trusted(model.Item, data))
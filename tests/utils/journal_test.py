@@ -0,0 +1,35 @@
+from osw.utils.journal import JournalEntry, JournalState, StoreJournal
+
+
+def test_store_journal(tmp_path):
+    path = tmp_path / "journal.sqlite"
+    with StoreJournal(path) as journal:
+        journal.add(
+            [
+                JournalEntry(
+                    title=f"Item:OSW{i}",
+                    change_id="change",
+                    model=[("osw.model.entity", "Item")],
+                    data={"name": f"Item{i}"},
+                )
+                for i in range(3)
+            ]
+        )
+        journal.set_state("Item:OSW0", JournalState.committed, revision_id=10)
+        journal.set_state("Item:OSW1", JournalState.failed, error="timeout")
+
+    # the state is persisted
+    with StoreJournal(path) as journal:
+        assert journal.get_counts() == {
+            JournalState.queued: 1,
+            JournalState.in_flight: 0,
+            JournalState.committed: 1,
+            JournalState.failed: 1,
+        }
+        committed = journal.get_entries([JournalState.committed])
+        assert [entry.revision_id for entry in committed] == [10]
+        pending = journal.get_pending()
+        assert [entry.title for entry in pending] == ["Item:OSW1", "Item:OSW2"]
+        assert pending[0].error == "timeout"
+        assert pending[1].model == [("osw.model.entity", "Item")]
+        assert pending[1].data == {"name": "Item2"}
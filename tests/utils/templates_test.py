@@ -1,8 +1,16 @@
 # flake8: noqa: E501
 import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 from osw.utils.oold import escape_json_strings
-from osw.utils.templates import eval_handlebars_template
+from osw.utils.templates import (
+    compile_handlebars_template,
+    eval_compiled_handlebars_template,
+    eval_handlebars_template,
+    get_compiled_handlebars_template,
+    precompile_handlebars_template,
+)
 
 
 def test_category_template():
@@ -526,3 +534,37 @@ def test_metamodel_with_replace_helper():
 
     output_5 = json.loads(eval_handlebars_template(template, data_5))
     assert output_5 == expected_5
+
+
+def test_get_compiled_handlebars_template():
+    template = "{{#each items}}{{name}}{{#unless @last}}, {{/unless}}{{/each}}"
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        compiled = list(
+            executor.map(
+                lambda _: get_compiled_handlebars_template("test:list", template),
+                range(16),
+            )
+        )
+    assert all(c is compiled[0] for c in compiled)
+    data = {"items": [{"name": "a"}, {"name": "b"}]}
+    assert eval_compiled_handlebars_template(compiled[0], data) == "a, b"
+
+    # a changed template is recompiled
+    changed = get_compiled_handlebars_template("test:list", "{{items.length}}")
+    assert changed is not compiled[0]
+    assert get_compiled_handlebars_template("test:list", "{{items.length}}") is changed
+
+
+def test_compile_handlebars_template_with_cache_dir(tmp_path):
+    template = "{{#each items}}\\{{raw}} {{name}}{{/each}}"
+    data = {"items": [{"name": "a"}]}
+    compiled = compile_handlebars_template(template, cache_dir=tmp_path)
+    assert eval_compiled_handlebars_template(compiled, data) == "{{raw}} a"
+    modules = list(tmp_path.glob("osw_template_*.py"))
+    assert len(modules) == 1
+
+    # later calls import the module without compiling the template again
+    with patch("osw.utils.templates.Compiler", side_effect=AssertionError):
+        compiled = compile_handlebars_template(template, cache_dir=tmp_path)
+    assert eval_compiled_handlebars_template(compiled, data) == "{{raw}} a"
+    assert precompile_handlebars_template(template, tmp_path) == modules[0]
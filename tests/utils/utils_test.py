@@ -3,6 +3,7 @@ import uuid
 import osw.model.entity as model
 from osw.utils.regex import count_match_groups
 from osw.utils.strings import camel_case, pascal_case
+from osw.utils.util import get_dependency_levels
 from osw.utils.wiki import (
     get_full_title,
     get_namespace,
@@ -129,3 +130,21 @@ def test_regex_pattern():
 
     for _key, pattern in REGEX_PATTERN_LIB.items():
         assert pattern.test_pattern()
+
+
+# osw.utils.util
+def test_get_dependency_levels():
+    levels, critical_path = get_dependency_levels(
+        {
+            "instance": ["subclass", "property", "external"],
+            "subclass": ["class"],
+            "property": [],
+            "class": ["class"],
+        }
+    )
+    assert levels == [["property", "class"], ["subclass"], ["instance"]]
+    assert critical_path == ["class", "subclass", "instance"]
+
+    levels, critical_path = get_dependency_levels({"a": ["b"], "b": ["a"], "c": []})
+    assert levels == [["c"], ["a", "b"]]
+    assert get_dependency_levels({}) == ([], [])
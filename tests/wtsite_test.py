@@ -0,0 +1,332 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from unittest.mock import MagicMock
+
+import mwclient
+
+from osw.wtsite import WtPage, WtSite
+
+
+def _wtsite(api_results):
+    """Build a WtSite around a mocked mwclient.Site returning the given API
+    results in order."""
+    site = MagicMock(spec=mwclient.Site)
+    site.api.side_effect = api_results
+    site.namespaces = {0: "", 6: "File", 14: "Category"}
+    return WtSite(WtSite.WtSiteLegacyConfig(site=site))
+
+
+def _page_dict(page_id, title, jsondata=None):
+    """Build a page entry of a prop=info|revisions query result."""
+    slots = {"main": {"contentmodel": "wikitext", "*": f"Text of {title}"}}
+    if jsondata is not None:
+        slots["jsondata"] = {"contentmodel": "json", "*": json.dumps(jsondata)}
+    return {
+        "pageid": page_id,
+        "ns": 6,
+        "title": title,
+        "lastrevid": 100 + page_id,
+        "revisions": [{"revid": 100 + page_id, "slots": slots}],
+    }
+
+
+def test_iter_file_pages_follows_continuation():
+    wtsite = _wtsite(
+        [
+            {
+                "continue": {"aicontinue": "B.png", "continue": "-||"},
+                "query": {"allimages": [{"title": "File:A.png"}]},
+            },
+            {"query": {"allimages": [{"title": "File:B.png"}]}},
+        ]
+    )
+
+    assert list(wtsite.iter_file_pages()) == ["File:A.png", "File:B.png"]
+    assert wtsite._site.api.call_args_list[1].kwargs["aicontinue"] == "B.png"
+
+
+def test_iter_namespace_with_content_yields_initialized_pages():
+    wtsite = _wtsite(
+        [
+            {
+                "batchcomplete": "",
+                "continue": {"gapcontinue": "B.png", "continue": "gapcontinue||"},
+                "query": {"pages": {"1": _page_dict(1, "File:A.png", {"a": 1})}},
+            },
+            {
+                # revisions of a batch spread over two responses
+                "continue": {"rvcontinue": "3|103", "continue": "||"},
+                "query": {
+                    "pages": {
+                        "2": _page_dict(2, "File:B.png"),
+                        "3": {"pageid": 3, "ns": 6, "title": "File:C.png"},
+                    }
+                },
+            },
+            {
+                "batchcomplete": "",
+                "query": {"pages": {"3": _page_dict(3, "File:C.png")}},
+            },
+        ]
+    )
+
+    pages = list(wtsite.iter_namespace("File", with_content=True))
+
+    assert [p.title for p in pages] == ["File:A.png", "File:B.png", "File:C.png"]
+    assert all(isinstance(p, WtPage) and p.exists for p in pages)
+    assert pages[0].get_slot_content("jsondata") == {"a": 1}
+    assert pages[2].get_slot_content("main") == "Text of File:C.png"
+    assert wtsite._site.api.call_args_list[0].kwargs["gapnamespace"] == 6
+    assert wtsite._site.api.call_count == 3
+
+
+def test_iter_namespace_without_content_yields_titles():
+    wtsite = _wtsite(
+        [{"query": {"pages": {"1": {"pageid": 1, "ns": 14, "title": "Category:A"}}}}]
+    )
+
+    assert list(wtsite.iter_namespace(14)) == ["Category:A"]
+    assert "prop" not in wtsite._site.api.call_args_list[0].kwargs
+
+
+def test_prefetch_pages_batches_titles():
+    titles = [f"Item:OSW{i}" for i in range(60)]
+
+    def api(action, **kwargs):
+        pages = {}
+        for i, title in enumerate(kwargs["titles"].split("|")):
+            if title == "Item:OSW59":
+                pages[str(-1)] = {"ns": 7000, "title": title, "missing": ""}
+            else:
+                pages[str(i + 1)] = _page_dict(i + 1, title, {"title": title})
+        return {"batchcomplete": "", "query": {"pages": pages}}
+
+    wtsite = _wtsite(None)
+    wtsite._site.api.side_effect = api
+
+    pages = wtsite.prefetch_pages(titles)
+
+    assert wtsite._site.api.call_count == 2
+    assert list(pages) == titles
+    assert pages["Item:OSW1"].exists
+    assert pages["Item:OSW1"].get_slot_content("jsondata") == {"title": "Item:OSW1"}
+    assert not pages["Item:OSW59"].exists
+
+
+def test_prefetch_pages_maps_normalized_titles():
+    wtsite = _wtsite(
+        [
+            {
+                "query": {
+                    "normalized": [{"from": "Item:OSW1_a", "to": "Item:OSW1 a"}],
+                    "pages": {"1": _page_dict(1, "Item:OSW1 a")},
+                }
+            }
+        ]
+    )
+
+    pages = wtsite.prefetch_pages(["Item:OSW1_a"])
+
+    assert list(pages) == ["Item:OSW1_a"]
+    assert pages["Item:OSW1_a"].title == "Item:OSW1_a"
+
+
+def test_get_revision_ids():
+    wtsite = _wtsite(
+        [
+            {
+                "query": {
+                    "normalized": [{"from": "Item:OSW1_a", "to": "Item:OSW1 a"}],
+                    "pages": {
+                        "1": {"pageid": 1, "title": "Item:OSW1 a", "lastrevid": 101},
+                        "-1": {"title": "Item:OSW2", "missing": ""},
+                        "-2": {"title": "Item:<", "invalid": ""},
+                    },
+                }
+            }
+        ]
+    )
+
+    revision_ids = wtsite.get_revision_ids(["Item:OSW1_a", "Item:OSW2", "Item:<"])
+
+    assert revision_ids == {"Item:OSW1_a": 101, "Item:OSW2": None}
+    assert wtsite.mw_site.api.call_count == 1
+    assert "content" not in wtsite.mw_site.api.call_args.kwargs["rvprop"]
+
+
+def test_probe():
+    wtsite = _wtsite(
+        [
+            {
+                "query": {
+                    "normalized": [{"from": "Item:OSW1_a", "to": "Item:OSW1 a"}],
+                    "pages": {
+                        "1": {
+                            "pageid": 1,
+                            "ns": 7,
+                            "title": "Item:OSW1 a",
+                            "lastrevid": 101,
+                            "length": 42,
+                            "revisions": [
+                                {
+                                    "revid": 101,
+                                    "slots": {
+                                        "main": {"size": 2, "sha1": "abc"},
+                                        "jsondata": {"size": 40, "sha1": "def"},
+                                    },
+                                }
+                            ],
+                        },
+                        "-1": {"ns": 7, "title": "Item:OSW2", "missing": ""},
+                        "-2": {"title": "Item:<", "invalid": ""},
+                    },
+                }
+            },
+            {"delete": {"title": "Item:OSW1 a"}},
+        ]
+    )
+
+    probes = wtsite.probe(["Item:OSW1_a", "Item:OSW2", "Item:<"])
+
+    assert set(probes) == {"Item:OSW1_a", "Item:OSW2"}
+    probe = probes["Item:OSW1_a"]
+    assert probe.exists
+    assert (probe.page_id, probe.revision_id, probe.length) == (1, 101, 42)
+    assert probe.slot_sha1 == {"main": "abc", "jsondata": "def"}
+    assert not probes["Item:OSW2"].exists
+    assert probes["Item:OSW2"].revision_id is None
+    assert "content" not in wtsite.mw_site.api.call_args.kwargs["rvprop"]
+
+    # existing pages can be deleted without loading them again
+    wtsite.mw_site.post = MagicMock(return_value={"delete": {}})
+    wtsite.mw_site.get_token = MagicMock(return_value="token")
+    wtsite.mw_site.rights = ["delete"]
+    wtsite.delete_page(probe, comment="test")
+    assert wtsite.mw_site.post.call_args.kwargs["title"] == "Item:OSW1 a"
+    assert wtsite.mw_site.api.call_count == 1
+
+
+def test_edit_updates_page_cache():
+    wtsite = _wtsite(
+        [
+            {"query": {"pages": {"1": _page_dict(1, "Item:OSW1", {"name": "A"})}}},
+            {"editslots": {"result": "Success", "newrevid": 202}},
+        ]
+    )
+    wtsite.mw_site.connection = MagicMock(cookies=[])
+    wtsite.enable_cache()
+    page = wtsite.prefetch_pages(["Item:OSW1"])["Item:OSW1"]
+
+    page.set_slot_content("jsondata", {"name": "B"})
+    page.edit()
+
+    cached = wtsite.get_page(WtSite.GetPageParam(titles=["Item:OSW1"])).pages[0]
+    assert cached is page
+    assert cached.get_revision_id() == 202
+    assert cached.get_slot_content("jsondata") == {"name": "B"}
+    assert wtsite.mw_site.api.call_count == 2
+
+
+def test_edit_of_uninitialized_page_can_be_deleted_from_cache():
+    wtsite = _wtsite(
+        [{"editslots": {"result": "Success", "pageid": 3, "newrevid": 303}}]
+    )
+    wtsite.mw_site.connection = MagicMock(cookies=[])
+    wtsite.enable_cache()
+    page = WtPage(wtsite, "Category:OSW3", do_init=False)
+    page.set_slot_content("jsondata", {"name": "C"})
+    page.edit()
+
+    cached = wtsite.get_page(WtSite.GetPageParam(titles=["Category:OSW3"])).pages[0]
+    assert cached is page
+    assert cached.exists
+    assert (cached._page.pageid, cached._page.revision) == (3, 303)
+    assert cached._page.namespace == 14
+
+    wtsite.mw_site.post = MagicMock(return_value={"delete": {}})
+    wtsite.mw_site.get_token = MagicMock(return_value="token")
+    wtsite.mw_site.rights = ["delete"]
+    cached.delete("test")
+    assert wtsite.mw_site.post.call_args.kwargs["title"] == "Category:OSW3"
+    assert wtsite.mw_site.api.call_count == 1
+
+
+def test_edit_without_revision_id_is_not_cached():
+    wtsite = _wtsite(
+        [
+            {"query": {"pages": {"1": _page_dict(1, "Item:OSW1", {"name": "A"})}}},
+            {"editslots": {"result": "Success", "nochange": ""}},
+        ]
+    )
+    wtsite.mw_site.connection = MagicMock(cookies=[])
+    wtsite.enable_cache()
+    page = wtsite.prefetch_pages(["Item:OSW1"])["Item:OSW1"]
+
+    page.set_slot_content("jsondata", {"name": "B"})
+    page.edit()
+
+    assert "Item:OSW1" not in wtsite._page_cache
+    assert page.get_revision_id() is None
+
+
+def test_get_page_loads_selected_slots():
+    page_dict = _page_dict(1, "Item:OSW1", {"name": "A"})
+    jsondata_page_dict = deepcopy(page_dict)
+    del jsondata_page_dict["revisions"][0]["slots"]["main"]
+    wtsite = _wtsite(
+        [
+            {"query": {"pages": {"1": jsondata_page_dict}}},
+            {"query": {"pages": {"1": page_dict}}},
+        ]
+    )
+    wtsite.mw_site.connection = MagicMock(cookies=[])
+    wtsite.enable_cache()
+
+    page = wtsite.get_page(
+        WtSite.GetPageParam(titles=["Item:OSW1"], slots=["jsondata"])
+    ).pages[0]
+
+    assert wtsite.mw_site.api.call_count == 1
+    assert wtsite.mw_site.api.call_args.kwargs["rvslots"] == "jsondata"
+    assert page.exists
+    assert page.get_revision_id() == 101
+    assert page.get_slot_content("jsondata") == {"name": "A"}
+    assert page.get_slot_content("main") is None
+
+    # served from the cache if the slots were loaded, else loaded again
+    param = WtSite.GetPageParam(titles=["Item:OSW1"], slots=["jsondata"])
+    assert wtsite.get_page(param).pages[0] is page
+    page = wtsite.get_page(WtSite.GetPageParam(titles=["Item:OSW1"])).pages[0]
+    assert wtsite.mw_site.api.call_count == 2
+    assert wtsite.mw_site.api.call_args.kwargs["rvslots"] == "*"
+    assert page.get_slot_content("main") == "Text of Item:OSW1"
+
+
+def test_get_page_deduplicates_concurrent_requests():
+    loading = threading.Event()
+    release = threading.Event()
+
+    def api(action, **kwargs):
+        loading.set()
+        release.wait(5)
+        return {"query": {"pages": {"1": _page_dict(1, "Item:OSW1", {"name": "A"})}}}
+
+    wtsite = _wtsite(None)
+    wtsite._site.api.side_effect = api
+    wtsite.mw_site.connection = MagicMock(cookies=[])
+    wtsite.enable_cache()
+
+    param = WtSite.GetPageParam(titles=["Item:OSW1"])
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(wtsite.get_page, param) for _ in range(4)]
+        loading.wait(5)
+        time.sleep(0.2)  # let the other threads wait for the running request
+        release.set()
+        pages = [future.result().pages[0] for future in futures]
+
+    assert wtsite._site.api.call_count == 1
+    assert all(page is pages[0] for page in pages)
+    assert wtsite._page_requests == {}